@@ -1,17 +1,234 @@
-import re
+import time
+
+# 开始导入本模块的时间，用于启动耗时报告
+MODULE_STARTED = time.time()
+
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import threading
+import queue
+import json
 import os
 
+# 提取引擎（iptv_extractor）不在这里导入：窗口显示后由后台线程预先导入并编译规则，
+# 首次显示窗口时不需要等待
+
+# 设置该环境变量为文件路径时，启动完成后把各阶段时间写入该文件并退出（供启动基准测试使用）
+STARTUP_REPORT_ENV = "IPTV_EXTRACTOR_STARTUP_REPORT"
+
+# 主线程处理界面更新队列的间隔（毫秒）和每次最多处理的事件数
+UI_POLL_MS = 50
+UI_BATCH_SIZE = 200
+
+# 提取阶段在进度条中所占的比例，其余为写入文件
+EXTRACT_PROGRESS = 90
+
+# 结果表格的行高（像素）和搜索框停止输入后开始过滤的延迟（毫秒）
+TABLE_ROW_HEIGHT = 24
+SEARCH_DELAY_MS = 150
+
+
+def build_table_data(results, rules):
+    """生成表格行、搜索索引和分类优先级（在工作线程中运行）"""
+    from iptv_extractor.names import normalize
+    rank = {category: i for i, category in enumerate(rules.order)}
+    rows = []
+    keys = []
+    ranks = []
+    for channel in results:
+        title = rules.titles.get(channel.category, channel.category)
+        rows.append((channel.name, title, channel.kind, channel.url))
+        # 与搜索词使用相同的规范化，字段之间用换行分隔，避免跨字段匹配
+        keys.append(normalize(f"{channel.name}\n{title}\n{channel.kind}\n{channel.url}"))
+        ranks.append(rank.get(channel.category, len(rank)))
+    return rows, keys, ranks
+
+
+class ResultTable:
+    """只渲染可见行的结果表格，支持边输入边过滤和点击列标题排序
+    
+    Treeview 中只保留与可见行数相同的条目，滚动时替换它们的内容，
+    因此几万条记录也不会拖慢界面。
+    """
+    
+    COLUMNS = (
+        ("name", "频道名称", 160),
+        ("category", "分类", 90),
+        ("format", "格式", 60),
+        ("url", "地址", 400),
+    )
+    
+    def __init__(self, parent, bg):
+        self.rows = []     # (名称, 分类, 格式, 地址)
+        self.keys = []     # 规范化后的搜索文本
+        self.ranks = []    # 分类优先级，按分类排序时使用
+        self.order = []    # 当前排序下的行号
+        self.view = []     # 过滤后的行号
+        self.query = ""
+        self.sort_column = None
+        self.sort_reverse = False
+        self.offset = 0
+        self.items = []
+        self.search_job = None
+        
+        self.frame = tk.Frame(parent, bg=bg)
+        
+        search_row = tk.Frame(self.frame, bg=bg)
+        search_row.pack(fill=tk.X, pady=(0, 5))
+        tk.Label(search_row, text="搜索：", bg=bg, font=("微软雅黑", 10)).pack(side=tk.LEFT)
+        self.search_var = tk.StringVar()
+        self.search_var.trace_add("write", self.on_search)
+        ttk.Entry(search_row, textvariable=self.search_var).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.count_var = tk.StringVar(value="0 条")
+        tk.Label(search_row, textvariable=self.count_var, bg=bg, font=("微软雅黑", 9)).pack(side=tk.RIGHT, padx=(10, 0))
+        
+        body = tk.Frame(self.frame, bg=bg)
+        body.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(
+            body,
+            columns=[column for column, _, _ in self.COLUMNS],
+            show="headings",
+            selectmode="browse",
+            height=1,
+            style="Result.Treeview"
+        )
+        for column, title, width in self.COLUMNS:
+            self.tree.heading(column, text=title, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, stretch=column == "url")
+        self.scrollbar = ttk.Scrollbar(body, command=self.on_scrollbar, style="TScrollbar")
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(3))
+    
+    def set_data(self, rows, keys, ranks):
+        """替换表格数据（rows、keys、ranks 由 build_table_data 生成）"""
+        self.rows, self.keys, self.ranks = rows, keys, ranks
+        self.order = list(range(len(rows)))
+        self.sort_column = None
+        self.sort_reverse = False
+        self.update_headings()
+        self.apply_filter(force=True)
+    
+    def clear(self):
+        """清空表格"""
+        self.set_data([], [], [])
+    
+    def on_resize(self, event):
+        """窗口大小变化时按可见行数增减 Treeview 条目"""
+        header = TABLE_ROW_HEIGHT
+        if self.items and self.tree.bbox(self.items[0]):
+            header = self.tree.bbox(self.items[0])[1]
+        count = max(1, (event.height - header) // TABLE_ROW_HEIGHT)
+        while len(self.items) < count:
+            self.items.append(self.tree.insert("", tk.END, values=()))
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+        self.refresh()
+    
+    def refresh(self):
+        """把当前滚动位置的记录填入可见条目并更新滚动条"""
+        total = len(self.view)
+        visible = len(self.items)
+        self.offset = max(0, min(self.offset, total - visible))
+        for i, item in enumerate(self.items):
+            position = self.offset + i
+            if position < total:
+                self.tree.move(item, "", i)
+                self.tree.item(item, values=self.rows[self.view[position]])
+            else:
+                self.tree.detach(item)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + visible) / total))
+        else:
+            self.scrollbar.set(0, 1)
+        self.count_var.set(f"{total} / {len(self.rows)} 条")
+    
+    def scroll(self, lines):
+        self.offset += lines
+        self.refresh()
+    
+    def on_scrollbar(self, action, value, unit=None):
+        """滚动条回调：拖动（moveto）或点击箭头/空白处（scroll）"""
+        if action == "moveto":
+            self.offset = int(float(value) * len(self.view))
+        elif unit == "pages":
+            self.offset += int(value) * max(1, len(self.items) - 1)
+        else:
+            self.offset += int(value)
+        self.refresh()
+    
+    def on_search(self, *args):
+        """输入搜索词时延迟过滤，连续输入只过滤一次"""
+        if self.search_job is not None:
+            self.tree.after_cancel(self.search_job)
+        self.search_job = self.tree.after(SEARCH_DELAY_MS, self.apply_filter)
+    
+    def apply_filter(self, force=False):
+        """按搜索词过滤；新搜索词包含上一次的搜索词时只在上次结果中查找"""
+        from iptv_extractor.names import normalize
+        self.search_job = None
+        query = normalize(self.search_var.get())
+        if not query:
+            self.view = list(self.order)
+        else:
+            candidates = self.view if self.query and self.query in query and not force else self.order
+            keys = self.keys
+            self.view = [i for i in candidates if query in keys[i]]
+        self.query = query
+        self.offset = 0
+        self.refresh()
+    
+    def sort_by(self, column):
+        """按列排序，再次点击同一列时反向"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        if column == "category":
+            ranks = self.ranks
+            key = lambda i: ranks[i]
+        else:
+            index = [c for c, _, _ in self.COLUMNS].index(column)
+            rows = self.rows
+            key = lambda i: rows[i][index]
+        self.order = sorted(range(len(self.rows)), key=key, reverse=self.sort_reverse)
+        self.update_headings()
+        self.apply_filter(force=True)
+    
+    def update_headings(self):
+        for column, title, _ in self.COLUMNS:
+            if column == self.sort_column:
+                title += " ▼" if self.sort_reverse else " ▲"
+            self.tree.heading(column, text=title)
+
+
 class IPTVExtractor:
     def __init__(self):
+        init_started = time.time()
         self.root = tk.Tk()
         self.root.title("IPTV频道提取工具")
         self.root.geometry("900x650")
         # 设置最小窗口尺寸，确保所有元素可见
         self.root.minsize(800, 650)
         
+        # 输入文件和选项未变化时直接使用上次的提取结果（窗口显示后在后台线程中创建）
+        self.cache = None
+        
+        # 工作线程不直接操作控件，而是把界面更新放入队列，由主线程批量执行
+        self.events = queue.Queue()
+        self.worker = None
+        self.cancel_event = None
+        
+        # 结果表格和提取引擎在第一次绘制窗口之后才创建和导入
+        self.table = None
+        self.engine_ready = threading.Event()
+        self.startup_times = {"module_started": MODULE_STARTED, "init_started": init_started}
+        
         # 设置现代化主题颜色
         self.primary_color = "#1976D2"  # 更深的蓝色主题
         self.accent_color = "#FF4081"   # 粉色强调色
@@ -23,14 +240,14 @@ class IPTVExtractor:
         
         self.root.configure(bg=self.bg_color)
         
-        # 预编译正则表达式提高性能
-        self.channel_pattern = re.compile(r"Authentication\.CUSetConfig\(.*?ChannelName=\"(.*?)\".*?TimeShiftURL=\"([^\"]*)", re.DOTALL)
-        
         # 配置ttk样式
         self.configure_styles()
         
         self.create_widgets()
         
+        # 任意控件第一次绘制时完成其余的初始化
+        self.root.bind("<Expose>", self.on_first_frame)
+        
     def configure_styles(self):
         """配置现代化的ttk样式"""
         style = ttk.Style()
@@ -271,6 +488,28 @@ class IPTVExtractor:
             style="TCheckbutton"
         ).pack(side=tk.LEFT, padx=5)
         
+        # 第三行选项
+        options_row3 = tk.Frame(options_frame, bg=self.card_bg)
+        options_row3.pack(fill=tk.X, pady=5)
+        
+        # 分类内按频道号排序
+        self.natural_sort_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            options_row3, 
+            text="按频道号排序", 
+            variable=self.natural_sort_var,
+            style="TCheckbutton"
+        ).pack(side=tk.LEFT, padx=(5, 15))
+        
+        # 性能分析选项：启用 cProfile 和 tracemalloc，并在输出文件旁保存报告
+        self.profile_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            options_row3, 
+            text="性能分析并保存报告", 
+            variable=self.profile_var,
+            style="TCheckbutton"
+        ).pack(side=tk.LEFT, padx=5)
+        
         # 进度条
         progress_frame = tk.Frame(left_inner, bg=self.card_bg)
         progress_frame.pack(fill=tk.X, pady=15)
@@ -305,6 +544,16 @@ class IPTVExtractor:
         )
         self.process_btn.pack(side=tk.LEFT, padx=5)
         
+        self.cancel_btn = ttk.Button(
+            button_frame, 
+            text="取消", 
+            command=self.cancel_processing,
+            style="TButton",
+            state=tk.DISABLED,
+            width=12
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        
         ttk.Button(
             button_frame, 
             text="清空结果", 
@@ -320,17 +569,37 @@ class IPTVExtractor:
         result_frame = ttk.LabelFrame(right_inner, text=" 提取结果 ", padding=(15, 10))
         result_frame.pack(fill=tk.BOTH, expand=True)
         
+        # 摘要行：左侧为统计文字，右侧为耗时统计
+        summary_row = tk.Frame(result_frame, bg=self.card_bg)
+        summary_row.pack(fill=tk.X)
+        
+        stats_frame = ttk.LabelFrame(summary_row, text=" 耗时统计 ", padding=(10, 5))
+        stats_frame.pack(side=tk.RIGHT, fill=tk.Y, padx=(8, 2), pady=5)
+        
+        self.stats_var = tk.StringVar(value="")
+        tk.Label(
+            stats_frame,
+            textvariable=self.stats_var,
+            justify=tk.LEFT,
+            anchor="nw",
+            width=24,
+            bg=self.bg_color,
+            font=("微软雅黑", 9),
+            fg=self.text_color
+        ).pack(fill=tk.BOTH, expand=True)
+        
         # 创建带边框的文本框
         text_container = tk.Frame(
-            result_frame,
+            summary_row,
             highlightbackground=self.border_color,
             highlightthickness=1,
             bd=0
         )
-        text_container.pack(fill=tk.BOTH, expand=True, padx=2, pady=5)
+        text_container.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=2, pady=5)
         
         self.result_text = tk.Text(
             text_container,
+            height=8,
             wrap=tk.WORD,
             font=("微软雅黑", 10),
             bd=0,
@@ -344,6 +613,9 @@ class IPTVExtractor:
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         self.result_text.config(yscrollcommand=scrollbar.set)
         
+        # 全部结果的表格在窗口显示后创建，见 create_result_table
+        self.result_frame = result_frame
+        
         # 版权信息
         footer_frame = tk.Frame(self.root, bg=self.bg_color)
         footer_frame.pack(side=tk.BOTTOM, fill=tk.X, pady=8)
@@ -356,11 +628,67 @@ class IPTVExtractor:
             font=("微软雅黑", 9)
         ).pack(side=tk.RIGHT, padx=20)
     
+    def on_first_frame(self, event):
+        """窗口第一次绘制后，在空闲时创建结果表格并开始预加载提取引擎"""
+        self.root.unbind("<Expose>")
+        self.startup_times["first_frame"] = time.time()
+        self.root.after_idle(self.finish_startup)
+    
+    def finish_startup(self):
+        """完成第一帧不需要的初始化"""
+        self.create_result_table()
+        threading.Thread(target=self.warm_up, daemon=True).start()
+        if os.environ.get(STARTUP_REPORT_ENV):
+            self.root.after(UI_POLL_MS, self.write_startup_report)
+    
+    def create_result_table(self):
+        """创建结果表格（只创建一次）"""
+        if self.table is not None:
+            return
+        style = ttk.Style()
+        style.configure(
+            "Result.Treeview",
+            font=("微软雅黑", 10),
+            rowheight=TABLE_ROW_HEIGHT
+        )
+        style.configure(
+            "Result.Treeview.Heading",
+            font=("微软雅黑", 10, "bold")
+        )
+        self.table = ResultTable(self.result_frame, self.card_bg)
+        self.table.frame.pack(fill=tk.BOTH, expand=True, padx=2, pady=5)
+        self.startup_times["table_ready"] = time.time()
+    
+    def warm_up(self):
+        """在后台线程中导入提取引擎、编译默认规则并打开缓存"""
+        import iptv_extractor.merge
+        import iptv_extractor.stats
+        from iptv_extractor.cache import ExtractCache
+        from iptv_extractor.core import ExtractOptions
+        try:
+            ExtractOptions().rules()
+        except Exception:
+            pass  # 规则错误在开始提取时再报告
+        if self.cache is None:
+            self.cache = ExtractCache()
+        self.startup_times["engine_ready"] = time.time()
+        self.engine_ready.set()
+    
+    def write_startup_report(self):
+        """提取引擎就绪后写入启动耗时报告并退出"""
+        if not self.engine_ready.is_set():
+            self.root.after(UI_POLL_MS, self.write_startup_report)
+            return
+        with open(os.environ[STARTUP_REPORT_ENV], "w", encoding="utf-8") as f:
+            json.dump(self.startup_times, f)
+        self.root.destroy()
+    
     def select_input_file(self):
         """选择输入文件"""
         file_path = filedialog.askopenfilename(
-            title="选择JSP文件",
-            filetypes=[("JSP文件", "*.jsp"), ("文本文件", "*.txt"), ("所有文件", "*.*")]
+            title="选择JSP文件或抓包",
+            filetypes=[("JSP文件", "*.jsp"), ("抓包文件", "*.pcap *.pcapng *.cap"), ("文本文件", "*.txt"),
+                       ("所有文件", "*.*")]
         )
         if file_path:
             self.input_entry.delete(0, tk.END)
@@ -384,6 +712,7 @@ class IPTVExtractor:
                 ("文本文件", "*.txt"), 
                 ("M3U文件", "*.m3u"),
                 ("M3U8文件", "*.m3u8"),
+                ("JSON文件", "*.json"),
                 ("所有文件", "*.*")
             ]
         )
@@ -391,166 +720,20 @@ class IPTVExtractor:
             self.output_entry.delete(0, tk.END)
             self.output_entry.insert(0, file_path)
     
-    def extract_channels(self, content):
-        """从内容中提取频道信息"""
-        results = []
-        skipped_channels = []  # 记录跳过的频道
-        skipped_shopping_channels = []  # 记录跳过的购物频道
-        skipped_mongolian_channels = []  # 记录跳过的蒙语频道
-        extract_smil = self.extract_smil_var.get()
-        extract_m3u8 = self.extract_m3u8_var.get()
-        skip_shopping = self.skip_shopping_var.get()
-        skip_mongolian = self.skip_mongolian_var.get()  # 获取是否跳过蒙语频道的设置
-        
-        # 使用预编译的正则表达式提高性能
-        matches = self.channel_pattern.findall(content)
-        
-        # 处理匹配结果
-        for name, url in matches:
-            # 跳过包含"购物"关键词的频道
-            if skip_shopping and "购物" in name:
-                skipped_shopping_channels.append(name)
-                continue
-            
-            # 跳过蒙语频道
-            if skip_mongolian and ("蒙语" in name or "蒙文" in name or "蒙古语" in name):
-                skipped_mongolian_channels.append(name)
-                continue
-
-            added = False
-            
-            # 如果URL为空或不包含有效地址，则跳过并记录
-            if not url or url.startswith("/-?") or (not ".smil" in url and not ".m3u8" in url):
-                skipped_channels.append(name)
-                continue
-            
-            # 根据用户选择的格式进行处理
-            if extract_smil and ".smil" in url:
-                smil_index = url.rfind(".smil")
-                if smil_index != -1:
-                    results.append((name, f"{name},{url[:smil_index+5]}"))
-                    added = True
-            
-            if extract_m3u8 and ".m3u8" in url:
-                m3u8_index = url.rfind(".m3u8")
-                if m3u8_index != -1:
-                    results.append((name, f"{name},{url[:m3u8_index+5]}"))
-                    added = True
-            
-            # 如果两种格式都没选，或URL中没有这两种格式，则保留原URL
-            if not added and (not extract_smil and not extract_m3u8 or 
-                             not (".smil" in url or ".m3u8" in url)):
-                results.append((name, f"{name},{url}"))
-        
-        # 对结果进行排序
-        sorted_results = self.sort_channels(results)
-        
-        return sorted_results, skipped_channels, skipped_shopping_channels, skipped_mongolian_channels
+    def get_options(self):
+        """根据复选框状态生成提取选项"""
+        from iptv_extractor.core import ExtractOptions
+        return ExtractOptions(
+            extract_smil=self.extract_smil_var.get(),
+            extract_m3u8=self.extract_m3u8_var.get(),
+            skip_shopping=self.skip_shopping_var.get(),
+            skip_mongolian=self.skip_mongolian_var.get(),
+            natural_sort=self.natural_sort_var.get()
+        )
     
     def start_processing(self):
         """在新线程中启动处理"""
-        self.process_btn.config(state=tk.DISABLED)
-        self.status_var.set("正在处理...")
-        self.progress["value"] = 0
-        
-        # 启动新线程处理文件
-        threading.Thread(target=self.process_files, daemon=True).start()
-    
-    def sort_channels(self, channels):
-        """对频道进行排序"""
-        # 创建不同类别的列表
-        categories = {
-            'cctv_hd_4k': [],  # CCTV高清/4K频道
-            'weishi_hd': [],   # 卫视高清频道
-            'bendi': [],       # 本地频道
-            'other_hd': [],    # 其他高清频道
-            'weishi': [],      # 卫视标清(不含高清)
-            'others': []       # 其他频道
-        }
-        
-        # 对频道进行分类
-        for name, full_info in channels:
-            # CCTV高清或4K频道
-            if "CCTV" in name and ("高清" in name or "4K" in name):
-                categories['cctv_hd_4k'].append(full_info)
-            # 卫视高清频道
-            elif "卫视" in name and "高清" in name and "内蒙古" not in name:
-                categories['weishi_hd'].append(full_info)
-            # 本地区频道
-            elif ("内蒙古" in name and "高清" in name) or "呼和浩特" in name:
-                categories['bendi'].append(full_info)
-            # 其他高清频道
-            elif "高清" in name and "卫视" not in name and "内蒙古" not in name:
-                categories['other_hd'].append(full_info)
-            # 卫视标清(不含高清)
-            elif "卫视" in name:
-                categories['weishi'].append(full_info)
-            # 其他所有频道
-            else:
-                categories['others'].append(full_info)
-        
-        # 按照优先级顺序合并结果
-        return (categories['cctv_hd_4k'] + categories['weishi_hd'] + 
-                categories['bendi'] + categories['other_hd'] + 
-                categories['weishi'] + categories['others'])
-    
-    def format_results_with_headers(self, results):
-        """为分类的结果添加标题行"""
-        # 创建不同类别的列表
-        categories = {
-            'cctv_hd_4k': [],  # CCTV高清/4K频道
-            'weishi_hd': [],   # 卫视高清频道
-            'bendi': [],       # 本地频道
-            'other_hd': [],    # 其他高清频道
-            'weishi': [],      # 卫视标清(不含高清)
-            'others': []       # 其他频道
-        }
-        
-        # 分类标题映射
-        category_titles = {
-            'cctv_hd_4k': '央视高清,#genre#',
-            'weishi_hd': '卫视高清,#genre#',
-            'bendi': '本地频道,#genre#',
-            'other_hd': '其他高清,#genre#',
-            'weishi': '卫视标清,#genre#',
-            'others': '其他频道,#genre#'
-        }
-        
-        # 对频道进行分类
-        for item in results:
-            name = item.split(',')[0]  # 从结果中提取频道名称
-            
-            # CCTV高清或4K频道
-            if "CCTV" in name and ("高清" in name or "4K" in name):
-                categories['cctv_hd_4k'].append(item)
-            # 卫视高清频道
-            elif "卫视" in name and "高清" in name and "内蒙古" not in name:
-                categories['weishi_hd'].append(item)
-            # 本地区频道
-            elif ("内蒙古" in name and "高清" in name) or "呼和浩特" in name:
-                categories['bendi'].append(item)
-            # 其他高清频道
-            elif "高清" in name and "卫视" not in name and "内蒙古" not in name:
-                categories['other_hd'].append(item)
-            # 卫视标清(不含高清)
-            elif "卫视" in name:
-                categories['weishi'].append(item)
-            # 其他所有频道
-            else:
-                categories['others'].append(item)
-        
-        # 合并结果，添加分类标题
-        formatted_results = []
-        for category, title in category_titles.items():
-            if categories[category]:  # 只有当该分类有频道时才添加标题
-                formatted_results.append(title)
-                formatted_results.extend(categories[category])
-                # 不添加空行，保持格式一致性
-        
-        return formatted_results
-    
-    def process_files(self):
-        """处理文件主逻辑"""
+        # 控件的值在主线程中读取后再交给工作线程
         input_path = self.input_entry.get()
         output_path = self.output_entry.get()
         
@@ -558,41 +741,127 @@ class IPTVExtractor:
             self.show_error("请先选择输入和输出文件")
             return
         
+        self.process_btn.config(state=tk.DISABLED)
+        self.cancel_btn.config(state=tk.NORMAL)
+        self.status_var.set("正在处理...")
+        self.progress["value"] = 0
+        self.cancel_event = threading.Event()
+        
+        # 启动新线程处理文件
+        self.worker = threading.Thread(
+            target=self.process_files,
+            args=(input_path, output_path, self.get_options(), self.cancel_event, self.profile_var.get()),
+            daemon=True
+        )
+        self.worker.start()
+        self.root.after(UI_POLL_MS, self.drain_events)
+    
+    def cancel_processing(self):
+        """请求取消正在进行的处理"""
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+            self.cancel_btn.config(state=tk.DISABLED)
+            self.status_var.set("正在取消...")
+    
+    def post(self, handler, *args):
+        """在工作线程中调用：把界面更新放入队列，由主线程执行"""
+        self.events.put((handler, args))
+    
+    def drain_events(self):
+        """在主线程中批量执行队列中的界面更新"""
+        progress = None
+        for _ in range(UI_BATCH_SIZE):
+            try:
+                handler, args = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if handler == self.set_progress:
+                # 同一批中的进度只需显示最新的一次
+                progress = args
+                continue
+            if progress is not None:
+                self.set_progress(*progress)
+                progress = None
+            handler(*args)
+        if progress is not None:
+            self.set_progress(*progress)
+        
+        # 工作线程结束且队列清空后停止轮询
+        if (self.worker is not None and self.worker.is_alive()) or not self.events.empty():
+            self.root.after(UI_POLL_MS, self.drain_events)
+    
+    def set_progress(self, value, status):
+        """更新进度条和状态文字"""
+        self.progress["value"] = value
+        self.status_var.set(status)
+    
+    def finish_processing(self, status):
+        """处理结束后恢复按钮状态"""
+        self.process_btn.config(state=tk.NORMAL)
+        self.cancel_btn.config(state=tk.DISABLED)
+        if status:
+            self.status_var.set(status)
+    
+    def process_files(self, input_path, output_path, options, cancel_event, profile=False):
+        """处理文件主逻辑（在工作线程中运行，只通过 post 更新界面）
+        
+        profile 为 True 时启用 cProfile 和 tracemalloc，并把报告保存在输出文件旁。
+        """
+        from iptv_extractor.cache import ExtractCache
+        from iptv_extractor.core import ExtractCancelled, ExtractError, extract_file, write_results
+        from iptv_extractor.stats import RunStats
+        
+        if self.cache is None:
+            self.cache = ExtractCache()
+        last_percent = -1
+        
+        def on_progress(done, total):
+            # 每处理一条记录都会调用，只在百分比变化时发送事件
+            nonlocal last_percent
+            percent = done * 100 // total
+            if percent != last_percent:
+                last_percent = percent
+                self.post(self.set_progress, percent * EXTRACT_PROGRESS / 100, f"正在提取... {percent}%")
+        
+        status = None
+        stats = RunStats(profile=profile, trace_memory=profile)
         try:
-            # 读取文件内容
-            with open(input_path, "r", encoding="utf-8") as f:
-                content = f.read()
+            with stats.capture(output_path + ".prof" if profile else None):
+                # 提取频道信息
+                extracted = extract_file(input_path, options, self.cache, on_progress, cancel_event, stats)
+                results = extracted.results
+                
+                self.post(self.set_progress, EXTRACT_PROGRESS, "正在保存...")
+                
+                # 保存带有分类标题的结果
+                with stats.stage("write"):
+                    write_results(output_path, results, options.rules())
             
-            self.progress["value"] = 30
+            self.post(self.set_progress, 100, "保存完成")
             
-            # 提取频道信息
-            results, skipped_channels, skipped_shopping_channels, skipped_mongolian_channels = self.extract_channels(content)
+            report_path = None
+            if profile:
+                report_path = output_path + ".stats.json"
+                stats.write_json(report_path)
+            self.post(self.show_stats, stats.summary_lines(), stats.counters, report_path)
             
-            self.progress["value"] = 60
-            
-            if not results:
-                self.show_error("未找到任何有效频道信息")
-                return
-            
-            # 获取带有分类标题的格式化结果
-            formatted_results = self.format_results_with_headers(results)
-            
-            # 保存为CSV（使用utf-8-sig解决Excel乱码问题）
-            with open(output_path, "w", encoding="utf-8-sig") as f:
-                f.write("\n".join(formatted_results))
-            
-            self.progress["value"] = 100
+            # 表格数据和搜索索引在工作线程中生成
+            table_data = build_table_data(results, options.rules())
             
             # 显示处理结果
-            self.show_results(results, skipped_channels, skipped_shopping_channels, skipped_mongolian_channels)
+            self.post(self.show_results, results, extracted.skipped_channels, extracted.skipped_shopping_channels, extracted.skipped_mongolian_channels, output_path, table_data)
+            status = f"处理完成，共提取 {len(results)} 条记录"
             
+        except ExtractCancelled:
+            self.post(self.set_progress, 0, "已取消")
+        except ExtractError as e:
+            self.post(self.show_error, str(e))
         except Exception as e:
-            self.show_error(f"处理失败：\n{str(e)}")
+            self.post(self.show_error, f"处理失败：\n{str(e)}")
         finally:
-            self.process_btn.config(state=tk.NORMAL)
-            self.status_var.set(f"处理完成，共提取 {len(results) if 'results' in locals() else 0} 条记录")
+            self.post(self.finish_processing, status)
     
-    def show_results(self, results, skipped_channels, skipped_shopping_channels, skipped_mongolian_channels):
+    def show_results(self, results, skipped_channels, skipped_shopping_channels, skipped_mongolian_channels, output_path, table_data):
         """在结果区域显示提取结果"""
         self.result_text.delete(1.0, tk.END)
         
@@ -600,16 +869,11 @@ class IPTVExtractor:
         self.result_text.insert(tk.END, f"成功提取 {len(results)} 条记录\n")
         self.result_text.insert(tk.END, f"跳过 {len(skipped_channels)} 条无效地址记录\n")
         self.result_text.insert(tk.END, f"跳过 {len(skipped_shopping_channels)} 条购物频道\n")
-        self.result_text.insert(tk.END, f"跳过 {len(skipped_mongolian_channels)} 条蒙语频道\n\n")
+        self.result_text.insert(tk.END, f"跳过 {len(skipped_mongolian_channels)} 条蒙语频道\n")
         
-        # 显示前5条记录作为示例
-        self.result_text.insert(tk.END, "示例数据：\n")
-        for i, result in enumerate(results[:5]):
-            self.result_text.insert(tk.END, f"{i+1}. {result}\n")
-        
-        # 如果有更多记录，显示省略信息
-        if len(results) > 5:
-            self.result_text.insert(tk.END, f"\n... 还有 {len(results)-5} 条记录\n")
+        # 全部记录显示在表格中
+        self.create_result_table()
+        self.table.set_data(*table_data)
         
         # 显示部分跳过的频道
         if skipped_channels:
@@ -639,7 +903,20 @@ class IPTVExtractor:
                 self.result_text.insert(tk.END, f"... 还有 {len(skipped_mongolian_channels)-3} 个蒙语频道\n")
         
         # 显示输出文件路径
-        self.result_text.insert(tk.END, f"\n完整数据已保存至：\n{self.output_entry.get()}")
+        self.result_text.insert(tk.END, f"\n完整数据已保存至：\n{output_path}")
+    
+    def show_stats(self, lines, counters, report_path):
+        """在耗时统计面板中显示各阶段耗时和计数"""
+        lines = list(lines)
+        lines.append("")
+        lines.append(f"有效记录：{counters.get('matched', 0)}")
+        lines.append(f"无效地址：{counters.get('skipped_invalid', 0)}")
+        lines.append(f"购物频道：{counters.get('skipped_shopping', 0)}")
+        lines.append(f"蒙语频道：{counters.get('skipped_mongolian', 0)}")
+        if report_path:
+            lines.append("")
+            lines.append(f"报告：{os.path.basename(report_path)}")
+        self.stats_var.set("\n".join(lines))
     
     def show_error(self, message):
         """显示错误信息"""
@@ -650,6 +927,9 @@ class IPTVExtractor:
     def clear_results(self):
         """清空结果区域"""
         self.result_text.delete(1.0, tk.END)
+        if self.table is not None:
+            self.table.clear()
+        self.stats_var.set("")
         self.progress["value"] = 0
         self.status_var.set("准备就绪")
     
@@ -657,6 +937,7 @@ class IPTVExtractor:
         """运行应用程序"""
         self.root.mainloop()
 
+
 if __name__ == "__main__":
     app = IPTVExtractor()
     app.run()
\ No newline at end of file
@@ -0,0 +1,87 @@
+"""抓包直接提取的基准测试：不同大小的 pcap 的提取耗时和内存峰值
+
+用 make_corpus.py 生成JSP，再用 make_capture.py 包装成含有 --noise MB 无关流量的抓包
+（分块传输、gzip、乱序和重传都打开）。每个大小在独立子进程中提取，峰值内存取自
+ru_maxrss（仅限类Unix系统），结果与直接提取JSP的结果比较。内存峰值应当与抓包大小无关。
+用法：python benchmarks/bench_capture.py [--channels 10000] [--noise 20 200] [--format pcapng]
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from make_capture import write_capture
+from make_corpus import write_corpus
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {tool_dir!r})
+from iptv_extractor.core import extract_file
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+start = time.perf_counter()
+results = extract_file({path!r}).results
+elapsed = time.perf_counter() - start
+peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 if resource else None
+print(json.dumps({{"seconds": elapsed, "peak": peak, "results": [channel.astuple() for channel in results]}}))
+"""
+
+
+def run_child(path):
+    """在子进程中提取，返回 {seconds, peak, results}"""
+    code = CHILD.format(tool_dir=TOOL_DIR, path=path)
+    return json.loads(subprocess.run([sys.executable, "-c", code], check=True,
+                                     capture_output=True, text=True).stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓包直接提取的基准测试")
+    parser.add_argument("--channels", type=int, default=10000, help="JSP中的频道数")
+    parser.add_argument("--noise", type=float, nargs="+", default=[20, 200], help="无关流量的大小（MB）")
+    parser.add_argument("--format", choices=("pcap", "pcapng"), default="pcap", help="抓包格式")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsp = os.path.join(tmp, "getchannellistHWCU.jsp")
+        write_corpus(jsp, args.channels)
+        reference = run_child(jsp)
+        print(f"直接提取JSP（{os.path.getsize(jsp) / 1024 / 1024:.1f} MB）：{reference['seconds']:.3f}s，"
+              f"{len(reference['results'])} 条记录")
+
+        peaks = []
+        correct = True
+        for noise in args.noise:
+            capture = os.path.join(tmp, f"capture.{args.format}")
+            write_capture(capture, jsp, args.format, int(noise * 1024 * 1024), chunked=True, compress=True,
+                          reorder=True)
+            size = os.path.getsize(capture)
+            run = run_child(capture)
+            same = run["results"] == reference["results"]
+            correct = correct and same
+            peak = f"，峰值内存 {run['peak'] / 1024 / 1024:.1f} MB" if run["peak"] else ""
+            if run["peak"]:
+                peaks.append(run["peak"])
+            # 响应在抓包中间，读完响应后即停止，只读取约一半的数据
+            print(f"抓包 {size / 1024 / 1024:.1f} MB：{run['seconds']:.3f}s"
+                  f"（{size / 2 / 1024 / 1024 / run['seconds']:.0f} MB/s）{peak}，结果{'一致' if same else '不一致'}")
+            os.remove(capture)
+
+    if len(peaks) > 1:
+        flat = max(peaks) < min(peaks) * 1.5
+        print(f"内存峰值{'与抓包大小无关' if flat else '随抓包大小增长'}")
+        correct = correct and flat
+    return 0 if correct else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,77 @@
+"""在本地模拟的 RTSP 服务器上运行隐藏频道发现，检查结果、速率限制和断点续测
+
+模拟服务器只对“已知”和“隐藏”的频道ID返回 200。先用 --limit 检测一部分后中断，
+再次运行从检查点继续，最后核对发现的地址是否恰好是隐藏的那些。
+用法：python benchmarks/bench_discover.py [--channels 200] [--hidden 10] [--rate 500]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_probe import start_server
+from iptv_extractor import discover
+from iptv_extractor.merge import read_playlist
+
+FIRST_ID = 3221226000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="隐藏频道发现测试")
+    parser.add_argument("--channels", type=int, default=200, help="已知频道数")
+    parser.add_argument("--hidden", type=int, default=10, help="隐藏频道数")
+    parser.add_argument("--spread", type=int, default=3, help="ID范围是已知频道数的几倍")
+    parser.add_argument("--rate", type=float, default=500, help="每秒最多发起的请求数")
+    parser.add_argument("--seed", type=int, default=1, help="随机种子")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    ids = rng.sample(range(FIRST_ID, FIRST_ID + args.channels * args.spread), args.channels + args.hidden)
+    known, hidden = ids[:args.channels], set(ids[args.channels:])
+    alive = set(ids)
+    port = start_server(alive=lambda target: any(f"/{i}/" in target for i in alive))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        playlist = os.path.join(tmp, "全部频道.csv")
+        with open(playlist, "w", encoding="utf-8") as f:
+            for i in sorted(known):
+                f.write(f"频道{i},rtsp://127.0.0.1:{port}/PLTV/88888912/224/{i}/{rng.randrange(10 ** 9)}.smil\n")
+        output = os.path.join(tmp, "隐藏频道.txt")
+        base = [playlist, "-o", output, "--margin", "5", "--rate", str(args.rate),
+                "-c", "32", "--per-host", "16", "--timeout", "1", "-q"]
+
+        # 第一次只检测一部分，模拟中断
+        start = time.perf_counter()
+        discover.main(base + ["--limit", str(args.channels)])
+        first = time.perf_counter() - start
+        checked = sum(len(ids) for ids in discover.load_checkpoint(output + ".checkpoint.json").values())
+
+        start = time.perf_counter()
+        discover.main(base)
+        second = time.perf_counter() - start
+        total = sum(len(ids) for ids in discover.load_checkpoint(output + ".checkpoint.json").values())
+
+        found = {discover.split_url(channel.url)[1] for channel in read_playlist(output)}
+        # 再运行一次：所有候选都已检测过，不应有新的请求
+        start = time.perf_counter()
+        discover.main(base)
+        third = time.perf_counter() - start
+        lines = len(read_playlist(output))
+
+    print(f"已知 {len(known)} 个，隐藏 {len(hidden)} 个，候选 {total} 个")
+    print(f"第一次检测 {checked} 个，耗时 {first:.3f}s（{checked / first:.0f} 个/s，限制 {args.rate:.0f} 个/s）")
+    print(f"续测 {total - checked} 个，耗时 {second:.3f}s；全部完成后再次运行耗时 {third:.3f}s")
+    correct = found == hidden and lines == len(hidden)
+    print(f"发现 {len(found)} 个，{'正确' if correct else '错误'}")
+    return 0 if correct else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
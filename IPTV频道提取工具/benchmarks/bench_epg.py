@@ -0,0 +1,87 @@
+"""节目单基准测试：不同大小的 XMLTV 文件的索引、匹配和精简耗时及内存峰值
+
+合成的节目单中一部分频道与提取结果同名（CCTV-1、北京卫视……），其余为无关频道，
+每个频道有 --programmes 个节目。内存峰值用 tracemalloc 测量，应当与节目单大小无关。
+用法：python benchmarks/bench_epg.py [--channels 200 2000] [--programmes 200] [--gzip]
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from xml.sax.saxutils import escape, quoteattr
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from iptv_extractor.core import make_channel
+from iptv_extractor.epg import load_epg, write_trimmed_epg
+
+# 提取结果中的频道名称和节目单中的叫法
+PUBLISHED = [(f"CCTV-{i}高清", f"CCTV{i}") for i in range(1, 18)] + [
+    ("北京卫视高清", "北京卫视"), ("湖南卫视4K", "湖南卫视"), ("内蒙古卫视", "内蒙古卫视"),
+]
+
+
+def write_xmltv(path, channels, programmes, compress):
+    """写入合成的节目单，返回文件大小"""
+    opener = gzip.open if compress else open
+    names = [epg_name for _, epg_name in PUBLISHED] + [f"其他频道{i}" for i in range(channels - len(PUBLISHED))]
+    with opener(path, "wt", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n<tv generator-info-name="bench">\n')
+        for i, name in enumerate(names):
+            f.write(f'  <channel id="{i}"><display-name lang="zh">{escape(name)}</display-name>'
+                    f'<icon src="http://logo.example/{i}.png"/></channel>\n')
+        for i in range(len(names)):
+            for j in range(programmes):
+                f.write(f'  <programme start="20240101{j % 24:02d}0000 +0800" channel="{i}">'
+                        f'<title lang="zh">{escape(names[i])} 节目{j}</title>'
+                        f'<desc lang="zh">{quoteattr("第" + str(j) + "集")}</desc></programme>\n')
+        f.write("</tv>\n")
+    return os.path.getsize(path)
+
+
+def measure(func):
+    """返回 (结果, 秒数, 内存峰值字节数)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="节目单基准测试")
+    parser.add_argument("--channels", type=int, nargs="+", default=[200, 2000], help="节目单中的频道数")
+    parser.add_argument("--programmes", type=int, default=200, help="每个频道的节目数")
+    parser.add_argument("--gzip", action="store_true", help="生成 .xml.gz 节目单")
+    args = parser.parse_args()
+
+    results = [make_channel(name, f"rtsp://10.0.0.1/{i}.smil") for i, (name, _) in enumerate(PUBLISHED)]
+    peaks = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in args.channels:
+            source = os.path.join(tmp, f"epg{count}.xml" + (".gz" if args.gzip else ""))
+            size = write_xmltv(source, count, args.programmes, args.gzip)
+            epg, index_time, index_peak = measure(lambda: load_epg(source))
+            matched = sum(1 for channel in results if epg.find(channel.name) is not None)
+            output = os.path.join(tmp, "trimmed.xml")
+            kept, trim_time, trim_peak = measure(lambda: write_trimmed_epg(source, output, epg.ids(results)))
+            peaks.append(trim_peak)
+            print(f"{count} 个频道，{count * args.programmes} 个节目，{size / 1024 / 1024:.1f} MB：")
+            print(f"  索引 {index_time:.3f}s（峰值 {index_peak / 1024:.0f} KB），匹配 {matched}/{len(results)}")
+            print(f"  精简 {trim_time:.3f}s（{size / 1024 / 1024 / trim_time:.1f} MB/s，峰值 {trim_peak / 1024:.0f} KB），"
+                  f"保留 {kept[0]} 个频道、{kept[1]} 个节目，{os.path.getsize(output) / 1024:.0f} KB")
+    # 节目单变大时精简的内存峰值不应明显增长
+    flat = max(peaks) < 2 * min(peaks) + 256 * 1024
+    print(f"内存峰值{'与节目单大小无关' if flat else '随节目单大小增长'}")
+    return 0 if flat else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
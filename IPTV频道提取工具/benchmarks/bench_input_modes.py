@@ -0,0 +1,79 @@
+"""对比三种读取方式的耗时和峰值内存：整体读入、分块流式读取、内存映射
+
+每种方式在独立子进程中运行，峰值内存取自子进程的 ru_maxrss（仅限类Unix系统）。
+用法：python benchmarks/bench_input_modes.py [--size 64] [--input 文件]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_DIR = os.path.dirname(BENCH_DIR)
+
+MODES = {
+    "read": "from iptv_extractor.scanner import iter_cusetconfig\n"
+            "calls = iter_cusetconfig(open(path, encoding='utf-8').read())",
+    "stream": "from iptv_extractor.scanner import iter_cusetconfig_stream\n"
+              "calls = iter_cusetconfig_stream(open(path, encoding='utf-8'))",
+    "mmap": "from iptv_extractor.scanner import iter_cusetconfig_mmap\n"
+            "calls = iter_cusetconfig_mmap(path, fields=('ChannelName', 'TimeShiftURL'))",
+}
+
+# 子进程会继承父进程的 ru_maxrss，因此合成文件也在子进程中生成
+GENERATE = """
+import sys
+sys.path.insert(0, {bench_dir!r})
+from bench_scanner import make_dump
+content, _ = make_dump({size!r}, 0.02)
+with open({path!r}, "w", encoding="utf-8") as f:
+    f.write(content)
+"""
+
+CHILD = """
+import resource, sys, time
+sys.path.insert(0, {tool_dir!r})
+path = {path!r}
+start = time.perf_counter()
+{setup}
+count = sum(1 for call in calls if 'ChannelName' in call)
+elapsed = time.perf_counter() - start
+print(count, elapsed, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+"""
+
+
+def run_mode(mode, path):
+    code = CHILD.format(tool_dir=TOOL_DIR, path=path, setup=MODES[mode])
+    out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+    count, elapsed, maxrss = out.split()
+    return int(count), float(elapsed), int(maxrss) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="读取方式基准测试")
+    parser.add_argument("--size", type=float, default=64, help="合成文件大小(MB)")
+    parser.add_argument("--input", help="使用已有的JSP文件而不是合成文件")
+    args = parser.parse_args()
+
+    path = args.input
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".jsp")
+        os.close(fd)
+        code = GENERATE.format(bench_dir=BENCH_DIR, size=args.size, path=path)
+        subprocess.run([sys.executable, "-c", code], check=True)
+
+    try:
+        print(f"输入文件：{path} ({os.path.getsize(path) / 1024 / 1024:.1f} MB)")
+        print(f"{'方式':>8} {'频道数':>8} {'耗时(s)':>8} {'峰值RSS(MB)':>12}")
+        for mode in MODES:
+            count, elapsed, maxrss = run_mode(mode, path)
+            print(f"{mode:>8} {count:>8} {elapsed:>8.3f} {maxrss:>12.1f}")
+    finally:
+        if args.input is None:
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
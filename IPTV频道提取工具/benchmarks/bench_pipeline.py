@@ -0,0 +1,147 @@
+"""提取流程各阶段的基准测试：扫描、提取分类、排序、格式化和写文件
+
+每个规模在独立子进程中运行，峰值内存取自子进程的 ru_maxrss（仅限类Unix系统）。
+--save 把结果保存为基线，--baseline 与已保存的基线对比，
+任一阶段变慢超过 --tolerance 时以退出码 1 结束，可用于发现性能回退。
+用法：python benchmarks/bench_pipeline.py [--channels 1000 10000 100000] [--save baseline.json]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_DIR = os.path.dirname(BENCH_DIR)
+
+sys.path.insert(0, BENCH_DIR)
+
+from make_corpus import write_corpus
+
+STAGES = ("scan", "extract", "sort", "format", "write")
+
+CHILD = """
+import json, sys, time
+sys.path.insert(0, {tool_dir!r})
+from iptv_extractor.core import CHANNEL_FIELDS, ExtractOptions, extract_channels, format_results_with_headers, sort_channels, write_results
+from iptv_extractor.scanner import iter_cusetconfig_file
+try:
+    import resource
+except ImportError:  # Windows 没有 resource 模块
+    resource = None
+
+timings = {{}}
+def stage(name, func):
+    start = time.perf_counter()
+    result = func()
+    timings[name] = time.perf_counter() - start
+    return result
+
+options = ExtractOptions()
+rules = options.rules()
+calls = stage("scan", lambda: list(iter_cusetconfig_file({path!r}, fields=CHANNEL_FIELDS)))
+extracted = stage("extract", lambda: extract_channels(calls, options))
+results = stage("sort", lambda: sort_channels(extracted.results, rules))
+lines = stage("format", lambda: format_results_with_headers(results, rules))
+stage("write", lambda: write_results({output!r}, results, rules))
+maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+if maxrss and sys.platform == "darwin":
+    maxrss //= 1024  # macOS 的单位是字节
+print(json.dumps({{"calls": len(calls), "records": len(results), "timings": timings, "maxrss_kb": maxrss}}))
+"""
+
+
+def run_size(channels, workdir, seed, repeat):
+    """生成指定规模的合成文件，在子进程中测量各阶段耗时（取多次中的最小值）"""
+    path = os.path.join(workdir, f"corpus_{channels}_{seed}.jsp")
+    if not os.path.exists(path):
+        write_corpus(path, channels, seed)
+    output = os.path.join(workdir, "out.csv")
+    code = CHILD.format(tool_dir=TOOL_DIR, path=path, output=output)
+
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True).stdout
+        run = json.loads(out)
+        if best is None:
+            best = run
+        else:
+            for stage in STAGES:
+                best["timings"][stage] = min(best["timings"][stage], run["timings"][stage])
+            best["maxrss_kb"] = min(filter(None, (best["maxrss_kb"], run["maxrss_kb"])), default=None)
+
+    total = sum(best["timings"].values())
+    best["channels"] = channels
+    best["bytes"] = os.path.getsize(path)
+    best["seconds"] = total
+    best["records_per_second"] = best["calls"] / total
+    best["mb_per_second"] = best["bytes"] / 1024 / 1024 / total
+    return best
+
+
+def compare(results, baseline, tolerance):
+    """与基线对比，返回变慢超过容差的 (规模, 阶段, 基线耗时, 当前耗时) 列表"""
+    previous = {run["channels"]: run for run in baseline["runs"]}
+    regressions = []
+    for run in results:
+        old = previous.get(run["channels"])
+        if old is None:
+            continue
+        for stage in STAGES + ("total",):
+            before = old["seconds"] if stage == "total" else old["timings"][stage]
+            after = run["seconds"] if stage == "total" else run["timings"][stage]
+            # 太短的阶段受噪声影响大，不参与比较
+            if before >= 0.005 and after > before * (1 + tolerance):
+                regressions.append((run["channels"], stage, before, after))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提取流程基准测试")
+    parser.add_argument("--channels", type=int, nargs="+", default=[1000, 10000, 100000],
+                        help="合成文件的频道调用数（可指定多个，最大可到1000000）")
+    parser.add_argument("--seed", type=int, default=0, help="合成文件的随机种子")
+    parser.add_argument("--repeat", type=int, default=3, help="每个规模重复次数，取最小值")
+    parser.add_argument("--workdir", help="合成文件目录（默认使用临时目录，指定后可复用已生成的文件）")
+    parser.add_argument("--save", help="把结果保存为基线JSON")
+    parser.add_argument("--baseline", help="与已保存的基线JSON对比")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="允许变慢的比例（默认：0.2）")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = args.workdir or tmp
+        os.makedirs(workdir, exist_ok=True)
+        results = [run_size(channels, workdir, args.seed, args.repeat) for channels in args.channels]
+
+    print(f"{'频道数':>8} {'MB':>7} " + " ".join(f"{stage + '(s)':>10}" for stage in STAGES)
+          + f" {'记录/s':>10} {'MB/s':>7} {'峰值RSS(MB)':>12}")
+    for run in results:
+        rss = f"{run['maxrss_kb'] / 1024:.1f}" if run["maxrss_kb"] else "-"
+        print(f"{run['channels']:>8} {run['bytes'] / 1024 / 1024:>7.1f} "
+              + " ".join(f"{run['timings'][stage]:>10.4f}" for stage in STAGES)
+              + f" {run['records_per_second']:>10.0f} {run['mb_per_second']:>7.1f} {rss:>12}")
+
+    if args.save:
+        data = {"python": platform.python_version(), "machine": platform.machine(), "runs": results}
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        print(f"基线已保存至：{args.save}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for channels, stage, before, after in regressions:
+            print(f"[变慢] {channels} 个频道 {stage}：{before:.4f}s -> {after:.4f}s "
+                  f"(+{(after / before - 1) * 100:.0f}%)")
+        if regressions:
+            return 1
+        print(f"与基线 {args.baseline} 相比没有超过 {args.tolerance:.0%} 的变慢")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
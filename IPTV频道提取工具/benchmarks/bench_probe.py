@@ -0,0 +1,132 @@
+"""在本地模拟的 RTSP/HTTP 服务器上检测地址可用性，对比逐个检测和并发检测的耗时
+
+模拟服务器在同一端口上同时应答 RTSP 和 HTTP 请求：路径中含 /dead/ 的返回 404，
+含 /hang/ 的不应答（用于测试超时），其余在 --delay 毫秒后返回 200
+（start_server 给出 alive 时，只有 alive(路径) 为真的返回 200），
+.m3u8 地址返回以 #EXTM3U 开头的播放列表。
+用法：python benchmarks/bench_probe.py [--channels 400] [--delay 50] [--serve]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iptv_extractor.probe import HTTP_HEAD, HTTP_PLAYLIST, RTSP_OPTIONS, probe_urls
+
+PLAYLIST = b"#EXTM3U\n#EXT-X-VERSION:3\n#EXT-X-TARGETDURATION:10\n"
+
+
+async def _handle(reader, writer, delay, alive=None):
+    try:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = []
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            headers.append(line.decode("latin-1").strip())
+        if len(request_line) < 3:
+            return
+        method, target, version = request_line
+        if "/hang/" in target:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(delay)
+
+        dead = "/dead/" in target or (alive is not None and not alive(target))
+        status = b"404 Not Found" if dead else b"200 OK"
+        if version.startswith("RTSP/"):
+            cseq = next((h.split(":", 1)[1].strip() for h in headers if h.lower().startswith("cseq:")), "1")
+            writer.write(b"RTSP/1.0 " + status + b"\r\nCSeq: " + cseq.encode() + b"\r\n\r\n")
+        else:
+            body = PLAYLIST if status.startswith(b"200") and target.split("?")[0].endswith(".m3u8") else b""
+            writer.write(b"HTTP/1.1 " + status + b"\r\nContent-Length: " + str(len(body)).encode()
+                         + b"\r\nConnection: close\r\n\r\n" + (body if method == "GET" else b""))
+        await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+def start_server(host="127.0.0.1", port=0, delay=0.0, alive=None):
+    """在后台线程中启动模拟服务器，返回实际监听的端口"""
+    ready = threading.Event()
+    state = {}
+
+    async def serve():
+        server = await asyncio.start_server(lambda r, w: _handle(r, w, delay, alive), host, port, backlog=1024)
+        state["port"] = server.sockets[0].getsockname()[1]
+        ready.set()
+        async with server:
+            await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return state["port"]
+
+
+def make_urls(count, port, dead_ratio=0.1, hang_ratio=0.0, seed=1):
+    """生成指向模拟服务器的地址，返回 (地址列表, 预期可用的集合)"""
+    rng = random.Random(seed)
+    urls = []
+    alive = set()
+    for i in range(count):
+        roll = rng.random()
+        state = "dead" if roll < dead_ratio else "hang" if roll < dead_ratio + hang_ratio else "live"
+        if i % 2:
+            url = f"http://127.0.0.1:{port}/{state}/PLTV/88888912/224/{3221225000 + i}/index.m3u8"
+        else:
+            url = f"rtsp://127.0.0.1:{port}/{state}/PLTV/88888912/224/{3221225000 + i}/{i}_0.smil"
+        urls.append(url)
+        if state == "live":
+            alive.add(url)
+    return urls, alive
+
+
+def main():
+    parser = argparse.ArgumentParser(description="地址检测基准测试")
+    parser.add_argument("--channels", type=int, default=400, help="地址数量")
+    parser.add_argument("--delay", type=float, default=50, help="模拟服务器的响应延迟(ms)")
+    parser.add_argument("--dead", type=float, default=0.1, help="失效地址比例")
+    parser.add_argument("--hang", type=float, default=0.02, help="不应答地址比例")
+    parser.add_argument("--timeout", type=float, default=1.0, help="检测超时秒数")
+    parser.add_argument("--serve", action="store_true", help="只启动模拟服务器，供手动测试")
+    parser.add_argument("--port", type=int, default=0, help="模拟服务器端口（默认随机）")
+    args = parser.parse_args()
+
+    port = start_server(port=args.port, delay=args.delay / 1000)
+    if args.serve:
+        print(f"模拟服务器已启动：rtsp://127.0.0.1:{port}/ 和 http://127.0.0.1:{port}/，按 Ctrl+C 退出")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            return
+
+    urls, alive = make_urls(args.channels, port, args.dead, args.hang)
+    print(f"{len(urls)} 个地址，预期可用 {len(alive)} 个，服务器延迟 {args.delay:.0f}ms")
+    print(f"{'并发数':>6} {'每主机':>6} {'方式':>16} {'耗时(s)':>8} {'地址/s':>8} {'结果':>6}")
+    cases = [(1, 1, RTSP_OPTIONS, HTTP_HEAD), (16, 16, RTSP_OPTIONS, HTTP_HEAD),
+             (64, 64, "DESCRIBE", HTTP_PLAYLIST), (64, 8, "DESCRIBE", HTTP_PLAYLIST)]
+    for concurrency, per_host, rtsp_method, http_mode in cases:
+        if concurrency == 1 and len(urls) > 100:
+            sample = urls[:100]  # 逐个检测太慢，只取一部分
+        else:
+            sample = urls
+        start = time.perf_counter()
+        results = probe_urls(sample, concurrency=concurrency, per_host=per_host, timeout=args.timeout,
+                             rtsp_method=rtsp_method, http_mode=http_mode)
+        elapsed = time.perf_counter() - start
+        correct = all(result.ok == (url in alive) for url, result in zip(sample, results))
+        print(f"{concurrency:>6} {per_host:>6} {rtsp_method + '/' + http_mode:>16} {elapsed:>8.3f} "
+              f"{len(sample) / elapsed:>8.0f} {'正确' if correct else '错误':>6}")
+
+
+if __name__ == "__main__":
+    main()
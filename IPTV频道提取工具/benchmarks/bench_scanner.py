@@ -0,0 +1,110 @@
+"""对比旧版回溯正则与CUSetConfig扫描器的性能
+
+用法：python benchmarks/bench_scanner.py [--sizes 1 4 16] [--missing 0.02]
+
+第二张表是所有调用都缺少TimeShiftURL的极端情况：旧正则每次匹配都要
+反复扫描到文件末尾，耗时随调用数急剧（超过平方）增长；扫描器仍保持线性。
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iptv_extractor.scanner import iter_cusetconfig
+
+# 旧版 IPTVExtractor.__init__ 中使用的正则
+LEGACY_PATTERN = re.compile(r"Authentication\.CUSetConfig\(.*?ChannelName=\"(.*?)\".*?TimeShiftURL=\"([^\"]*)", re.DOTALL)
+
+NAMES = ["CCTV-1高清", "CCTV-5+高清", "湖南卫视高清", "内蒙古卫视高清", "呼和浩特新闻综合",
+         "内蒙古蒙语卫视", "家有购物", "北京卫视", "纪实人文高清", "CCTV4K超高清"]
+
+
+def make_block(i, rng, missing_ratio):
+    """生成一条CUSetConfig调用"""
+    channel_id = 3221226000 + i
+    content_id = rng.randrange(10 ** 8, 10 ** 9)
+    url = f"rtsp://10.11.43.21/PLTV/88888912/224/{channel_id}/{content_id}.smil"
+    fields = [
+        f'ChannelID="ch{i:020d}"',
+        f'ChannelName="{rng.choice(NAMES)}{i}"',
+        f'UserChannelID="{i}"',
+        f'ChannelURL="igmp://239.29.0.{i % 255}:5140|{url}?rrsip=10.11.43.21"',
+        'TimeShift="1"',
+        'TimeShiftLength="7200"',
+    ]
+    if rng.random() >= missing_ratio:
+        fields.append(f'TimeShiftURL="{url}?rrsip=10.11.43.21&zoneoffset=480"')
+    fields += ['ChannelType="1"', 'IsHDChannel="1"', 'ChannelLogURL=""']
+    return "Authentication.CUSetConfig('Channel','" + ",".join(fields) + "');\n"
+
+
+def make_dump(target_mb, missing_ratio, seed=0):
+    """生成约 target_mb MB 的合成JSP内容"""
+    rng = random.Random(seed)
+    parts = ["<script type=\"text/javascript\">\n"]
+    size = 0
+    i = 0
+    while size < target_mb * 1024 * 1024:
+        block = make_block(i, rng, missing_ratio)
+        parts.append(block)
+        size += len(block.encode("utf-8"))
+        i += 1
+    parts.append("</script>\n")
+    return "".join(parts), i
+
+
+def run_legacy(content):
+    return LEGACY_PATTERN.findall(content)
+
+
+def run_scanner(content):
+    return [(f["ChannelName"], f.get("TimeShiftURL", ""))
+            for f in iter_cusetconfig(content) if "ChannelName" in f]
+
+
+def best_of(func, content, repeat):
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(content)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CUSetConfig扫描器基准测试")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 4, 16], help="合成文件大小(MB)")
+    parser.add_argument("--missing", type=float, default=0.02, help="缺少TimeShiftURL的调用比例")
+    parser.add_argument("--repeat", type=int, default=3, help="每项重复次数，取最快一次")
+    parser.add_argument("--worst-kb", type=float, nargs="+", default=[2, 4, 8],
+                        help="极端情况下的合成文件大小(KB)")
+    args = parser.parse_args()
+
+    print(f"{'大小(MB)':>8} {'调用数':>8} {'旧正则(s)':>10} {'扫描器(s)':>10} {'旧正则错配':>10}")
+    for size_mb in args.sizes:
+        content, blocks = make_dump(size_mb, args.missing)
+        legacy_time, legacy = best_of(run_legacy, content, args.repeat)
+        scanner_time, scanned = best_of(run_scanner, content, args.repeat)
+        # 旧正则在缺少TimeShiftURL时会把名称和下一个调用的地址配对
+        expected = dict(scanned)
+        mismatched = sum(1 for name, url in legacy if expected.get(name) != url)
+        print(f"{size_mb:>8g} {blocks:>8} {legacy_time:>10.3f} {scanner_time:>10.3f} {mismatched:>10}")
+
+    print("\n所有调用均缺少TimeShiftURL：")
+    print(f"{'大小(KB)':>8} {'调用数':>8} {'旧正则(s)':>10} {'扫描器(s)':>10}")
+    for size_kb in args.worst_kb:
+        content, blocks = make_dump(size_kb / 1024, 1.0)
+        legacy_time, _ = best_of(run_legacy, content, 1)
+        scanner_time, _ = best_of(run_scanner, content, args.repeat)
+        print(f"{size_kb:>8g} {blocks:>8} {legacy_time:>10.3f} {scanner_time:>10.4f}")
+
+
+if __name__ == "__main__":
+    main()
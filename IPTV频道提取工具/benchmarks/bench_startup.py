@@ -0,0 +1,123 @@
+"""冷启动基准测试：导入耗时和窗口第一次绘制的时间
+
+导入耗时在无界面的子进程中测量（各模块分别计时）；窗口部分通过环境变量
+IPTV_EXTRACTOR_STARTUP_REPORT 启动图形界面，程序在第一次绘制、结果表格创建和
+提取引擎预加载完成时记录时间，写入报告后自动退出。--exe 指定 build.py 打包出的
+可执行文件时测量打包版本。第一帧超过 --budget 秒时以退出码 1 结束。
+用法：python benchmarks/bench_startup.py [--exe dist/IPTV频道提取工具.dist/IPTV频道提取工具.exe] [--budget 1.0]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+TOOL_DIR = os.path.dirname(BENCH_DIR)
+SCRIPT = os.path.join(TOOL_DIR, "IPTV频道提取工具.py")
+
+REPORT_ENV = "IPTV_EXTRACTOR_STARTUP_REPORT"
+
+# 默认的启动预算（秒）：从启动进程到窗口第一次绘制
+DEFAULT_BUDGET = 1.0
+
+# 分别计时的模块，按导入顺序
+IMPORTS = ("tkinter", "tkinter.ttk", "iptv_extractor", "iptv_extractor.core",
+           "iptv_extractor.cache", "iptv_extractor.stats", "iptv_extractor.merge")
+
+IMPORT_CHILD = """
+import importlib, json, sys, time
+sys.path.insert(0, {tool_dir!r})
+timings = {{}}
+for name in {imports!r}:
+    start = time.perf_counter()
+    importlib.import_module(name)
+    timings[name] = time.perf_counter() - start
+start = time.perf_counter()
+from iptv_extractor.core import ExtractOptions
+ExtractOptions().rules()
+timings["rules"] = time.perf_counter() - start
+print(json.dumps(timings))
+"""
+
+# 报告中的时间点，按先后顺序：(字段, 说明)
+PHASES = (
+    ("module_started", "启动解释器"),
+    ("init_started", "导入界面模块"),
+    ("first_frame", "创建窗口到第一帧"),
+    ("table_ready", "创建结果表格"),
+    ("engine_ready", "预加载提取引擎"),
+)
+
+
+def measure_imports(repeat):
+    """在新进程中测量各模块的导入耗时，返回各项的中位数"""
+    code = IMPORT_CHILD.format(tool_dir=TOOL_DIR, imports=IMPORTS)
+    runs = [json.loads(subprocess.run([sys.executable, "-c", code], check=True,
+                                      capture_output=True, text=True).stdout) for _ in range(repeat)]
+    return {name: statistics.median(run[name] for run in runs) for name in runs[0]}
+
+
+def measure_window(command, timeout):
+    """启动图形界面一次，返回各时间点相对于启动进程的秒数"""
+    with tempfile.TemporaryDirectory() as tmp:
+        report = os.path.join(tmp, "startup.json")
+        env = dict(os.environ, **{REPORT_ENV: report})
+        launched = time.time()
+        process = subprocess.run(command, env=env, cwd=TOOL_DIR, capture_output=True, text=True, timeout=timeout)
+        if not os.path.exists(report):
+            raise RuntimeError(process.stderr.strip().splitlines()[-1] if process.stderr.strip()
+                               else f"程序退出码 {process.returncode}，没有生成报告")
+        with open(report, "r", encoding="utf-8") as f:
+            times = json.load(f)
+    return {name: times[name] - launched for name, _ in PHASES if name in times}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="冷启动基准测试")
+    parser.add_argument("--exe", help="打包后的可执行文件（默认用当前Python运行脚本）")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数，取中位数")
+    parser.add_argument("--budget", type=float, default=DEFAULT_BUDGET,
+                        help=f"第一帧的时间预算（秒，默认：{DEFAULT_BUDGET}）")
+    parser.add_argument("--timeout", type=float, default=30, help="单次启动的超时秒数")
+    args = parser.parse_args()
+
+    if not args.exe:
+        imports = measure_imports(args.repeat)
+        print("导入耗时（中位数）：")
+        for name, seconds in imports.items():
+            title = "编译默认规则" if name == "rules" else name
+            print(f"  {title:<24} {seconds * 1000:>8.1f} ms")
+
+    command = [args.exe] if args.exe else [sys.executable, SCRIPT]
+    try:
+        runs = [measure_window(command, args.timeout) for _ in range(args.repeat)]
+    except (RuntimeError, OSError, subprocess.TimeoutExpired) as e:
+        # 没有图形环境（如无显示器的服务器）时只输出导入耗时
+        print(f"无法启动图形界面：{e}")
+        return 0 if not args.exe else 1
+
+    print(f"\n{'打包版本' if args.exe else '脚本'}启动时间（{args.repeat} 次的中位数，自启动进程起）：")
+    previous = 0.0
+    for name, title in PHASES:
+        values = [run[name] for run in runs if name in run]
+        if not values:
+            continue
+        at = statistics.median(values)
+        print(f"  {title:<16} {at * 1000:>8.1f} ms（+{(at - previous) * 1000:.1f} ms）")
+        previous = at
+
+    first_frame = statistics.median(run["first_frame"] for run in runs)
+    if first_frame > args.budget:
+        print(f"第一帧 {first_frame:.3f}s 超出预算 {args.budget:.3f}s")
+        return 1
+    print(f"第一帧 {first_frame:.3f}s，在预算 {args.budget:.3f}s 以内")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""把 getchannellistHWCU.jsp 包装成合成的 pcap/pcapng 抓包
+
+生成的抓包中除了机顶盒请求 getchannellistHWCU.jsp 的 HTTP 连接外，还有
+--noise MB 的无关流量（组播视频的 UDP 包和其他 HTTP 连接），
+响应可以使用分块传输编码（--chunked）和 gzip 压缩（--gzip），
+--reorder 打乱部分段的顺序并加入重传，用于检查 TCP 重组。
+用法：python benchmarks/make_capture.py corpus.jsp -o corpus.pcap [--format pcapng] [--noise 100] [--chunked --gzip --reorder]
+"""
+
+import argparse
+import gzip
+import random
+import struct
+
+BOX = (bytes([10, 0, 0, 2]), 50000)
+SERVER = (bytes([10, 11, 43, 21]), 8080)
+GATEWAY = (bytes([10, 11, 43, 1]), 80)
+
+MSS = 1448
+
+
+def ethernet(src, dst, proto, payload, vlan=None):
+    """以太网帧（可带 VLAN 标签）+ IPv4 头（校验和为 0，解析时不检查）"""
+    ip = struct.pack(">BBHHHBBH4s4s", 0x45, 0, 20 + len(payload), 0, 0x4000, 64, proto, 0, src, dst)
+    tag = struct.pack(">HH", 0x8100, vlan) if vlan is not None else b""
+    return b"\x00\x11\x22\x33\x44\x55\x66\x77\x88\x99\xaa\xbb" + tag + b"\x08\x00" + ip + payload
+
+
+def tcp_frame(src, dst, seq, ack, flags, data=b"", vlan=None):
+    header = struct.pack(">HHIIBBHHH", src[1], dst[1], seq & 0xFFFFFFFF, ack & 0xFFFFFFFF, 5 << 4, flags, 65535, 0, 0)
+    return ethernet(src[0], dst[0], 6, header + data, vlan)
+
+
+def udp_frame(src, dst, data, vlan=None):
+    header = struct.pack(">HHHH", src[1], dst[1], 8 + len(data), 0)
+    return ethernet(src[0], dst[0], 17, header + data, vlan)
+
+
+def http_flow(client, server, path, body, chunked, compress, rng, reorder, vlan=None, status="200 OK"):
+    """一个完整的 HTTP 连接的帧列表"""
+    client_seq, server_seq = rng.randrange(1 << 32), rng.randrange(1 << 32)
+    request = f"GET {path} HTTP/1.1\r\nHost: {server[0][0]}\r\nAccept-Encoding: gzip\r\n\r\n".encode()
+    headers = [f"HTTP/1.1 {status}", "Content-Type: text/html;charset=UTF-8"]
+    if compress:
+        body = gzip.compress(body)
+        headers.append("Content-Encoding: gzip")
+    if chunked:
+        headers.append("Transfer-Encoding: chunked")
+        pieces = []
+        position = 0
+        while position < len(body):
+            size = rng.randrange(1, 8192)
+            pieces.append(b"%x\r\n" % len(body[position:position + size]) + body[position:position + size] + b"\r\n")
+            position += size
+        body = b"".join(pieces) + b"0\r\n\r\n"
+    else:
+        headers.append(f"Content-Length: {len(body)}")
+    response = ("\r\n".join(headers) + "\r\n\r\n").encode() + body
+
+    frames = [
+        tcp_frame(client, server, client_seq, 0, 0x02, vlan=vlan),
+        tcp_frame(server, client, server_seq, client_seq + 1, 0x12, vlan=vlan),
+        tcp_frame(client, server, client_seq + 1, server_seq + 1, 0x10, vlan=vlan),
+        tcp_frame(client, server, client_seq + 1, server_seq + 1, 0x18, request, vlan=vlan),
+    ]
+    client_seq += 1 + len(request)
+    segments = [tcp_frame(server, client, server_seq + 1 + i, client_seq, 0x18, response[i:i + MSS], vlan=vlan)
+                for i in range(0, len(response), MSS)]
+    if reorder:
+        # 交换部分相邻的段，并重传其中一些
+        for i in range(0, len(segments) - 1, 7):
+            segments[i], segments[i + 1] = segments[i + 1], segments[i]
+        segments += [segments[i] for i in range(0, len(segments), 11)]
+    frames += segments
+    frames.append(tcp_frame(server, client, server_seq + 1 + len(response), client_seq, 0x11, vlan=vlan))
+    return frames
+
+
+def noise_frames(rng, size):
+    """约 size 字节的无关流量：组播视频和其他 HTTP 连接"""
+    total = 0
+    flow = 0
+    while total < size:
+        if rng.random() < 0.95:
+            frame = udp_frame((bytes([10, 11, 43, 30]), 5140), (bytes([239, 1, 1, rng.randrange(256)]), 5140),
+                              bytes(1316))
+            total += len(frame)
+            yield frame
+        else:
+            flow += 1
+            client = (bytes([10, 0, 0, 2]), 40000 + flow % 20000)
+            for frame in http_flow(client, GATEWAY, f"/EPG/jsp/other{flow}.jsp", bytes(rng.randrange(20000)),
+                                   False, False, rng, False):
+                total += len(frame)
+                yield frame
+
+
+def write_pcap(f, frames):
+    f.write(struct.pack("<IHHiIII", 0xA1B2C3D4, 2, 4, 0, 0, 65535, 1))
+    for i, frame in enumerate(frames):
+        f.write(struct.pack("<IIII", 1700000000 + i // 1000, i % 1000 * 1000, len(frame), len(frame)))
+        f.write(frame)
+
+
+def write_pcapng(f, frames):
+    def block(kind, body):
+        body += b"\x00" * (-len(body) % 4)
+        length = len(body) + 12
+        f.write(struct.pack("<II", kind, length) + body + struct.pack("<I", length))
+
+    block(0x0A0D0D0A, struct.pack("<IHHq", 0x1A2B3C4D, 1, 0, -1))
+    block(1, struct.pack("<HHI", 1, 0, 65535))
+    for i, frame in enumerate(frames):
+        block(6, struct.pack("<IIIII", 0, 0, i, len(frame), len(frame)) + frame)
+
+
+def write_capture(path, jsp, fmt="pcap", noise=0, chunked=False, compress=False, reorder=False, seed=0):
+    """写入合成抓包，无关流量一半在请求之前、一半在响应之后"""
+    rng = random.Random(seed)
+    with open(jsp, "rb") as f:
+        body = f.read()
+
+    def frames():
+        yield from noise_frames(rng, noise // 2)
+        # 先有一次 304 响应，再是真正的响应
+        yield from http_flow((BOX[0], BOX[1] - 1), SERVER, "/EPG/jsp/getchannellistHWCU.jsp?x=1", b"", False, False,
+                             rng, False, vlan=100, status="304 Not Modified")
+        yield from http_flow(BOX, SERVER, "/EPG/jsp/getchannellistHWCU.jsp?x=1", body, chunked, compress, rng,
+                             reorder, vlan=100)
+        yield from noise_frames(rng, noise - noise // 2)
+
+    with open(path, "wb") as f:
+        (write_pcapng if fmt == "pcapng" else write_pcap)(f, frames())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="把JSP包装成合成抓包")
+    parser.add_argument("input", help="getchannellistHWCU.jsp 文件")
+    parser.add_argument("-o", "--output", required=True, help="输出抓包路径")
+    parser.add_argument("--format", choices=("pcap", "pcapng"), default="pcap", help="抓包格式")
+    parser.add_argument("--noise", type=float, default=0, help="无关流量的大小（MB）")
+    parser.add_argument("--chunked", action="store_true", help="响应使用分块传输编码")
+    parser.add_argument("--gzip", action="store_true", help="响应使用 gzip 压缩")
+    parser.add_argument("--reorder", action="store_true", help="打乱部分段的顺序并加入重传")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子")
+    args = parser.parse_args()
+    write_capture(args.output, args.input, args.format, int(args.noise * 1024 * 1024), args.chunked, args.gzip,
+                  args.reorder, args.seed)
+
+
+if __name__ == "__main__":
+    main()
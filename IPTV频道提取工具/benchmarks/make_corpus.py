@@ -0,0 +1,103 @@
+"""生成模拟 getchannellistHWCU.jsp 的合成抓包文件
+
+真实抓包中含有账号信息，不能公开，基准测试和回归对比都使用合成文件。
+生成的调用与真实抓包的字段一致，并按比例加入缺少 TimeShiftURL、
+/-? 占位地址、购物频道、蒙语频道和 .m3u8 地址的记录。
+用法：python benchmarks/make_corpus.py -n 100000 -o corpus.jsp [--seed 0]
+"""
+
+import argparse
+import random
+
+# 常见频道名称，数量超过列表长度时加数字后缀
+CCTV_NAMES = [f"CCTV-{i}高清" for i in range(1, 18)] + ["CCTV-5+高清", "CCTV4K超高清", "CCTV-1", "CCTV-13"]
+WEISHI_NAMES = [f"{province}卫视{suffix}" for province in
+                ("北京", "湖南", "浙江", "江苏", "东方", "广东", "深圳", "天津", "山东", "安徽",
+                 "内蒙古", "辽宁", "黑龙江", "湖北", "河南", "四川", "重庆", "东南")
+                for suffix in ("高清", "")]
+LOCAL_NAMES = ["内蒙古新闻综合", "内蒙古经济生活", "呼和浩特新闻综合", "呼和浩特都市生活",
+               "包头新闻综合", "鄂尔多斯新闻综合", "赤峰新闻综合"]
+OTHER_NAMES = ["纪实人文高清", "金鹰卡通", "卡酷少儿", "CHC高清电影", "求索纪录", "爱上4K", "哈哈炫动"]
+SHOPPING_NAMES = ["家有购物", "好易购物", "快乐购物", "优购物", "央广购物"]
+MONGOLIAN_NAMES = ["内蒙古蒙语卫视", "蒙语文化", "呼和浩特蒙古语", "内蒙古蒙文频道"]
+NORMAL_NAMES = CCTV_NAMES + WEISHI_NAMES + LOCAL_NAMES + OTHER_NAMES
+
+HOST = "10.11.43.21"
+
+
+def make_call(i, rng, missing, placeholder, shopping, mongolian, m3u8):
+    """生成一条CUSetConfig调用，返回 (调用文本, 记录类型)"""
+    roll = rng.random()
+    if roll < shopping:
+        kind, names = "shopping", SHOPPING_NAMES
+    elif roll < shopping + mongolian:
+        kind, names = "mongolian", MONGOLIAN_NAMES
+    else:
+        kind, names = "normal", NORMAL_NAMES
+    name = names[i % len(names)]
+    if i >= len(names):
+        name += str(i // len(names))
+
+    channel_id = 3221225000 + i
+    content_id = rng.randrange(10 ** 8, 10 ** 9)
+    smil = f"rtsp://{HOST}/PLTV/88888912/224/{channel_id}/{content_id}.smil"
+    fields = [
+        f'ChannelID="ch{i:020d}"',
+        f'ChannelName="{name}"',
+        f'UserChannelID="{i + 1}"',
+        f'ChannelURL="igmp://239.29.{i // 250 % 256}.{i % 250 + 1}:5140|{smil}?rrsip={HOST}"',
+        'TimeShift="1"',
+        'TimeShiftLength="7200"',
+    ]
+
+    roll = rng.random()
+    if kind == "normal" and roll < missing:
+        kind = "missing"
+    elif kind == "normal" and roll < missing + placeholder:
+        kind = "placeholder"
+        fields.append('TimeShiftURL="/-?tvid=0"')
+    elif rng.random() < m3u8:
+        fields.append(f'TimeShiftURL="http://{HOST}:8080/PLTV/88888912/224/{channel_id}/index.m3u8'
+                      f'?rrsip={HOST}&zoneoffset=480"')
+    else:
+        fields.append(f'TimeShiftURL="{smil}?rrsip={HOST}&zoneoffset=480&icpid=&limitflux=-1"')
+
+    fields += ['ChannelSDP="igmp://239.29.0.1:5140"', 'ChannelType="1"',
+               f'IsHDChannel="{1 if "高清" in name else 0}"', 'PreviewEnable="0"', 'ChannelLogURL=""']
+    return "Authentication.CUSetConfig('Channel','" + ",".join(fields) + "');\n", kind
+
+
+def write_corpus(path, channels, seed=0, missing=0.02, placeholder=0.02, shopping=0.05,
+                 mongolian=0.05, m3u8=0.1):
+    """把合成抓包逐条写入文件，返回各类记录的数量"""
+    rng = random.Random(seed)
+    counts = {"normal": 0, "missing": 0, "placeholder": 0, "shopping": 0, "mongolian": 0}
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write('<%@ page contentType="text/html; charset=UTF-8" %>\n<script type="text/javascript">\n')
+        for i in range(channels):
+            call, kind = make_call(i, rng, missing, placeholder, shopping, mongolian, m3u8)
+            f.write(call)
+            counts[kind] += 1
+        f.write("</script>\n")
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成合成JSP抓包文件")
+    parser.add_argument("-n", "--channels", type=int, default=10000, help="频道调用数（默认：10000）")
+    parser.add_argument("-o", "--output", required=True, help="输出文件路径")
+    parser.add_argument("--seed", type=int, default=0, help="随机种子，相同参数生成相同文件")
+    parser.add_argument("--missing", type=float, default=0.02, help="缺少TimeShiftURL的比例")
+    parser.add_argument("--placeholder", type=float, default=0.02, help="/-? 占位地址的比例")
+    parser.add_argument("--shopping", type=float, default=0.05, help="购物频道的比例")
+    parser.add_argument("--mongolian", type=float, default=0.05, help="蒙语频道的比例")
+    parser.add_argument("--m3u8", type=float, default=0.1, help=".m3u8 地址的比例")
+    args = parser.parse_args()
+
+    counts = write_corpus(args.output, args.channels, args.seed, args.missing, args.placeholder,
+                          args.shopping, args.mongolian, args.m3u8)
+    print(f"已生成 {args.output}：" + "，".join(f"{kind} {count}" for kind, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -72,11 +72,14 @@ def compile_app():
         "--show-progress",              # 显示编译进度
         "--show-memory",                # 显示内存使用情况
         "--plugin-enable=tk-inter",     # 启用tkinter插件支持
+        "--include-package=iptv_extractor",  # 提取引擎在窗口显示后才导入，需明确包含
+        "--include-package-data=iptv_extractor",  # 包含默认分类规则等数据文件
+        "--python-flag=no_site",        # 不导入 site 模块，加快启动
         "--windows-disable-console",    # 禁用控制台窗口
         f"--windows-icon-from-ico={icon_path}",  # 设置应用图标
         f"--output-dir={output_dir}",   # 输出目录
         # "--remove-output",              # 删除中间文件 - 暂时注释掉以便调试
-        # "--lto=yes",                    # 启用链接时优化 - 暂时注释掉以便调试
+        "--lto=yes",                    # 启用链接时优化，可执行文件更小、启动更快
         "--static-libpython=no",        # 不使用静态Python库
         # 暂时简化版本信息，减少可能的错误点
         "--windows-company-name=TraeAI",  # 公司名称(移除空格)
@@ -109,6 +112,8 @@ def compile_app():
                 sys.executable, "-m", "nuitka",
                 "--standalone",
                 "--plugin-enable=tk-inter",
+                "--include-package=iptv_extractor",
+                "--include-package-data=iptv_extractor",
                 f"--output-dir={output_dir}",
                 app_path
             ]
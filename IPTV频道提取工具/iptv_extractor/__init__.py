@@ -0,0 +1,60 @@
+"""IPTV频道提取核心库（不依赖tkinter）
+
+导入包时不加载各个模块，第一次访问下列名称时才导入所在的模块，
+因此只用到其中一部分的命令行工具和GUI启动更快。
+"""
+
+import importlib
+
+# 公开名称 -> 所在模块
+_EXPORTS = {
+    "CaptureBody": "capture",
+    "Channel": "core",
+    "EpgError": "epg",
+    "EpgIndex": "epg",
+    "ExtractCache": "cache",
+    "ExtractCancelled": "core",
+    "ExtractError": "core",
+    "ExtractOptions": "core",
+    "ExtractResult": "core",
+    "FORMATS": "writers",
+    "classify": "core",
+    "detect_format": "writers",
+    "extract_channels": "core",
+    "extract_file": "core",
+    "format_results_with_headers": "core",
+    "is_capture": "capture",
+    "iter_cusetconfig": "scanner",
+    "iter_cusetconfig_file": "scanner",
+    "iter_cusetconfig_mmap": "scanner",
+    "iter_cusetconfig_stream": "scanner",
+    "load_epg": "epg",
+    "load_names": "names",
+    "load_rules": "rules",
+    "make_channel": "core",
+    "NameIndex": "names",
+    "NamesError": "names",
+    "process_file": "core",
+    "RunStats": "stats",
+    "RuleSet": "rules",
+    "RulesError": "rules",
+    "sort_channels": "core",
+    "write_output": "writers",
+    "write_trimmed_epg": "epg",
+    "write_results": "core",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,184 @@
+"""批量模式：在进程池中并行处理多个JSP抓包文件
+
+用法：python -m iptv_extractor.batch 目录或通配符... -o 输出目录 [-j 进程数]
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .capture import CAPTURE_EXTENSIONS
+from .cli import add_cache_arguments, add_format_argument, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError, process_file
+from .names import NamesError
+from .rules import RulesError
+from .writers import FORMAT_EXTENSIONS, FORMAT_TXT
+
+# 目录参数中匹配的抓包文件
+INPUT_PATTERNS = ("*.jsp",) + tuple("*" + extension for extension in CAPTURE_EXTENSIONS)
+
+# 汇总文件名
+SUMMARY_NAME = "batch_summary.json"
+
+
+def collect_inputs(args):
+    """把目录、通配符和文件路径展开为去重后的输入文件列表"""
+    inputs = []
+    seen = set()
+    for arg in args:
+        if os.path.isdir(arg):
+            matches = []
+            for pattern in INPUT_PATTERNS:
+                matches.extend(glob.glob(os.path.join(arg, "**", pattern), recursive=True))
+        elif glob.has_magic(arg):
+            matches = glob.glob(arg, recursive=True)
+        else:
+            matches = [arg]
+
+        for path in sorted(matches):
+            key = os.path.abspath(path)
+            if key not in seen and os.path.isfile(path):
+                seen.add(key)
+                inputs.append(path)
+    return inputs
+
+
+def output_name(relative, extension):
+    """相对路径对应的输出文件名
+
+    保留输入的扩展名，同一目录中的 box.jsp 和 box.pcap 分别输出为 box.jsp.csv 和 box.pcap.csv。
+    """
+    return relative.replace(os.sep, "_") + extension
+
+
+def output_names(inputs, extension=".csv"):
+    """为每个输入生成不重名的输出文件名，仍有重名时抛出 ValueError
+
+    不同设备的抓包通常同名（getchannellistHWCU.jsp），因此使用相对于
+    公共目录的路径作为文件名。
+    """
+    paths = [os.path.abspath(path) for path in inputs]
+    if len(paths) == 1:
+        base = os.path.dirname(paths[0])
+    else:
+        base = os.path.commonpath(paths)
+    names = []
+    sources = {}
+    for path in paths:
+        name = output_name(os.path.relpath(path, base), extension)
+        if name in sources:
+            raise ValueError(f"{sources[name]} 和 {path} 的输出文件同名：{name}")
+        sources[name] = path
+        names.append(name)
+    return names
+
+
+def process_one(input_path, output_path, options, fmt=None, cache=None):
+    """处理单个文件，返回可序列化的统计信息（在子进程中运行）"""
+    start = time.perf_counter()
+    item = {"input": input_path, "output": output_path}
+    try:
+        extracted = process_file(input_path, output_path, options, fmt, cache)
+    except (ExtractError, RulesError, NamesError, OSError, UnicodeDecodeError) as e:
+        item["error"] = str(e)
+    else:
+        item["records"] = len(extracted.results)
+        item["cached"] = extracted.cached
+        item["skipped_invalid"] = len(extracted.skipped_channels)
+        item["skipped_filtered"] = {skip_id: len(names) for skip_id, names in extracted.skipped_by_filter.items()}
+    item["bytes"] = os.path.getsize(input_path) if os.path.exists(input_path) else 0
+    item["seconds"] = round(time.perf_counter() - start, 6)
+    return item
+
+
+def run_batch(inputs, output_dir, options=None, workers=None, fmt=None, cache=None):
+    """并行处理所有输入，返回 (与输入顺序一致的统计列表, 实际使用的进程数)"""
+    os.makedirs(output_dir, exist_ok=True)
+    extension = FORMAT_EXTENSIONS[fmt or FORMAT_TXT]
+    outputs = [os.path.join(output_dir, name) for name in output_names(inputs, extension)]
+    workers = min(workers or os.cpu_count() or 1, len(inputs))
+
+    # 只有一个进程可用时直接在当前进程处理，省去进程池的开销
+    if workers <= 1:
+        return [process_one(i, o, options, fmt, cache) for i, o in zip(inputs, outputs)], 1
+
+    count = len(inputs)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        items = list(executor.map(process_one, inputs, outputs, [options] * count, [fmt] * count,
+                                  [cache] * count))
+    return items, workers
+
+
+def write_summary(path, items, elapsed, workers):
+    """写入JSON格式的汇总"""
+    summary = {
+        "files": len(items),
+        "failed": sum(1 for item in items if "error" in item),
+        "records": sum(item.get("records", 0) for item in items),
+        "bytes": sum(item["bytes"] for item in items),
+        "workers": workers,
+        "seconds": round(elapsed, 6),
+        "items": items,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return summary
+
+
+def print_report(summary, file=sys.stdout):
+    """输出每个文件的耗时和记录数"""
+    for item in summary["items"]:
+        if "error" in item:
+            print(f"[失败] {item['input']}：{item['error']} ({item['seconds']:.3f}s)", file=file)
+        else:
+            cached = "，使用缓存" if item.get("cached") else ""
+            print(f"[完成] {item['input']} -> {item['output']}："
+                  f"{item['records']} 条记录 ({item['seconds']:.3f}s{cached})", file=file)
+    mb = summary["bytes"] / 1024 / 1024
+    seconds = summary["seconds"] or 1e-9
+    print(f"共 {summary['files']} 个文件，失败 {summary['failed']} 个，"
+          f"提取 {summary['records']} 条记录，{summary['workers']} 个进程，"
+          f"耗时 {summary['seconds']:.3f}s（{mb / seconds:.1f} MB/s）", file=file)
+
+
+def main(argv=None):
+    """批量模式主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.batch",
+        description="并行处理多个JSP抓包文件，每个输入生成一个输出文件",
+    )
+    parser.add_argument("inputs", nargs="+", help="输入目录、通配符或文件")
+    parser.add_argument("-o", "--output-dir", required=True, help="输出目录")
+    parser.add_argument("-j", "--jobs", type=int, help="进程数（默认：CPU核心数）")
+    add_option_arguments(parser)
+    add_format_argument(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出统计信息")
+    args = parser.parse_args(argv)
+
+    inputs = collect_inputs(args.inputs)
+    if not inputs:
+        print("未找到任何输入文件", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    try:
+        items, workers = run_batch(inputs, args.output_dir, options_from_args(args), args.jobs, args.fmt,
+                                   cache_from_args(args))
+        summary = write_summary(os.path.join(args.output_dir, SUMMARY_NAME), items,
+                                time.perf_counter() - start, workers)
+    except (OSError, ValueError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 2
+
+    if not args.quiet:
+        print_report(summary)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
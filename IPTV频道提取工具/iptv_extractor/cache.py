@@ -0,0 +1,157 @@
+"""提取结果的磁盘缓存
+
+缓存键由输入文件内容的哈希和提取选项（含规则文件内容）组成，输入未变化时
+直接返回上次的提取结果而不重新解析。缓存按条目数、总大小和存放时间淘汰。
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict
+
+from .core import Channel, ExtractResult
+from .names import DEFAULT_ALIASES_PATH
+from .rules import DEFAULT_RULES_PATH
+
+# 缓存格式或提取逻辑变化时递增，使旧缓存失效
+CACHE_VERSION = 2
+
+# 计算文件哈希时每次读取的字节数
+HASH_CHUNK_SIZE = 1 << 20
+
+# 默认淘汰策略
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 3600
+
+
+def default_cache_dir():
+    """默认缓存目录，可用环境变量 IPTV_EXTRACTOR_CACHE_DIR 覆盖"""
+    override = os.environ.get("IPTV_EXTRACTOR_CACHE_DIR")
+    if override:
+        return override
+    base = os.environ.get("LOCALAPPDATA") or os.environ.get("XDG_CACHE_HOME")
+    if not base:
+        base = os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "iptv_extractor")
+
+
+def file_digest(path):
+    """计算文件内容的 BLAKE2b 哈希"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractCache:
+    """以输入内容和选项为键的提取结果缓存"""
+
+    def __init__(self, directory=None, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE):
+        self.directory = directory or default_cache_dir()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+
+    def key(self, input_path, options):
+        """计算缓存键"""
+        settings = asdict(options)
+        # 规则和别名文件按内容参与计算，修改后缓存自动失效
+        settings["rules_path"] = file_digest(options.rules_path or DEFAULT_RULES_PATH)
+        settings["aliases_path"] = file_digest(options.aliases_path or DEFAULT_ALIASES_PATH)
+        digest = hashlib.blake2b(digest_size=20)
+        digest.update(f"{CACHE_VERSION}\n".encode("ascii"))
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        digest.update(file_digest(input_path).encode("ascii"))
+        return digest.hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def load(self, key):
+        """读取缓存，未命中或缓存损坏时返回 None"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("version") != CACHE_VERSION:
+            return None
+
+        # 更新修改时间，淘汰时按最近使用排序
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return ExtractResult(
+            results=[Channel(*row) for row in data["results"]],
+            skipped_channels=data["skipped_channels"],
+            skipped_by_filter=data["skipped_by_filter"],
+            cached=True,
+        )
+
+    def store(self, key, extracted):
+        """写入缓存（先写临时文件再替换，避免读到半个文件）并执行淘汰"""
+        os.makedirs(self.directory, exist_ok=True)
+        data = {
+            "version": CACHE_VERSION,
+            "results": [channel.astuple() for channel in extracted.results],
+            "skipped_channels": extracted.skipped_channels,
+            "skipped_by_filter": extracted.skipped_by_filter,
+        }
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """删除过期条目，并在超出条目数或总大小时从最久未使用的开始删除"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+
+        entries = []
+        now = time.time()
+        for name in names:
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age:
+                self._remove(path)
+            else:
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort(reverse=True)
+        total = 0
+        for index, (_, size, path) in enumerate(entries):
+            total += size
+            if index >= self.max_entries or total > self.max_bytes:
+                self._remove(path)
+
+    def clear(self):
+        """清空缓存"""
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".json"):
+                self._remove(os.path.join(self.directory, name))
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,530 @@
+"""从抓包文件（pcap/pcapng）中直接读取 getchannellistHWCU.jsp 的响应内容
+
+逐个读取数据包，只跟踪请求行中包含 getchannellistHWCU.jsp 的 HTTP 连接；
+其他连接的数据包解析出 TCP 头后立即丢弃，不保存任何状态，几GB的抓包内存占用也是固定的。
+服务器方向的 TCP 数据按序号重组（从请求包的确认号开始，乱序的段暂存，重传的部分丢弃），
+再解析 HTTP 响应头、分块传输编码（chunked）和 gzip/deflate 压缩，
+解码后的正文以文本文件对象的形式交给 CUSetConfig 扫描器，不写临时文件。
+第一个 200 响应结束后停止读取抓包。
+"""
+
+import codecs
+import struct
+import zlib
+
+# 抓包文件扩展名
+CAPTURE_EXTENSIONS = (".pcap", ".pcapng", ".cap")
+
+# 要提取的请求路径（不区分大小写）
+TARGET_PATH = b"getchannellisthwcu.jsp"
+
+# 文件头：pcap（微秒/纳秒时间戳，两种字节序）和 pcapng 的 Section Header Block
+_PCAP_MAGICS = {
+    b"\xd4\xc3\xb2\xa1": "<", b"\x4d\x3c\xb2\xa1": "<",
+    b"\xa1\xb2\xc3\xd4": ">", b"\xa1\xb2\x3c\x4d": ">",
+}
+_PCAPNG_MAGIC = b"\x0a\x0d\x0d\x0a"
+
+# pcapng 各类块（IDB、PB、SPB、EPB）的块体（不含块类型和块长度）至少需要的字节数
+_PCAPNG_MIN_BODY = {1: 12, 2: 24, 3: 8, 6: 24}
+
+# 链路类型
+LINKTYPE_NULL = 0
+LINKTYPE_ETHERNET = 1
+LINKTYPE_RAW = 101
+LINKTYPE_LOOP = 108
+LINKTYPE_LINUX_SLL = 113
+LINKTYPE_IPV4 = 228
+LINKTYPE_IPV6 = 229
+LINKTYPE_LINUX_SLL2 = 276
+
+# 以太网类型：IPv4、IPv6、VLAN 标签、PPPoE 会话
+_ETHERTYPE_IP = (0x0800, 0x86DD)
+_ETHERTYPE_VLAN = (0x8100, 0x88A8, 0x9100)
+_ETHERTYPE_PPPOE = 0x8864
+_PPP_IP = {0x0021: 0x0800, 0x0057: 0x86DD}
+
+# IPv6 中可以跳过的扩展头；分片头（44）出现时丢弃该包
+_IPV6_EXTENSIONS = (0, 43, 60)
+_IPPROTO_TCP = 6
+
+_TCP_FIN = 0x01
+
+# 同时跟踪的请求连接数、每个连接暂存的乱序数据和响应头的上限
+MAX_FLOWS = 16
+MAX_PENDING = 4 << 20
+MAX_HEADER_SIZE = 64 << 10
+
+# 单个包或 pcapng 块的长度上限，超过时认为文件已损坏，避免按错误的长度读入大量数据
+MAX_RECORD_SIZE = 16 << 20
+
+# 读取抓包的缓冲区大小，以及每隔多少个包报告一次进度
+READ_BUFFER_SIZE = 1 << 20
+PROGRESS_INTERVAL = 4096
+
+
+def is_capture(path):
+    """根据文件头判断是否为 pcap/pcapng 抓包"""
+    try:
+        with open(path, "rb") as f:
+            magic = f.read(4)
+    except OSError:
+        return False
+    return magic in _PCAP_MAGICS or magic == _PCAPNG_MAGIC
+
+
+def _iter_pcap(f, order):
+    """产出经典 pcap 文件中的 (链路类型, 帧数据)
+
+    返回值（StopIteration.value）为文件被截断或损坏的说明，正常结束时为 None。
+    """
+    header = f.read(20)
+    if len(header) < 20:
+        return "抓包文件头不完整"
+    linktype = struct.unpack(order + "I", header[16:20])[0] & 0xFFFF
+    record = struct.Struct(order + "8xII")
+    while True:
+        head = f.read(16)
+        if not head:
+            return None
+        if len(head) < 16:
+            return "抓包文件被截断"
+        length = record.unpack(head)[0]
+        if length > MAX_RECORD_SIZE:
+            return f"包长度无效：{length}，抓包文件可能已损坏"
+        data = f.read(length)
+        if len(data) < length:
+            return "抓包文件被截断"  # 抓包被中途停止时最后一个包可能不完整
+        yield linktype, data
+
+
+def _iter_pcapng(f):
+    """产出 pcapng 文件中的 (链路类型, 帧数据)
+
+    返回值（StopIteration.value）为文件被截断或损坏的说明，正常结束时为 None。
+    块长度在读取块体之前检查，损坏的长度不会导致读入大量数据。
+    """
+    order = "<"
+    linktypes = []
+    while True:
+        head = f.read(8)
+        if not head:
+            return None
+        if len(head) < 8:
+            return "抓包文件被截断"
+        block_type = head[:4]
+        magic = b""
+        if block_type == _PCAPNG_MAGIC:
+            # 新的节：重新确定字节序，接口编号从零开始
+            magic = f.read(4)
+            if len(magic) < 4:
+                return "抓包文件被截断"
+            order = "<" if magic == b"\x4d\x3c\x2b\x1a" else ">"
+            linktypes = []
+        length = struct.unpack(order + "I", head[4:8])[0]
+        if length < 12 or length % 4 or length > MAX_RECORD_SIZE:
+            return f"pcapng 块长度无效：{length}，抓包文件可能已损坏"
+        body = magic + f.read(length - 8 - len(magic))
+        if len(body) < length - 8:
+            return "抓包文件被截断"
+        kind = struct.unpack(order + "I", block_type)[0]
+        if len(body) < _PCAPNG_MIN_BODY.get(kind, 0):
+            return f"pcapng 块过短：类型 {kind}，长度 {length}，抓包文件可能已损坏"
+        if kind == 1:  # Interface Description Block
+            linktypes.append(struct.unpack(order + "H", body[:2])[0])
+        elif kind == 6:  # Enhanced Packet Block
+            interface, captured = struct.unpack(order + "I8xI", body[:16])
+            if interface < len(linktypes):
+                yield linktypes[interface], body[20:20 + min(captured, len(body) - 24)]
+        elif kind == 3 and linktypes:  # Simple Packet Block
+            captured = min(struct.unpack(order + "I", body[:4])[0], length - 16)
+            yield linktypes[0], body[4:4 + captured]
+        elif kind == 2:  # 已废弃的 Packet Block
+            interface, captured = struct.unpack(order + "H10xI", body[:16])
+            if interface < len(linktypes):
+                yield linktypes[interface], body[20:20 + min(captured, len(body) - 24)]
+
+
+def iter_packets(f):
+    """产出抓包文件对象中的 (链路类型, 帧数据)，自动识别 pcap 和 pcapng"""
+    magic = f.read(4)
+    if magic == _PCAPNG_MAGIC:
+        f.seek(0)
+        return _iter_pcapng(f)
+    order = _PCAP_MAGICS.get(magic)
+    if order is None:
+        return iter(())
+    return _iter_pcap(f, order)
+
+
+def _ip_start(linktype, frame):
+    """返回帧中IP包的起始位置，不是IP包时返回 -1"""
+    if linktype == LINKTYPE_ETHERNET:
+        if len(frame) < 14:
+            return -1
+        offset = 12
+        ethertype = frame[12] << 8 | frame[13]
+        while ethertype in _ETHERTYPE_VLAN and len(frame) >= offset + 6:
+            offset += 4
+            ethertype = frame[offset] << 8 | frame[offset + 1]
+        offset += 2
+        if ethertype == _ETHERTYPE_PPPOE and len(frame) >= offset + 8:
+            ethertype = _PPP_IP.get(frame[offset + 6] << 8 | frame[offset + 7], 0)
+            offset += 8
+        return offset if ethertype in _ETHERTYPE_IP else -1
+    if linktype == LINKTYPE_LINUX_SLL:
+        return 16 if len(frame) >= 16 and (frame[14] << 8 | frame[15]) in _ETHERTYPE_IP else -1
+    if linktype == LINKTYPE_LINUX_SLL2:
+        return 20 if len(frame) >= 20 and (frame[0] << 8 | frame[1]) in _ETHERTYPE_IP else -1
+    if linktype in (LINKTYPE_RAW, LINKTYPE_IPV4, LINKTYPE_IPV6):
+        return 0
+    if linktype in (LINKTYPE_NULL, LINKTYPE_LOOP):
+        return 4
+    return -1
+
+
+def parse_tcp(linktype, frame):
+    """解析帧中的 TCP 段，返回 (连接键, 序号, 确认号, 标志, 数据)，不是 TCP 段时返回 None
+
+    连接键为 (源地址, 源端口, 目的地址, 目的端口)。
+    """
+    offset = _ip_start(linktype, frame)
+    if offset < 0 or len(frame) < offset + 20:
+        return None
+    version = frame[offset] >> 4
+    if version == 4:
+        header = (frame[offset] & 0x0F) * 4
+        if frame[offset + 9] != _IPPROTO_TCP or (frame[offset + 6] << 8 | frame[offset + 7]) & 0x3FFF:
+            return None  # 不是 TCP，或者是分片
+        total = frame[offset + 2] << 8 | frame[offset + 3]
+        # 网卡分段卸载时长度字段可能为 0
+        end = offset + total if total else len(frame)
+        src, dst = frame[offset + 12:offset + 16], frame[offset + 16:offset + 20]
+        offset += header
+    elif version == 6:
+        if len(frame) < offset + 40:
+            return None
+        payload = frame[offset + 4] << 8 | frame[offset + 5]
+        next_header = frame[offset + 6]
+        end = offset + 40 + payload if payload else len(frame)
+        src, dst = frame[offset + 8:offset + 24], frame[offset + 24:offset + 40]
+        offset += 40
+        while next_header in _IPV6_EXTENSIONS and len(frame) >= offset + 2:
+            next_header = frame[offset]
+            offset += (frame[offset + 1] + 1) * 8
+        if next_header != _IPPROTO_TCP:
+            return None
+    else:
+        return None
+    if len(frame) < offset + 20:
+        return None
+    sport, dport, seq, ack, data_offset, flags = struct.unpack_from(">HHIIBB", frame, offset)
+    data = frame[offset + (data_offset >> 4) * 4:min(end, len(frame))]
+    return (src, sport, dst, dport), seq, ack, flags, data
+
+
+def is_target_request(data):
+    """TCP 数据是否为请求目标路径的 HTTP 请求"""
+    if not data.startswith((b"GET ", b"POST ")):
+        return False
+    line_end = data.find(b"\r\n", 0, 4096)
+    return TARGET_PATH in data[:line_end if line_end != -1 else 4096].lower()
+
+
+class HttpResponseDecoder:
+    """增量解析一个 HTTP 响应：响应头、分块传输编码和压缩
+
+    feed() 返回解码后的正文字节；响应结束后 done 为 True。
+    状态码不是 200 时 status 为该状态码，正文被忽略。
+    """
+
+    def __init__(self):
+        self.status = None
+        self.done = False
+        self.error = None
+        self._header = b""
+        self._remaining = None   # Content-Length 剩余字节数，None 表示读到连接关闭
+        self._chunked = False
+        self._chunk_left = 0     # 当前块剩余字节数，0 表示等待块大小行
+        self._line = b""
+        self._inflate = None
+
+    def _parse_header(self, header):
+        lines = header.decode("latin-1").split("\r\n")
+        parts = lines[0].split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/") or not parts[1].isdigit():
+            self.error = "不是HTTP响应"
+            return
+        self.status = int(parts[1])
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            name, value = name.strip().lower(), value.strip()
+            if name == "content-length" and value.isdigit():
+                self._remaining = int(value)
+            elif name == "transfer-encoding" and "chunked" in value.lower():
+                self._chunked = True
+            elif name == "content-encoding" and value.lower() in ("gzip", "x-gzip", "deflate"):
+                # 47 = 自动识别 gzip 和 zlib 头
+                self._inflate = zlib.decompressobj(47)
+
+    def feed(self, data):
+        """输入按序重组后的 TCP 数据，返回解码后的正文字节"""
+        if self.done:
+            return b""
+        if self.status is None:
+            self._header += data
+            end = self._header.find(b"\r\n\r\n")
+            if end == -1:
+                if len(self._header) > MAX_HEADER_SIZE:
+                    self.error = "HTTP响应头过长"
+                    self.done = True
+                return b""
+            header, data = self._header[:end], self._header[end + 4:]
+            self._header = b""
+            self._parse_header(header)
+            if self.error is not None:
+                self.done = True
+                return b""
+            if 100 <= self.status < 200:
+                # 100 Continue 之后才是真正的响应
+                self.status = None
+                return self.feed(data)
+            if self.status != 200 or (self._remaining == 0 and not self._chunked):
+                self.done = True
+                return b""
+        body = self._dechunk(data) if self._chunked else self._limit(data)
+        return self._decompress(body)
+
+    def _limit(self, data):
+        if self._remaining is None:
+            return data
+        data = data[:self._remaining]
+        self._remaining -= len(data)
+        if self._remaining == 0:
+            self.done = True
+        return data
+
+    def _dechunk(self, data):
+        out = []
+        position = 0
+        while position < len(data) and not self.done:
+            if self._chunk_left:
+                piece = data[position:position + self._chunk_left]
+                out.append(piece)
+                position += len(piece)
+                self._chunk_left -= len(piece)
+                continue
+            # 块大小行（块数据之后的空行也在这里跳过）
+            end = data.find(b"\n", position)
+            if end == -1:
+                self._line += data[position:]
+                if len(self._line) > MAX_HEADER_SIZE:
+                    self.error = "分块传输编码格式错误"
+                    self.done = True
+                break
+            line = (self._line + data[position:end]).strip()
+            self._line = b""
+            position = end + 1
+            if not line:
+                continue
+            try:
+                size = int(line.split(b";")[0], 16)
+            except ValueError:
+                self.error = "分块传输编码格式错误"
+                self.done = True
+                break
+            if size == 0:
+                self.done = True
+            self._chunk_left = size
+        return b"".join(out)
+
+    def _decompress(self, body):
+        if self._inflate is None or not body:
+            return body
+        try:
+            return self._inflate.decompress(body)
+        except zlib.error as e:
+            self.error = f"无法解压响应内容：{e}"
+            self.done = True
+            return b""
+
+    def close(self):
+        """连接关闭：没有长度信息的响应到此结束"""
+        if self.status == 200 and not self._chunked and self._remaining is None:
+            self.done = True
+
+
+class TcpStream:
+    """按序号重组一个方向的 TCP 数据"""
+
+    def __init__(self, start):
+        self.start = start   # 起始序号
+        self.offset = 0      # 已交付的数据长度
+        self.pending = {}    # 相对位置 -> 乱序到达的数据
+        self.pending_size = 0
+        self.fin = None      # FIN 的相对位置
+
+    def _relative(self, seq):
+        offset = (seq - self.start) & 0xFFFFFFFF
+        return offset - (1 << 32) if offset >= 1 << 31 else offset
+
+    def add(self, seq, flags, data):
+        """加入一个段，返回可以按序交付的数据；乱序数据超过上限时抛出 OverflowError"""
+        position = self._relative(seq)
+        if flags & _TCP_FIN:
+            self.fin = position + len(data)
+        if not data or position + len(data) <= self.offset:
+            return b""  # 重传的旧数据
+        if position > self.offset:
+            if position not in self.pending or len(self.pending[position]) < len(data):
+                self.pending_size += len(data) - len(self.pending.get(position, b""))
+                self.pending[position] = data
+                if self.pending_size > MAX_PENDING:
+                    raise OverflowError("乱序数据过多")
+            return b""
+        out = [data[self.offset - position:]]
+        self.offset = position + len(data)
+        while self.pending:
+            ready = [start for start in self.pending if start <= self.offset]
+            if not ready:
+                break
+            for start in sorted(ready):
+                piece = self.pending.pop(start)
+                self.pending_size -= len(piece)
+                if start + len(piece) > self.offset:
+                    out.append(piece[self.offset - start:])
+                    self.offset = start + len(piece)
+        return b"".join(out)
+
+    @property
+    def closed(self):
+        return self.fin is not None and self.offset >= self.fin
+
+
+class _Flow:
+    """一个被跟踪的请求连接：服务器方向的重组和响应解码"""
+    __slots__ = ("stream", "decoder")
+
+    def __init__(self, start):
+        self.stream = TcpStream(start)
+        self.decoder = HttpResponseDecoder()
+
+
+def iter_response_body(packets, progress=None):
+    """从数据包序列中产出第一个目标 200 响应的正文字节块
+
+    packets 为 (链路类型, 帧数据) 序列（iter_packets 的结果）；progress() 每隔 PROGRESS_INTERVAL 个包调用一次。
+    返回值（StopIteration.value）为 (是否找到响应, 响应是否完整, 错误说明)；
+    没有找到响应时错误说明为抓包被截断或损坏的提示（如果有）。
+    """
+    flows = {}     # 服务器方向的连接键 -> _Flow
+    chosen = None  # 已收到 200 响应头、正在产出正文的连接键
+    damage = []    # 读取数据包时发现的截断或损坏
+
+    def read_packets():
+        damage.append((yield from packets))
+
+    for count, (linktype, frame) in enumerate(read_packets(), 1):
+        if progress is not None and count % PROGRESS_INTERVAL == 0:
+            progress()
+        segment = parse_tcp(linktype, frame)
+        if segment is None:
+            continue
+        key, seq, ack, flags, data = segment
+        flow = flows.get(key)
+        if flow is None:
+            if data and chosen is None and is_target_request(data):
+                # 响应从请求包确认的序号开始；同一连接上的新请求重新开始重组，重传的请求忽略
+                src, sport, dst, dport = key
+                reverse = (dst, dport, src, sport)
+                existing = flows.get(reverse)
+                if existing is None or existing.stream.start != ack:
+                    if existing is None and len(flows) >= MAX_FLOWS:
+                        del flows[next(iter(flows))]
+                    flows[reverse] = _Flow(ack)
+            continue
+        if not data and not flags & _TCP_FIN:
+            continue
+        try:
+            data = flow.stream.add(seq, flags, data)
+        except OverflowError as e:
+            if key == chosen:
+                return True, False, f"响应数据缺失（{e}）"
+            del flows[key]
+            continue
+        decoder = flow.decoder
+        body = decoder.feed(data) if data else b""
+        if decoder.status == 200 and chosen is None:
+            # 只保留第一个成功的响应，其他连接不再跟踪
+            chosen = key
+            flows = {key: flow}
+        if key == chosen and body:
+            yield body
+        if flow.stream.closed:
+            decoder.close()
+        if decoder.done:
+            if key == chosen:
+                return True, decoder.error is None, decoder.error
+            del flows[key]
+    problem = damage[0] if damage else None
+    if chosen is None:
+        return False, False, problem
+    return True, False, problem or "抓包在响应结束前中断"
+
+
+class CaptureBody:
+    """以文本文件对象的形式读取抓包中的响应正文
+
+    读完后 found 表示是否找到目标响应，error 为响应不完整等问题的说明。
+    """
+
+    def __init__(self, path, progress=None):
+        self._file = open(path, "rb", buffering=READ_BUFFER_SIZE)
+        file = self._file
+        total = file.seek(0, 2)
+        file.seek(0)
+        report = (lambda: progress(file.tell(), total)) if progress is not None else None
+        self._chunks = iter_response_body(iter_packets(file), report)
+        self._decoder = None
+        self._buffer = ""
+        self._finished = False
+        self.found = False
+        self.error = None
+
+    def _next(self):
+        """读取下一块正文并解码，正文结束时返回 None"""
+        if self._finished:
+            return None
+        try:
+            data = next(self._chunks)
+        except StopIteration as stop:
+            self._finished = True
+            self.found, complete, self.error = stop.value
+            if self.found and complete and self.error is None and self._decoder is not None:
+                return self._decoder.decode(b"", final=True) or None
+            return None
+        if self._decoder is None:
+            self._decoder = codecs.getincrementaldecoder("utf-8")()
+        return self._decoder.decode(data)
+
+    def read(self, size=-1):
+        """读取最多 size 个字符，正文结束时返回空字符串"""
+        while size < 0 or len(self._buffer) < size:
+            text = self._next()
+            if text is None:
+                break
+            self._buffer += text
+        if size < 0:
+            text, self._buffer = self._buffer, ""
+        else:
+            text, self._buffer = self._buffer[:size], self._buffer[size:]
+        return text
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
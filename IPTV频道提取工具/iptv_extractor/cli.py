@@ -0,0 +1,144 @@
+"""命令行入口：python -m iptv_extractor input.jsp -o out.csv"""
+
+import argparse
+import os
+import sys
+
+from .cache import ExtractCache
+from .core import ExtractError, ExtractOptions, process_file
+from .epg import EpgError, load_epg, write_trimmed_epg
+from .names import NamesError
+from .rules import RulesError
+from .stats import RunStats
+from .writers import FORMATS
+
+# 默认输出文件名，与GUI保持一致
+DEFAULT_OUTPUT_NAME = "全部频道.csv"
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor",
+        description="从JSP文件中提取IPTV频道信息并分类整理",
+    )
+    parser.add_argument("input", help="getchannellistHWCU.jsp 文件或包含该请求的 pcap/pcapng 抓包路径")
+    parser.add_argument("-o", "--output", help=f"输出文件路径（默认：输入文件所在目录下的{DEFAULT_OUTPUT_NAME}）")
+    add_option_arguments(parser)
+    add_format_argument(parser)
+    add_cache_arguments(parser)
+    add_epg_arguments(parser)
+    add_stats_arguments(parser)
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出统计信息")
+    return parser
+
+
+def add_format_argument(parser):
+    """添加输出格式参数"""
+    parser.add_argument("--format", dest="fmt", choices=FORMATS,
+                        help="输出格式：txt（DIYP）、m3u 或 json（默认由输出文件扩展名决定）")
+
+
+def add_option_arguments(parser):
+    """添加与 ExtractOptions 对应的提取选项参数"""
+    parser.add_argument("--no-smil", dest="extract_smil", action="store_false", help="不提取.smil格式地址")
+    parser.add_argument("--no-m3u8", dest="extract_m3u8", action="store_false", help="不提取.m3u8格式地址")
+    parser.add_argument("--keep-shopping", dest="skip_shopping", action="store_false", help="保留购物频道")
+    parser.add_argument("--keep-mongolian", dest="skip_mongolian", action="store_false", help="保留蒙语频道")
+    parser.add_argument("--rules", dest="rules_path", help="分类和跳过规则文件（JSON/TOML，默认使用内置规则）")
+    parser.add_argument("--aliases", dest="aliases_path",
+                        help="频道别名文件（JSON，默认使用内置别名表），用于合并去重和排序")
+    parser.add_argument("--natural-sort", action="store_true",
+                        help="分类内按频道号排序（CCTV-1、CCTV-5、CCTV-5+……），默认保持抓包中的顺序")
+
+
+def add_epg_arguments(parser):
+    """添加节目单参数"""
+    parser.add_argument("--epg", dest="epg_path",
+                        help="XMLTV 节目单（.xml 或 .xml.gz），按频道名称匹配后在 M3U/JSON 中加上 tvg-id 和 tvg-logo")
+    parser.add_argument("--epg-output", help="只保留已输出频道的精简节目单（.gz 结尾时压缩），需要同时指定 --epg")
+
+
+def add_cache_arguments(parser):
+    """添加缓存相关参数"""
+    parser.add_argument("--no-cache", dest="use_cache", action="store_false",
+                        help="不读取也不写入提取结果缓存")
+    parser.add_argument("--cache-dir", help="缓存目录（默认：用户缓存目录下的 iptv_extractor）")
+
+
+def cache_from_args(args):
+    """根据命令行参数返回 ExtractCache，禁用缓存时返回 None"""
+    if not args.use_cache:
+        return None
+    return ExtractCache(args.cache_dir)
+
+
+def add_stats_arguments(parser):
+    """添加耗时统计和性能分析参数"""
+    parser.add_argument("--stats", dest="stats_path", help="把各阶段耗时和计数写入JSON报告")
+    parser.add_argument("--profile", help="用 cProfile 分析运行过程，把 .prof 文件保存到该路径（报告中包含耗时最多的函数）")
+    parser.add_argument("--trace-memory", action="store_true", help="用 tracemalloc 记录内存峰值（会明显变慢）")
+
+
+def options_from_args(args):
+    """根据命令行参数生成提取选项"""
+    return ExtractOptions(
+        extract_smil=args.extract_smil,
+        extract_m3u8=args.extract_m3u8,
+        skip_shopping=args.skip_shopping,
+        skip_mongolian=args.skip_mongolian,
+        rules_path=args.rules_path,
+        natural_sort=args.natural_sort,
+        aliases_path=args.aliases_path,
+    )
+
+
+def print_summary(extracted, output_path, rules, file=sys.stdout):
+    """输出提取统计信息"""
+    print(f"成功提取 {len(extracted.results)} 条记录{'（使用缓存）' if extracted.cached else ''}", file=file)
+    print(f"跳过 {len(extracted.skipped_channels)} 条无效地址记录", file=file)
+    for skip_id, title in rules.skip_titles.items():
+        print(f"跳过 {len(extracted.skipped_by_filter.get(skip_id, []))} 条{title}", file=file)
+    print(f"完整数据已保存至：{output_path}", file=file)
+
+
+def print_epg_summary(results, epg, output_path=None, kept=None, file=sys.stdout):
+    """输出节目单匹配情况"""
+    matched = sum(1 for channel in results if epg.find(channel.name) is not None)
+    print(f"节目单共 {epg.channels} 个频道，匹配 {matched}/{len(results)} 条记录", file=file)
+    if kept is not None:
+        print(f"精简节目单保留 {kept[0]} 个频道、{kept[1]} 个节目，已保存至：{output_path}", file=file)
+
+
+def main(argv=None):
+    """命令行主函数，返回进程退出码"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.epg_output and not args.epg_path:
+        parser.error("--epg-output 需要同时指定 --epg")
+    output_path = args.output or os.path.join(os.path.dirname(args.input), DEFAULT_OUTPUT_NAME)
+
+    options = options_from_args(args)
+    stats = RunStats(profile=bool(args.profile), trace_memory=args.trace_memory)
+    epg = kept = None
+    try:
+        with stats.capture(args.profile):
+            if args.epg_path:
+                with stats.stage("epg"):
+                    epg = load_epg(args.epg_path, options.names())
+            extracted = process_file(args.input, output_path, options, args.fmt, cache_from_args(args), stats, epg)
+            if args.epg_output:
+                with stats.stage("epg_output"):
+                    kept = write_trimmed_epg(args.epg_path, args.epg_output, epg.ids(extracted.results))
+        if args.stats_path:
+            stats.write_json(args.stats_path)
+    except (ExtractError, RulesError, NamesError, EpgError, OSError, UnicodeDecodeError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print_summary(extracted, output_path, options.rules())
+        if epg is not None:
+            print_epg_summary(extracted.results, epg, args.epg_output, kept)
+        print("耗时：" + "，".join(stats.summary_lines()))
+    return 0
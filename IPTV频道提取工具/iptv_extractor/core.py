@@ -0,0 +1,332 @@
+"""频道提取核心逻辑，不依赖tkinter，可供GUI、命令行和脚本共同使用"""
+
+import re
+import sys
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+
+from .capture import CaptureBody, is_capture
+from .names import load_names
+from .rules import load_rules
+from .scanner import iter_cusetconfig_file, iter_cusetconfig_stream
+from .writers import iter_txt_lines, write_output
+
+# 提取频道时需要解码的CUSetConfig字段
+CHANNEL_FIELDS = ("ChannelID", "UserChannelID", "ChannelName", "ChannelURL", "TimeShiftURL")
+
+
+class ExtractError(Exception):
+    """提取失败（如未找到任何有效频道）"""
+
+
+class ExtractCancelled(Exception):
+    """提取被用户取消"""
+
+
+@dataclass
+class ExtractOptions:
+    """提取选项，对应GUI中的各个复选框"""
+    extract_smil: bool = True
+    extract_m3u8: bool = True
+    skip_shopping: bool = True
+    skip_mongolian: bool = True
+    rules_path: str = None  # 分类规则文件，None 表示使用默认规则
+    natural_sort: bool = False  # 分类内按频道号排序，False 时保持抓包中的顺序
+    aliases_path: str = None  # 频道别名文件，None 表示使用默认别名表
+
+    def rules(self):
+        """返回编译后的规则集"""
+        return load_rules(self.rules_path)
+
+    def names(self):
+        """返回频道别名索引"""
+        return load_names(self.aliases_path)
+
+
+class Channel:
+    """一条频道记录，保存CUSetConfig中的主要字段，分类在创建时计算一次
+
+    url 为按所选格式截取后的播放地址（同一频道的 smil 和 m3u8 地址各是一条记录），
+    输出时才由写入函数格式化成文本。
+    """
+    __slots__ = ("name", "url", "kind", "category", "channel_id", "user_channel_id",
+                 "channel_url", "timeshift_url")
+
+    def __init__(self, name, url, kind, category, channel_id="", user_channel_id="",
+                 channel_url="", timeshift_url=""):
+        self.name = name
+        self.url = url
+        self.kind = kind                        # smil / m3u8 / other
+        self.category = category                # 规则集中的分类 id
+        self.channel_id = channel_id            # ChannelID
+        self.user_channel_id = user_channel_id  # UserChannelID（遥控器上的频道号）
+        self.channel_url = channel_url          # ChannelURL（组播地址）
+        self.timeshift_url = timeshift_url      # 原始的 TimeShiftURL
+
+    def astuple(self):
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if not isinstance(other, Channel):
+            return NotImplemented
+        return self.astuple() == other.astuple()
+
+    def __repr__(self):
+        return f"Channel({self.name!r}, {self.url!r}, {self.kind!r}, {self.category!r})"
+
+
+@dataclass
+class ExtractResult:
+    """提取结果（已排序的 Channel 列表）及各类被跳过的频道名称"""
+    results: list = field(default_factory=list)
+    skipped_channels: list = field(default_factory=list)
+    skipped_by_filter: dict = field(default_factory=dict)  # 跳过规则 id -> 频道名称列表
+    cached: bool = False  # 是否来自缓存
+
+    @property
+    def skipped_shopping_channels(self):
+        return self.skipped_by_filter.get("shopping", [])
+
+    @property
+    def skipped_mongolian_channels(self):
+        return self.skipped_by_filter.get("mongolian", [])
+
+
+def classify(name, rules=None):
+    """根据频道名称返回分类"""
+    return (rules or load_rules()).classify(name)
+
+
+def url_kind(url):
+    """返回地址格式"""
+    if url.endswith(".smil"):
+        return "smil"
+    if url.endswith(".m3u8"):
+        return "m3u8"
+    return "other"
+
+
+def make_channel(name, url, category=None, rules=None):
+    """创建频道记录，未给出分类时根据名称计算"""
+    if category is None:
+        category = classify(name, rules)
+    return Channel(name, url, url_kind(url), category)
+
+
+def _stage(stats, name):
+    """stats 为 None 时不计时"""
+    return stats.stage(name) if stats is not None else nullcontext()
+
+
+def extract_channels(calls, options=None, cancel=None, stats=None):
+    """从CUSetConfig调用的字段字典序列中提取频道信息
+
+    cancel 为 threading.Event 之类的对象，被设置后抛出 ExtractCancelled。
+    stats（RunStats）给出时分别统计扫描、过滤分类和排序的耗时。
+    """
+    if options is None:
+        options = ExtractOptions()
+
+    results = []
+    extracted = ExtractResult()
+    rules = options.rules()
+    extract_smil = options.extract_smil
+    extract_m3u8 = options.extract_m3u8
+
+    if stats is not None:
+        # 扫描是惰性的，与过滤分类交替进行，取下一个调用的时间计入 scan
+        calls = stats.timed_iter("scan", calls)
+        scan_before = stats.timings.get("scan", 0.0)
+        loop_start = time.perf_counter()
+
+    # 逐个处理CUSetConfig调用，每个调用只解析一次
+    for fields in calls:
+        if cancel is not None and cancel.is_set():
+            raise ExtractCancelled("已取消")
+        name = fields.get("ChannelName")
+        if name is None:
+            continue
+        url = fields.get("TimeShiftURL", "")
+        get = fields.get
+
+        # 每个频道名称只扫描一次，跳过规则和分类共用扫描结果
+        found = rules.scan(name)
+
+        # 跳过购物、蒙语等频道
+        skip_id = rules.skip_reason(found, options)
+        if skip_id is not None:
+            extracted.skipped_by_filter.setdefault(skip_id, []).append(name)
+            continue
+
+        added = False
+
+        # 如果URL为空或不包含有效地址，则跳过并记录
+        if not url or url.startswith("/-?") or (not ".smil" in url and not ".m3u8" in url):
+            extracted.skipped_channels.append(name)
+            continue
+
+        category = rules.classify_found(found)
+        channel_id = get("ChannelID", "")
+        user_channel_id = get("UserChannelID", "")
+        channel_url = get("ChannelURL", "")
+
+        # 根据用户选择的格式进行处理
+        if extract_smil and ".smil" in url:
+            smil_index = url.rfind(".smil")
+            if smil_index != -1:
+                results.append(Channel(name, url[:smil_index+5], "smil", category,
+                                       channel_id, user_channel_id, channel_url, url))
+                added = True
+
+        if extract_m3u8 and ".m3u8" in url:
+            m3u8_index = url.rfind(".m3u8")
+            if m3u8_index != -1:
+                results.append(Channel(name, url[:m3u8_index+5], "m3u8", category,
+                                       channel_id, user_channel_id, channel_url, url))
+                added = True
+
+        # 如果两种格式都没选，或URL中没有这两种格式，则保留原URL
+        if not added and (not extract_smil and not extract_m3u8 or
+                          not (".smil" in url or ".m3u8" in url)):
+            results.append(Channel(name, url, "other", category,
+                                   channel_id, user_channel_id, channel_url, url))
+
+    if stats is not None:
+        scanned = stats.timings.get("scan", 0.0) - scan_before
+        stats.add("classify", time.perf_counter() - loop_start - scanned)
+
+    # 对结果进行排序
+    with _stage(stats, "sort"):
+        extracted.results = sort_channels(results, rules, options.natural_sort,
+                                          options.names() if options.natural_sort else None)
+    return extracted
+
+
+# 规范ID中的频道编号，后面紧跟 K 的是 4K/8K 而不是编号
+_NUMBER_PATTERN = re.compile(r"(\d+)(?![\dK])(\+?)")
+
+
+def _name_key(name, names):
+    """名称部分的排序信息：(带编号时为 (前缀, 编号, “+”, 后缀)，否则为 None, 清晰度, 规范ID)"""
+    channel_id, quality = names.lookup(name)
+    match = _NUMBER_PATTERN.search(channel_id)
+    if match is None:
+        return None, quality, channel_id
+    return ((channel_id[:match.start()], int(match.group(1)), match.group(2), channel_id[match.end():]),
+            quality, channel_id)
+
+
+def natural_key(channel, name_keys=None, names=None):
+    """频道在分类内的排序键
+
+    名称先由别名索引（names）映射为规范ID和清晰度。规范ID中带编号的（如 CCTV5+）
+    按 前缀、编号、“+”、清晰度 排列，排在前面；其余按 UserChannelID、规范ID、清晰度 排列。
+    最后以名称和地址区分，因此结果与记录在抓包中的先后无关。
+    name_keys 为按名称缓存解析结果的字典。
+    """
+    name = channel.name
+    if name_keys is None:
+        parsed = _name_key(name, names or load_names())
+    else:
+        parsed = name_keys.get(name)
+        if parsed is None:
+            parsed = name_keys[name] = _name_key(name, names or load_names())
+    numbered, quality, base = parsed
+    user_channel_id = channel.user_channel_id
+    number = int(user_channel_id) if user_channel_id.isdigit() else sys.maxsize
+    if numbered is not None:
+        return (0,) + numbered + (quality, number, name, channel.url)
+    return (1, number, base, quality, name, channel.url)
+
+
+def sort_channels(channels, rules=None, natural=False, names=None):
+    """按分类优先级对频道进行排序
+
+    natural 为 False 时分类内保持原有顺序；为 True 时按 natural_key 排序，
+    排序键对每条记录只计算一次，整个列表只排序一次。names 为别名索引，默认使用内置别名表。
+    """
+    rules = rules or load_rules()
+    if not natural:
+        return [channel for members in rules.group(channels).values() for channel in members]
+    ranks = {category: rank for rank, category in enumerate(rules.order)}
+    default = ranks[rules.default_category]
+    names = names or load_names()
+    name_keys = {}  # 同名记录（smil 和 m3u8 两条、多次抓包合并）只解析一次名称
+    return sorted(channels, key=lambda channel: (ranks.get(channel.category, default),)
+                  + natural_key(channel, name_keys, names))
+
+
+def format_results_with_headers(results, rules=None):
+    """为分类的结果添加标题行，返回输出文件中的各行"""
+    return list(iter_txt_lines(results, rules or load_rules()))
+
+
+def _extract_capture(input_path, options, progress, cancel, stats):
+    """从抓包中的响应正文提取频道，响应缺失或不完整时抛出 ExtractError"""
+    def on_progress(done, total):
+        # 找到响应之前不会产出调用，在读取数据包时检查取消
+        if cancel is not None and cancel.is_set():
+            raise ExtractCancelled("已取消")
+        if progress is not None:
+            progress(done, total)
+
+    with CaptureBody(input_path, on_progress) as body:
+        extracted = extract_channels(iter_cusetconfig_stream(body), options, cancel, stats)
+    if not body.found:
+        detail = f"（{body.error}）" if body.error else ""
+        raise ExtractError(f"抓包中没有找到 getchannellistHWCU.jsp 的响应{detail}")
+    if body.error is not None:
+        raise ExtractError(f"抓包中的 getchannellistHWCU.jsp 响应不完整：{body.error}")
+    return extracted
+
+
+def extract_file(input_path, options=None, cache=None, progress=None, cancel=None, stats=None):
+    """扫描输入文件并提取频道信息，未找到有效频道时抛出 ExtractError
+
+    给出 cache（ExtractCache）时，输入内容和选项都未变化则直接返回缓存的结果。
+    输入为 pcap/pcapng 抓包时直接从中重组 getchannellistHWCU.jsp 的响应（见 capture 模块）。
+    progress、cancel 和 stats 见 iter_cusetconfig_file 和 extract_channels。
+    """
+    if options is None:
+        options = ExtractOptions()
+    key = None
+    if cache is not None:
+        with _stage(stats, "cache"):
+            key = cache.key(input_path, options)
+            extracted = cache.load(key)
+        if extracted is not None:
+            if stats is not None:
+                stats.record_result(extracted)
+            return extracted
+
+    if is_capture(input_path):
+        extracted = _extract_capture(input_path, options, progress, cancel, stats)
+    else:
+        calls = iter_cusetconfig_file(input_path, fields=CHANNEL_FIELDS, progress=progress)
+        extracted = extract_channels(calls, options, cancel, stats)
+    if stats is not None:
+        stats.record_result(extracted)
+    if not extracted.results:
+        raise ExtractError("未找到任何有效频道信息")
+
+    if cache is not None:
+        with _stage(stats, "cache"):
+            try:
+                cache.store(key, extracted)
+            except OSError:
+                pass  # 缓存目录不可写时不影响提取
+    return extracted
+
+
+def write_results(output_path, results, rules=None, fmt=None, atomic=False, epg=None):
+    """按输出格式（默认由扩展名决定）写入结果，atomic 和 epg 见 write_output"""
+    write_output(output_path, results, rules, fmt, atomic, epg)
+
+
+def process_file(input_path, output_path, options=None, fmt=None, cache=None, stats=None, epg=None):
+    """提取输入文件中的频道并写入输出文件"""
+    extracted = extract_file(input_path, options, cache, stats=stats)
+    with _stage(stats, "write"):
+        write_results(output_path, extracted.results, options.rules() if options else None, fmt, epg=epg)
+    return extracted
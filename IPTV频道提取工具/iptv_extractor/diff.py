@@ -0,0 +1,192 @@
+"""比较两次抓包的频道列表，找出新增、删除、改名和换地址的频道
+
+用法：python -m iptv_extractor.diff 旧列表 新列表 [-o diff.json] [--exit-code]
+
+输入可以是JSP抓包，也可以是已生成的频道列表（name,url 格式）。
+两侧都按规范化的频道名称、别名表中的规范ID和URL路径建立哈希索引，整个比较对记录总数是 O(n) 的。
+结果为JSON，便于发布脚本只推送变化的部分。
+"""
+
+import argparse
+import json
+import sys
+from collections import defaultdict, deque
+
+from .cli import add_cache_arguments, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError, url_kind
+from .merge import load_source, url_path
+from .names import NamesError, load_names, normalize
+from .rules import RulesError
+
+
+class ChannelDiff:
+    """比较结果，每项都是 (名称, 地址) 或 (旧, 新) 的组合"""
+
+    def __init__(self):
+        self.added = []        # (名称, 地址)
+        self.removed = []      # (名称, 地址)
+        self.renamed = []      # (旧名称, 新名称, 旧地址, 新地址)
+        self.url_changed = []  # (名称, 旧地址, 新地址)
+        self.unchanged = 0
+
+    @property
+    def changed(self):
+        return bool(self.added or self.removed or self.renamed or self.url_changed)
+
+    def summary(self):
+        return {
+            "added": len(self.added),
+            "removed": len(self.removed),
+            "renamed": len(self.renamed),
+            "url_changed": len(self.url_changed),
+            "unchanged": self.unchanged,
+        }
+
+    def to_dict(self):
+        """转换为可JSON序列化的字典"""
+        return {
+            "summary": self.summary(),
+            "added": [{"name": name, "url": url} for name, url in self.added],
+            "removed": [{"name": name, "url": url} for name, url in self.removed],
+            "renamed": [{"old_name": old_name, "new_name": new_name, "old_url": old_url, "new_url": new_url}
+                        for old_name, new_name, old_url, new_url in self.renamed],
+            "url_changed": [{"name": name, "old_url": old_url, "new_url": new_url}
+                            for name, old_url, new_url in self.url_changed],
+        }
+
+
+def _index(channels, key):
+    """按 key 建立 键 -> 记录序号队列 的索引"""
+    index = defaultdict(deque)
+    for i, (name, url) in enumerate(channels):
+        index[key(name, url)].append(i)
+    return index
+
+
+def _take(index, key, matched):
+    """从索引中取出一条尚未匹配的记录序号，没有则返回 None"""
+    queue = index.get(key)
+    while queue:
+        i = queue.popleft()
+        if not matched[i]:
+            return i
+    return None
+
+
+def diff_channels(old, new, names=None):
+    """比较两个 (名称, 地址) 列表，返回 ChannelDiff
+
+    依次按 名称+地址（未变化）、地址（改名）、名称（换地址）、URL路径（改名）配对，
+    剩下的旧记录为删除，新记录为新增。换地址一步按别名索引 names（默认为内置别名表）
+    比较 (规范ID, 清晰度)，CCTV-1高清 改叫 CCTV1 HD 并换了地址时仍算作换地址。
+    """
+    result = ChannelDiff()
+    old_matched = [False] * len(old)
+    new_matched = [False] * len(new)
+
+    # 名称和地址都相同
+    exact = _index(old, lambda name, url: (normalize(name), url))
+    for j, (name, url) in enumerate(new):
+        i = _take(exact, (normalize(name), url), old_matched)
+        if i is not None:
+            old_matched[i] = new_matched[j] = True
+            result.unchanged += 1
+
+    # 地址相同、名称不同（包括别名表中同一频道的另一种写法），先于按名称配对，避免报告为换了相同的地址
+    same_url = _index(old, lambda name, url: url)
+    for j, (name, url) in enumerate(new):
+        if new_matched[j]:
+            continue
+        i = _take(same_url, url, old_matched)
+        if i is not None:
+            old_matched[i] = new_matched[j] = True
+            result.renamed.append((old[i][0], name, old[i][1], url))
+
+    # 名称相同、地址不同；同一频道的 smil 和 m3u8 地址各算一条记录，分别比较
+    names = names or load_names()
+    by_name = _index(old, lambda name, url: (names.lookup(name), url_kind(url)))
+    for j, (name, url) in enumerate(new):
+        if new_matched[j]:
+            continue
+        i = _take(by_name, (names.lookup(name), url_kind(url)), old_matched)
+        if i is not None:
+            old_matched[i] = new_matched[j] = True
+            result.url_changed.append((name, old[i][1], url))
+
+    # 同一路流换了名称
+    by_path = _index(old, lambda name, url: url_path(url))
+    for j, (name, url) in enumerate(new):
+        if new_matched[j]:
+            continue
+        i = _take(by_path, url_path(url), old_matched)
+        if i is not None:
+            old_matched[i] = new_matched[j] = True
+            result.renamed.append((old[i][0], name, old[i][1], url))
+
+    result.removed = [channel for channel, matched in zip(old, old_matched) if not matched]
+    result.added = [channel for channel, matched in zip(new, new_matched) if not matched]
+    return result
+
+
+def print_report(result, file=sys.stdout):
+    """输出可读的比较结果"""
+    for name, url in result.added:
+        print(f"+ {name},{url}", file=file)
+    for name, url in result.removed:
+        print(f"- {name},{url}", file=file)
+    for old_name, new_name, _, new_url in result.renamed:
+        print(f"~ {old_name} -> {new_name},{new_url}", file=file)
+    for name, old_url, new_url in result.url_changed:
+        print(f"* {name},{old_url} -> {new_url}", file=file)
+    summary = result.summary()
+    print(f"新增 {summary['added']} 条，删除 {summary['removed']} 条，改名 {summary['renamed']} 条，"
+          f"换地址 {summary['url_changed']} 条，未变化 {summary['unchanged']} 条", file=file)
+
+
+def main(argv=None):
+    """比较模式主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.diff",
+        description="比较两次抓包的频道列表，输出新增、删除、改名和换地址的频道",
+    )
+    parser.add_argument("old", help="旧的JSP抓包或频道列表")
+    parser.add_argument("new", help="新的JSP抓包或频道列表")
+    parser.add_argument("-o", "--output", help="JSON结果输出路径（默认输出到标准输出）")
+    parser.add_argument("--exit-code", action="store_true", help="有变化时以退出码 1 结束（类似 git diff --exit-code）")
+    add_option_arguments(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("-q", "--quiet", action="store_true", help="写入文件时不输出变化列表")
+    args = parser.parse_args(argv)
+
+    options = options_from_args(args)
+    try:
+        cache = cache_from_args(args)
+        names = options.names()
+        old = [(channel.name, channel.url) for channel in load_source(args.old, options, cache)]
+        new = [(channel.name, channel.url) for channel in load_source(args.new, options, cache)]
+    except (ExtractError, RulesError, NamesError, OSError, UnicodeDecodeError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 2
+
+    result = diff_channels(old, new, names)
+    data = dict(old=args.old, new=args.new, **result.to_dict())
+    if args.output:
+        try:
+            with open(args.output, "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except OSError as e:
+            print(f"处理失败：{e}", file=sys.stderr)
+            return 2
+        if not args.quiet:
+            print_report(result)
+    else:
+        json.dump(data, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+
+    if args.exit_code and result.changed:
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""在频道ID的空缺中发现抓包里没有列出的隐藏频道
+
+用法：python -m iptv_extractor.discover 输入 [-o 隐藏频道.txt] [--margin 50] [--rate 20]
+
+输入可以是JSP抓包，也可以是已生成的频道列表（name,url 格式）。
+从地址中收集频道ID（如 .../PLTV/88888912/224/3221226643/411164633.smil 中的 3221226643），
+对已知ID之间的空缺以及两端 --margin 范围内的ID生成候选地址（文件名取ID最接近的已知频道），
+在并发数、每个主机连接数和每秒请求数的限制下检测。可用的地址追加到隐藏频道列表，
+已检测过的ID记录在检查点文件中，中断后再次运行会从断点继续。
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import os
+import re
+import sys
+import time
+
+from .cli import add_cache_arguments, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError
+from .merge import load_source, read_playlist
+from .probe import DEFAULT_TIMEOUT, RTSP_METHODS, RTSP_OPTIONS, Prober
+from .names import NamesError
+from .rules import RulesError
+
+DEFAULT_OUTPUT_NAME = "隐藏频道.txt"
+
+# 比地址检测更保守的默认限制，避免对服务器造成压力
+DEFAULT_MARGIN = 50
+DEFAULT_CONCURRENCY = 8
+DEFAULT_PER_HOST = 4
+DEFAULT_RATE = 20.0
+
+# 每检测这么多个候选地址保存一次结果和检查点
+CHUNK_SIZE = 200
+
+CHECKPOINT_VERSION = 1
+
+# 发现的频道没有名称，用ID命名
+HIDDEN_NAME = "隐藏频道{id}"
+
+# 地址中的频道ID：路径中倒数第二段的长数字
+_ID_PATTERN = re.compile(r"^(?P<prefix>[a-z]+://[^?#]*/)(?P<id>\d{6,})/(?P<file>[^/?#]+)(?P<query>\?[^#]*)?$",
+                         re.IGNORECASE)
+
+
+def split_url(url):
+    """拆分地址，返回 (前缀, 频道ID, 文件名和参数)，不是这种格式时返回 None"""
+    match = _ID_PATTERN.match(url)
+    if match is None:
+        return None
+    return match.group("prefix"), int(match.group("id")), match.group("file") + (match.group("query") or "")
+
+
+class IdSpace:
+    """按地址前缀（协议、主机和路径）收集已知的频道ID和文件名"""
+
+    def __init__(self):
+        self.known = set()     # 所有前缀下已知的频道ID
+        self.prefixes = {}     # 前缀 -> {频道ID: 文件名}
+
+    def add(self, url):
+        parts = split_url(url)
+        if parts is None:
+            return False
+        prefix, channel_id, file = parts
+        self.known.add(channel_id)
+        self.prefixes.setdefault(prefix, {}).setdefault(channel_id, file)
+        return True
+
+    def candidates(self, margin=DEFAULT_MARGIN, done=None):
+        """产出 (前缀, 频道ID, 候选地址)，跳过已知和已检测过的ID"""
+        done = done or {}
+        for prefix in sorted(self.prefixes):
+            files = self.prefixes[prefix]
+            ids = sorted(files)
+            checked = done.get(prefix, ())
+            for channel_id in range(max(ids[0] - margin, 0), ids[-1] + margin + 1):
+                if channel_id in self.known or channel_id in checked:
+                    continue
+                # 文件名（内容ID）取ID最接近的已知频道
+                index = bisect.bisect_left(ids, channel_id)
+                neighbours = ids[max(index - 1, 0):index + 1]
+                nearest = min(neighbours, key=lambda known: abs(known - channel_id))
+                yield prefix, channel_id, f"{prefix}{channel_id}/{files[nearest]}"
+
+
+def load_checkpoint(path):
+    """读取检查点，返回 前缀 -> 已检测过的ID集合"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if data.get("version") != CHECKPOINT_VERSION:
+        return {}
+    return {prefix: set(ids) for prefix, ids in data.get("done", {}).items()}
+
+
+def save_checkpoint(path, done):
+    """先写入临时文件再替换，中断时不会留下不完整的检查点"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": CHECKPOINT_VERSION,
+                   "done": {prefix: sorted(ids) for prefix, ids in done.items()}}, f)
+    os.replace(tmp_path, path)
+
+
+def append_hidden(path, hits):
+    """把发现的频道追加到隐藏频道列表（name,url 格式）"""
+    with open(path, "a", encoding="utf-8", newline="\n") as f:
+        for name, url in hits:
+            f.write(f"{name},{url}\n")
+
+
+async def discover(candidates, prober, done, on_chunk=None, chunk_size=CHUNK_SIZE):
+    """分批检测候选地址，返回 [(频道ID, 地址)]
+
+    done 为 前缀 -> 已检测ID集合，每批检测完成后更新；on_chunk(hits) 在每批之后调用，
+    用于保存结果和检查点。
+    """
+    found = []
+    candidates = iter(candidates)
+    while True:
+        chunk = [candidate for _, candidate in zip(range(chunk_size), candidates)]
+        if not chunk:
+            return found
+        results = await prober.probe_all([url for _, _, url in chunk])
+        hits = []
+        for (prefix, channel_id, url), result in zip(chunk, results):
+            done.setdefault(prefix, set()).add(channel_id)
+            if result.ok:
+                hits.append((channel_id, url))
+        found.extend(hits)
+        if on_chunk is not None:
+            on_chunk(hits)
+
+
+def main(argv=None):
+    """发现模式主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.discover",
+        description="在已知频道ID的空缺中检测抓包里没有列出的隐藏频道",
+    )
+    parser.add_argument("input", help="JSP抓包或已生成的频道列表")
+    parser.add_argument("-o", "--output",
+                        help=f"隐藏频道列表，发现的频道追加到末尾（默认：输入文件所在目录下的{DEFAULT_OUTPUT_NAME}）")
+    parser.add_argument("--checkpoint", help="检查点文件（默认：输出文件名加 .checkpoint.json）")
+    parser.add_argument("--restart", action="store_true", help="忽略检查点，重新检测所有候选ID")
+    parser.add_argument("--margin", type=int, default=DEFAULT_MARGIN,
+                        help=f"在已知ID范围两端额外检测的ID数（默认：{DEFAULT_MARGIN}）")
+    parser.add_argument("--limit", type=int, help="本次最多检测的候选地址数（其余留到下次继续）")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"最大并发连接数（默认：{DEFAULT_CONCURRENCY}）")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"每个主机的最大连接数（默认：{DEFAULT_PER_HOST}）")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"每秒最多发起的请求数（默认：{DEFAULT_RATE}）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"单个地址的超时秒数（默认：{DEFAULT_TIMEOUT}）")
+    parser.add_argument("--rtsp-method", choices=RTSP_METHODS, default=RTSP_OPTIONS,
+                        help="RTSP 检测使用的请求（默认：OPTIONS）")
+    add_option_arguments(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出统计信息")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(os.path.dirname(os.path.abspath(args.input)), DEFAULT_OUTPUT_NAME)
+    checkpoint = args.checkpoint or output + ".checkpoint.json"
+    options = options_from_args(args)
+    space = IdSpace()
+    try:
+        for channel in load_source(args.input, options, cache_from_args(args)):
+            space.add(channel.url)
+        # 隐藏频道列表中已有的ID也视为已知
+        if os.path.exists(output):
+            for channel in read_playlist(output, options.rules()):
+                space.add(channel.url)
+        done = {} if args.restart else load_checkpoint(checkpoint)
+    except (ExtractError, RulesError, NamesError, OSError, UnicodeDecodeError, ValueError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+    if not space.prefixes:
+        print("输入中没有包含频道ID的地址", file=sys.stderr)
+        return 1
+
+    candidates = space.candidates(args.margin, done)
+    if args.limit is not None:
+        candidates = (candidate for _, candidate in zip(range(args.limit), candidates))
+
+    def on_chunk(hits):
+        if hits:
+            append_hidden(output, [(HIDDEN_NAME.format(id=channel_id), url) for channel_id, url in hits])
+        save_checkpoint(checkpoint, done)
+        if not args.quiet:
+            for channel_id, url in hits:
+                print(f"发现：{url}", flush=True)
+
+    prober = Prober(concurrency=args.concurrency, per_host=args.per_host, timeout=args.timeout,
+                    rtsp_method=args.rtsp_method, rate=args.rate)
+    checked_before = sum(len(ids) for ids in done.values())
+    start = time.perf_counter()
+    try:
+        found = asyncio.run(discover(candidates, prober, done, on_chunk))
+    except KeyboardInterrupt:
+        print(f"已中断，检查点已保存至：{checkpoint}", file=sys.stderr)
+        return 1
+    except OSError as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - start
+
+    if not args.quiet:
+        checked = sum(len(ids) for ids in done.values()) - checked_before
+        print(f"已知 {len(space.known)} 个频道ID，本次检测 {checked} 个候选地址，"
+              f"发现 {len(found)} 个，耗时 {elapsed:.3f}s")
+        if found:
+            print(f"已追加至：{output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,163 @@
+"""XMLTV 节目单：按频道名称匹配 tvg-id/tvg-logo，并生成只含已发布频道的精简节目单
+
+节目单可能有几百MB（支持 .gz），这里用 iterparse 逐个元素解析，每处理完一个
+顶层元素就从根节点上清除，不建立整棵树，内存占用与文件大小无关。
+按 XMLTV 的DTD，<channel> 都在 <programme> 之前，建立索引时读到第一个节目就停止。
+
+频道名称先按规范化后的 display-name 精确匹配，再按别名表的规范ID匹配
+（CCTV-1高清 和 CCTV1 都对应节目单中的 CCTV1，同一频道不同清晰度共用节目单）。
+"""
+
+import gzip
+import os
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import quoteattr
+
+from .names import load_names, normalize
+
+# gzip 文件头
+_GZIP_MAGIC = b"\x1f\x8b"
+
+
+class EpgError(Exception):
+    """节目单无法解析"""
+
+
+class EpgChannel:
+    """节目单中的一个频道"""
+    __slots__ = ("id", "name", "logo")
+
+    def __init__(self, id, name, logo=""):
+        self.id = id
+        self.name = name
+        self.logo = logo
+
+    def __repr__(self):
+        return f"EpgChannel({self.id!r}, {self.name!r}, {self.logo!r})"
+
+
+def open_xmltv(path):
+    """以二进制方式打开节目单，按文件头判断是否为 gzip 压缩"""
+    f = open(path, "rb")
+    if f.read(2) == _GZIP_MAGIC:
+        f.close()
+        return gzip.open(path, "rb")
+    f.seek(0)
+    return f
+
+
+def iter_xmltv_channels(path):
+    """逐个产出节目单中的 EpgChannel，读到第一个 <programme> 时停止"""
+    with open_xmltv(path) as f:
+        root = None
+        try:
+            for event, elem in ET.iterparse(f, events=("start", "end")):
+                if root is None:
+                    root = elem
+                    continue
+                if event == "start":
+                    if elem.tag == "programme":
+                        return
+                    continue
+                if elem.tag != "channel":
+                    continue
+                channel_id = elem.get("id")
+                if channel_id:
+                    icon = elem.find("icon")
+                    logo = icon.get("src", "") if icon is not None else ""
+                    # 每个 display-name 产出一项，没有时用频道ID作为名称
+                    names = [name.text.strip() for name in elem.iter("display-name") if name.text and name.text.strip()]
+                    for name in names or [channel_id]:
+                        yield EpgChannel(channel_id, name, logo)
+                root.clear()
+        except ET.ParseError as e:
+            raise EpgError(f"无法解析节目单 {path}：{e}") from e
+
+
+class EpgIndex:
+    """频道名称 -> EpgChannel 的索引"""
+
+    def __init__(self, channels, names=None):
+        self.names = names or load_names()
+        self.by_name = {}  # 规范化的 display-name -> EpgChannel
+        self.by_id = {}    # 别名表中的规范ID -> EpgChannel
+        self.channels = 0
+        seen = set()
+        for channel in channels:
+            if channel.id not in seen:
+                seen.add(channel.id)
+                self.channels += 1
+            # 同一名称出现多次时保留第一个
+            self.by_name.setdefault(normalize(channel.name), channel)
+            self.by_id.setdefault(self.names.canonical(channel.name), channel)
+
+    def find(self, name):
+        """返回与频道名称对应的 EpgChannel，没有时返回 None"""
+        channel = self.by_name.get(normalize(name))
+        if channel is None:
+            channel = self.by_id.get(self.names.canonical(name))
+        return channel
+
+    def ids(self, channels):
+        """返回与这些频道记录匹配的节目单频道ID集合"""
+        found = set()
+        for channel in channels:
+            epg = self.find(channel.name)
+            if epg is not None:
+                found.add(epg.id)
+        return found
+
+
+def load_epg(path, names=None):
+    """流式读取节目单中的频道并建立索引"""
+    return EpgIndex(iter_xmltv_channels(path), names)
+
+
+def write_trimmed_epg(source, output, ids):
+    """把节目单中属于 ids 的频道和节目写入 output（.gz 结尾时压缩），返回 (频道数, 节目数)
+
+    输出先写入临时文件再替换，播放器不会读到写了一半的节目单。
+    """
+    directory, name = os.path.split(os.path.abspath(output))
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    opener = gzip.open if output.lower().endswith(".gz") else open
+    kept = [0, 0]
+    try:
+        with open_xmltv(source) as src, opener(tmp_path, "wt", encoding="utf-8", newline="\n") as dst:
+            dst.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            root = None
+            depth = 0
+            try:
+                for event, elem in ET.iterparse(src, events=("start", "end")):
+                    if event == "start":
+                        depth += 1
+                        if root is None:
+                            root = elem
+                            attributes = "".join(f" {key}={quoteattr(value)}" for key, value in elem.items())
+                            dst.write(f"<{elem.tag}{attributes}>\n")
+                        continue
+                    depth -= 1
+                    if depth != 1:
+                        continue
+                    if elem.tag == "channel" and elem.get("id") in ids:
+                        kept[0] += 1
+                    elif elem.tag == "programme" and elem.get("channel") in ids:
+                        kept[1] += 1
+                    else:
+                        root.clear()
+                        continue
+                    elem.tail = None
+                    dst.write(ET.tostring(elem, encoding="unicode"))
+                    dst.write("\n")
+                    root.clear()
+            except ET.ParseError as e:
+                raise EpgError(f"无法解析节目单 {source}：{e}") from e
+            if root is None:
+                raise EpgError(f"节目单为空：{source}")
+            dst.write(f"</{root.tag}>\n")
+        os.replace(tmp_path, output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return tuple(kept)
@@ -0,0 +1,293 @@
+"""合并多个抓包的提取结果并去重，生成一份规范的频道列表
+
+用法：python -m iptv_extractor.merge 输入... -o 合并结果.csv [--policy prefer-m3u8|newest|keep-all]
+
+输入可以是JSP抓包，也可以是本工具生成的频道列表（.csv/.txt、.m3u/.m3u8 或 .json）。
+去重使用两个哈希索引：频道别名表中的规范ID，以及URL路径（PLTV/88888912/224/<id>/...），
+整个过程对记录总数是 O(n) 的。同一来源中同名但路径不同的记录是不同的流，不会被去掉。
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from urllib.parse import urlsplit
+
+from .capture import CAPTURE_EXTENSIONS
+from .cli import add_cache_arguments, add_format_argument, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError, ExtractOptions, extract_file, make_channel, sort_channels, write_results
+from .names import NamesError, load_names
+from .rules import RulesError
+from .scanner import CUSETCONFIG_MARKER, DEFAULT_CHUNK_SIZE
+from .writers import EXTENSION_FORMATS, FORMAT_JSON, FORMAT_M3U, FORMAT_TXT
+
+# 冲突处理策略
+POLICY_PREFER_M3U8 = "prefer-m3u8"
+POLICY_NEWEST = "newest"
+POLICY_KEEP_ALL = "keep-all"
+POLICIES = (POLICY_PREFER_M3U8, POLICY_NEWEST, POLICY_KEEP_ALL)
+
+# 作为JSP抓包或 pcap/pcapng 抓包解析的扩展名，其余按已生成的频道列表读取
+JSP_EXTENSIONS = (".jsp",) + CAPTURE_EXTENSIONS
+
+# #EXTINF 行中的 key="value" 属性
+_EXTINF_ATTRIBUTE = re.compile(r'([\w-]+)="([^"]*)"')
+
+
+def url_path(url):
+    """取URL中的路径部分作为同一路流的标识"""
+    return urlsplit(url).path.lstrip("/")
+
+
+def read_playlist(path, rules=None):
+    """读取已生成的频道列表，返回频道记录列表"""
+    channels = []
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.endswith(",#genre#") or "," not in line:
+                continue
+            # 地址中不含逗号，从右侧拆分以兼容名称中的逗号
+            name, url = line.rsplit(",", 1)
+            channels.append(make_channel(name, url, rules=rules))
+    return channels
+
+
+def _extinf_title(line):
+    """#EXTINF 行中第一个不在引号内的逗号之后为频道名称"""
+    quoted = False
+    for i, char in enumerate(line):
+        if char == '"':
+            quoted = not quoted
+        elif char == "," and not quoted:
+            return line[i + 1:].strip()
+    return ""
+
+
+def read_m3u(path, rules=None):
+    """读取 M3U 播放列表，返回频道记录列表；tvg-chno 作为频道号"""
+    channels = []
+    extinf = None
+    with open(path, "r", encoding="utf-8-sig") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("#EXTINF"):
+                extinf = line
+            elif line and not line.startswith("#"):
+                if extinf is not None:
+                    attributes = dict(_EXTINF_ATTRIBUTE.findall(extinf))
+                    name = _extinf_title(extinf) or attributes.get("tvg-name") or line
+                    channel = make_channel(name, line, rules=rules)
+                    channel.user_channel_id = attributes.get("tvg-chno", "")
+                    channels.append(channel)
+                extinf = None
+    return channels
+
+
+def read_json(path, rules=None):
+    """读取 JSON 格式的频道列表（write_json 的输出），返回频道记录列表"""
+    try:
+        with open(path, "r", encoding="utf-8-sig") as f:
+            items = json.load(f)
+    except ValueError as e:
+        raise ExtractError(f"无法解析频道列表 {path}：{e}") from e
+    if not isinstance(items, list):
+        raise ExtractError(f"频道列表 {path} 不是JSON数组")
+    channels = []
+    for item in items:
+        if not isinstance(item, dict) or not item.get("name") or not item.get("url"):
+            raise ExtractError(f"频道列表 {path} 中的记录缺少 name 或 url：{item!r:.80}")
+        channel = make_channel(item["name"], item["url"], rules=rules)
+        channel.channel_id = item.get("channel_id", "")
+        channel.user_channel_id = item.get("user_channel_id", "")
+        channel.channel_url = item.get("channel_url", "")
+        channel.timeshift_url = item.get("timeshift_url", "")
+        channels.append(channel)
+    return channels
+
+
+# 已生成的频道列表：输出格式 -> 读取函数
+PLAYLIST_READERS = {
+    FORMAT_TXT: read_playlist,
+    FORMAT_M3U: read_m3u,
+    FORMAT_JSON: read_json,
+}
+
+
+def _contains_cusetconfig(path):
+    """文件中是否有 CUSetConfig 调用（另存为 .txt 等扩展名的JSP页面）"""
+    marker = CUSETCONFIG_MARKER.encode("ascii")
+    tail = b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(DEFAULT_CHUNK_SIZE)
+            if not chunk:
+                return False
+            # 起始标记可能跨两块
+            if marker in chunk or marker in tail + chunk[:len(marker) - 1]:
+                return True
+            tail = chunk[-(len(marker) - 1):]
+
+
+def load_source(path, options=None, cache=None):
+    """读取一个输入，返回频道记录列表
+
+    JSP和抓包按扩展名提取；.csv/.txt、.m3u/.m3u8、.json 按本工具的输出格式读取，
+    其中含有 CUSetConfig 调用的 .csv/.txt 是另存的JSP页面，仍然提取；其他扩展名抛出 ExtractError。
+    """
+    options = options or ExtractOptions()
+    if path.lower().endswith(JSP_EXTENSIONS):
+        return extract_file(path, options, cache).results
+    fmt = EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower())
+    if fmt is None:
+        raise ExtractError(f"不支持的输入格式：{path}（可以是 .jsp、抓包、.csv/.txt、.m3u/.m3u8 或 .json）")
+    if fmt == FORMAT_TXT and _contains_cusetconfig(path):
+        return extract_file(path, options, cache).results
+    return PLAYLIST_READERS[fmt](path, options.rules())
+
+
+class MergeStats:
+    """合并统计"""
+
+    def __init__(self):
+        self.sources = 0
+        self.records = 0
+        self.duplicate_urls = 0    # URL路径重复的记录
+        self.distinct_streams = 0  # 同一来源中同名频道的其他流（全部保留）
+        self.name_conflicts = 0    # 在多个来源中地址不同的频道数
+        self.replaced = 0          # 按策略选用了较新来源的频道数
+        self.dropped = 0           # 因选用其他来源而去掉的记录
+        self.channels = 0          # 合并后的频道数
+        self.output = 0            # 输出记录数
+
+
+def _rank(url, source_rank, policy):
+    """记录的优先级，数值越大越优先"""
+    if policy == POLICY_PREFER_M3U8:
+        return (".m3u8" in url, source_rank)
+    return (source_rank,)
+
+
+def merge_channels(sources, policy=POLICY_PREFER_M3U8, names=None):
+    """合并多个频道记录列表
+
+    sources 按从旧到新的顺序排列。名称经别名索引 names（默认为内置别名表）映射为
+    (规范ID, 清晰度)，CCTV-1高清 和 ＣＣＴＶ１ HD 视为同一频道。
+    URL路径相同的记录只保留一条；同一频道在同一来源中路径不同的记录是不同的流，全部保留；
+    同一频道出现在多个来源中时按策略选出一个来源，保留该来源的全部记录（keep-all 保留所有来源）。
+    返回 (合并后的频道记录列表, MergeStats)。
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"未知的冲突处理策略：{policy}")
+
+    stats = MergeStats()
+    groups = {}    # (规范ID, 清晰度) -> {来源序号: [记录, ...]}，记录为 [频道, 优先级, 分组键]
+    by_path = {}   # URL路径 -> 记录
+    keep_all = policy == POLICY_KEEP_ALL
+    names = names or load_names()
+
+    for source_rank, channels in enumerate(sources):
+        stats.sources += 1
+        for channel in channels:
+            stats.records += 1
+            path = url_path(channel.url)
+            rank = _rank(channel.url, source_rank, policy)
+
+            entry = by_path.get(path)
+            if entry is not None:
+                # 同一路流已存在（可能换了名称），只在新记录更优先时替换
+                stats.duplicate_urls += 1
+                if keep_all:
+                    continue
+                if rank > entry[1] and policy == POLICY_NEWEST:
+                    entry[0], entry[1] = channel, rank
+                # 这一路流也属于当前来源，按来源选择时不会因此丢失
+                members = groups[entry[2]].setdefault(source_rank, [])
+                if all(member is not entry for member in members):
+                    members.append(entry)
+                continue
+
+            key = names.lookup(channel.name)
+            entry = [channel, rank, key]
+            by_path[path] = entry
+            groups.setdefault(key, {}).setdefault(source_rank, []).append(entry)
+
+    merged = []
+    for by_source in groups.values():
+        if len({tuple(map(id, members)) for members in by_source.values()}) > 1:
+            stats.name_conflicts += 1
+        if keep_all or len(by_source) == 1:
+            chosen = list(by_source)
+        else:
+            # 各来源以其中最优先的记录比较；同一路流可能同时属于多个来源，相同时取较新的来源
+            best = max(by_source, key=lambda source: (max(entry[1] for entry in by_source[source]), source))
+            first = by_source[next(iter(by_source))]
+            if list(map(id, by_source[best])) != list(map(id, first)):
+                stats.replaced += 1
+            chosen = [best]
+        kept = {}
+        for source in chosen:
+            stats.distinct_streams += len(by_source[source]) - 1
+            for entry in by_source[source]:
+                kept.setdefault(id(entry), entry)
+        stats.dropped += len({id(entry) for members in by_source.values() for entry in members}) - len(kept)
+        merged.extend(entry[0] for entry in kept.values())
+    stats.channels = len(groups)
+    stats.output = len(merged)
+    return merged, stats
+
+
+def print_stats(stats, file=sys.stdout):
+    """输出合并统计"""
+    print(f"输入 {stats.sources} 个来源，共 {stats.records} 条记录", file=file)
+    print(f"URL重复 {stats.duplicate_urls} 条，同一来源中同名的不同流 {stats.distinct_streams} 条（保留）", file=file)
+    print(f"多个来源中地址不同的频道 {stats.name_conflicts} 个，按策略选用较新来源 {stats.replaced} 个，"
+          f"去掉其他来源的记录 {stats.dropped} 条", file=file)
+    print(f"合并后 {stats.channels} 个频道，输出 {stats.output} 条记录", file=file)
+
+
+def main(argv=None):
+    """合并模式主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.merge",
+        description="合并多个抓包的频道列表并去重",
+    )
+    parser.add_argument("inputs", nargs="+", help="JSP抓包或已生成的频道列表")
+    parser.add_argument("-o", "--output", required=True, help="合并结果输出路径")
+    parser.add_argument("--policy", choices=POLICIES, default=POLICY_PREFER_M3U8,
+                        help="同一频道有多个地址时的处理策略（默认：prefer-m3u8）")
+    add_option_arguments(parser)
+    add_format_argument(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出统计信息")
+    args = parser.parse_args(argv)
+
+    options = options_from_args(args)
+    try:
+        rules = options.rules()
+        names = options.names()
+        # 按文件修改时间从旧到新排列，newest 策略据此判断哪个抓包更新
+        inputs = sorted(args.inputs, key=os.path.getmtime)
+        cache = cache_from_args(args)
+        sources = [load_source(path, options, cache) for path in inputs]
+    except (ExtractError, RulesError, NamesError, OSError, UnicodeDecodeError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+
+    merged, stats = merge_channels(sources, args.policy, names)
+    results = sort_channels(merged, rules, options.natural_sort, names)
+    try:
+        write_results(args.output, results, rules, args.fmt)
+    except OSError as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        print_stats(stats)
+        print(f"完整数据已保存至：{args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+"""频道名称规范化和别名索引
+
+不同来源（抓包、其他播放列表、EPG）对同一频道的叫法不同，例如 CCTV-1高清、
+ＣＣＴＶ１ HD、CCTV1综合。这里把名称映射为规范ID（如 CCTV1）和清晰度等级，
+用于合并去重、排序和EPG匹配。
+
+名称先统一全角/半角和大小写并去掉标点，然后在别名哈希表中查找；找不到时
+从末尾逐个去掉清晰度等后缀（用反向字典树匹配）再查找，整个过程与名称长度成正比。
+别名和后缀定义在 default_aliases.json 中，格式：
+  channels: 频道列表，每项包含 id（规范ID）和 aliases（其他叫法，可省略）
+  qualities: 清晰度后缀 -> 等级（标清 0、高清 2、4K 3……，无后缀时为 1）
+  ignore: 可以去掉但不表示清晰度的后缀（如 频道、25P）
+别名中不要带清晰度后缀，否则整体命中别名时得不到清晰度等级。规范ID本身以
+清晰度后缀结尾的频道（如 CCTV4K、CCTV8K）至少取该后缀的等级，因此 CCTV4K 和
+CCTV4K超高清 的等级相同。
+别名只能连接同一路流的不同写法：抓包中同时出现的两路流（如 CCTV-NEWS 和 CGTN英语）
+即使内容相近也要用不同的ID，否则合并时会被当作同一频道。
+"""
+
+import json
+import os
+import unicodedata
+from functools import lru_cache
+
+# 随程序发布的默认别名表
+DEFAULT_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_aliases.json")
+
+# 名称没有清晰度后缀时的等级
+PLAIN_QUALITY = 1
+
+# 规范化时去掉的空白和标点（“+” 有含义，如 CCTV5+，不去掉）
+_PUNCTUATION = str.maketrans("", "", " \t-_·.:：,，、/\\|()（）[]【】<>《》'\"“”‘’!！?？")
+
+# 查找结果的缓存上限，超过后清空，避免长时间运行的服务占用过多内存
+MEMO_SIZE = 65536
+
+
+class NamesError(Exception):
+    """别名文件格式错误"""
+
+
+def normalize(name):
+    """统一全角/半角、大小写，并去掉空白和标点"""
+    return unicodedata.normalize("NFKC", name).upper().translate(_PUNCTUATION)
+
+
+class NameIndex:
+    """别名索引：名称 -> (规范ID, 清晰度等级)"""
+
+    def __init__(self, data):
+        self.aliases = {}   # 规范化后的名称 -> 规范ID
+        channels = data.get("channels")
+        if not isinstance(channels, list):
+            raise NamesError("别名文件中缺少 channels")
+        for channel in channels:
+            channel_id = channel.get("id")
+            if not channel_id:
+                raise NamesError(f"频道缺少 id：{channel}")
+            for alias in [channel_id] + list(channel.get("aliases", [])):
+                key = normalize(alias)
+                previous = self.aliases.setdefault(key, channel_id)
+                if previous != channel_id:
+                    raise NamesError(f"别名 {alias} 同时属于 {previous} 和 {channel_id}")
+
+        # 后缀按反向字符串建立字典树，节点中 None 键保存 (后缀长度, 清晰度等级, 是否以字母开头)
+        self._suffixes = {}
+        suffixes = [(token, rank) for token, rank in data.get("qualities", {}).items()]
+        suffixes += [(token, None) for token in data.get("ignore", [])]
+        for token, rank in suffixes:
+            token = normalize(token)
+            node = self._suffixes
+            for ch in reversed(token):
+                node = node.setdefault(ch, {})
+            node[None] = (len(token), rank, token[0].isascii() and token[0].isalpha())
+
+        # 以清晰度后缀结尾的别名 -> 该后缀的等级
+        self._base_qualities = {}
+        for key in self.aliases:
+            suffix = self._suffix_at(key, len(key))
+            if suffix is not None and suffix[1] is not None:
+                self._base_qualities[key] = suffix[1]
+        self._memo = {}
+
+    def _suffix_at(self, key, end):
+        """返回以 end 结尾的最长后缀的字典树条目，没有时返回 None"""
+        node = self._suffixes
+        found = None
+        position = end
+        while position > 0:
+            node = node.get(key[position - 1])
+            if node is None:
+                break
+            position -= 1
+            entry = node.get(None)
+            # 字母开头的后缀（HD、SD……）前面不能紧挨着字母，避免截断英文名称
+            if entry is not None and position > 0 and not (entry[2] and key[position - 1].isascii()
+                                                          and key[position - 1].isalpha()):
+                found = entry
+        return found
+
+    def lookup(self, name):
+        """返回 (规范ID, 清晰度等级)；不在别名表中的名称以去掉后缀后的规范化名称为ID"""
+        result = self._memo.get(name)
+        if result is not None:
+            return result
+        key = normalize(name)
+        end = len(key)
+        quality = None
+        while True:
+            channel_id = self.aliases.get(key[:end])
+            if channel_id is not None:
+                base = self._base_qualities.get(key[:end])
+                if base is not None and (quality is None or base > quality):
+                    quality = base
+                break
+            suffix = self._suffix_at(key, end)
+            if suffix is None:
+                channel_id = key[:end]
+                break
+            length, rank, _ = suffix
+            end -= length
+            if rank is not None and (quality is None or rank > quality):
+                quality = rank
+        result = (channel_id, PLAIN_QUALITY if quality is None else quality)
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[name] = result
+        return result
+
+    def canonical(self, name):
+        """返回规范ID"""
+        return self.lookup(name)[0]
+
+
+@lru_cache(maxsize=None)
+def load_names(path=None):
+    """加载别名文件，同一路径只加载一次；path 为 None 时使用默认别名表"""
+    path = path or DEFAULT_ALIASES_PATH
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise NamesError(f"无法解析别名文件 {path}：{e}") from e
+    return NameIndex(data)
@@ -0,0 +1,274 @@
+"""并发检测频道地址是否可用
+
+用法：python -m iptv_extractor.probe 输入 -o 输出.csv [--policy keep|drop|demote] [-c 并发数]
+
+输入可以是JSP抓包，也可以是已生成的频道列表（name,url 格式）。
+RTSP 地址发送 OPTIONS 或 DESCRIBE 请求，HTTP 地址发送 HEAD 请求或获取播放列表，
+记录每个频道的状态码和延迟。使用 asyncio 并发检测，总并发数、每个主机的连接数
+和每秒发起的请求数（--rate）都有上限。
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from urllib.parse import urlsplit
+
+from .cli import add_cache_arguments, add_format_argument, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError, sort_channels, write_results
+from .merge import load_source
+from .names import NamesError
+from .rules import RulesError
+
+# 默认并发和超时设置
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 8
+DEFAULT_TIMEOUT = 5.0
+
+# RTSP 请求方法
+RTSP_OPTIONS = "OPTIONS"
+RTSP_DESCRIBE = "DESCRIBE"
+RTSP_METHODS = (RTSP_OPTIONS, RTSP_DESCRIBE)
+
+# HTTP 检测方式：只请求头部，或获取播放列表并检查 #EXTM3U
+HTTP_HEAD = "head"
+HTTP_PLAYLIST = "playlist"
+HTTP_MODES = (HTTP_HEAD, HTTP_PLAYLIST)
+
+# 失效频道的处理方式
+POLICY_KEEP = "keep"
+POLICY_DROP = "drop"
+POLICY_DEMOTE = "demote"
+POLICIES = (POLICY_KEEP, POLICY_DROP, POLICY_DEMOTE)
+
+DEFAULT_PORTS = {"rtsp": 554, "http": 80, "https": 443}
+
+# 检查播放列表时最多读取的字节数
+PLAYLIST_PEEK = 4096
+
+USER_AGENT = "iptv_extractor-probe"
+
+
+@dataclass
+class ProbeResult:
+    """一个地址的检测结果"""
+    url: str
+    ok: bool = False
+    status: int = None      # RTSP/HTTP 状态码，连接失败时为 None
+    latency: float = None   # 从连接到收到状态行的秒数
+    error: str = None
+
+
+async def _read_status(reader):
+    """读取响应的状态行，返回状态码"""
+    line = await reader.readline()
+    parts = line.decode("latin-1").split(None, 2)
+    if len(parts) < 2 or not parts[0].startswith(("RTSP/", "HTTP/")) or not parts[1].isdigit():
+        raise ValueError(f"无效的响应：{line[:80]!r}")
+    return int(parts[1])
+
+
+def _request_target(parts):
+    target = parts.path or "/"
+    if parts.query:
+        target += "?" + parts.query
+    return target
+
+
+async def _exchange(url, parts, rtsp_method, http_mode):
+    """建立连接并发送一次请求，返回 (状态码, 错误信息)"""
+    scheme = parts.scheme.lower()
+    port = parts.port or DEFAULT_PORTS[scheme]
+    reader, writer = await asyncio.open_connection(parts.hostname, port, ssl=scheme == "https" or None)
+    try:
+        if scheme == "rtsp":
+            request = (f"{rtsp_method} {url} RTSP/1.0\r\n"
+                       f"CSeq: 1\r\n"
+                       f"User-Agent: {USER_AGENT}\r\n")
+            if rtsp_method == RTSP_DESCRIBE:
+                request += "Accept: application/sdp\r\n"
+        else:
+            method = "HEAD" if http_mode == HTTP_HEAD else "GET"
+            request = (f"{method} {_request_target(parts)} HTTP/1.1\r\n"
+                       f"Host: {parts.netloc}\r\n"
+                       f"User-Agent: {USER_AGENT}\r\n"
+                       f"Connection: close\r\n")
+        writer.write((request + "\r\n").encode("utf-8"))
+        await writer.drain()
+        status = await _read_status(reader)
+
+        if scheme != "rtsp" and http_mode == HTTP_PLAYLIST and status < 400:
+            # 跳过响应头，检查正文开头是否为M3U播放列表
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = await reader.read(PLAYLIST_PEEK)
+            if b"#EXTM3U" not in body:
+                return status, "不是有效的播放列表"
+        return status, None
+    finally:
+        writer.close()
+
+
+class Prober:
+    """限制总并发数、每个主机连接数和请求速率的地址检测器"""
+
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, per_host=DEFAULT_PER_HOST, timeout=DEFAULT_TIMEOUT,
+                 rtsp_method=RTSP_DESCRIBE, http_mode=HTTP_PLAYLIST, rate=None):
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.rtsp_method = rtsp_method
+        self.http_mode = http_mode
+        self.rate = rate  # 每秒最多发起的请求数，None 表示不限制
+        self._limit = None
+        self._hosts = {}
+        self._next_start = 0.0
+
+    def _host_limit(self, host):
+        limit = self._hosts.get(host)
+        if limit is None:
+            limit = self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return limit
+
+    async def _throttle(self):
+        """按 rate 均匀安排各请求的发起时间"""
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_start)
+        self._next_start = start + 1 / self.rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def probe(self, url):
+        """检测一个地址"""
+        result = ProbeResult(url)
+        parts = urlsplit(url)
+        if parts.scheme.lower() not in DEFAULT_PORTS or not parts.hostname:
+            result.error = "不支持的地址"
+            return result
+
+        # 先取主机的名额再取总名额，避免等待同一主机的请求占满总并发
+        async with self._host_limit((parts.hostname, parts.port)), self._limit:
+            if self.rate:
+                await self._throttle()
+            start = time.perf_counter()
+            try:
+                status, error = await asyncio.wait_for(
+                    _exchange(url, parts, self.rtsp_method, self.http_mode), self.timeout)
+            except asyncio.TimeoutError:
+                result.error = "超时"
+            except (OSError, ValueError) as e:
+                result.error = str(e) or type(e).__name__
+            else:
+                result.latency = round(time.perf_counter() - start, 6)
+                result.status = status
+                result.error = error
+                result.ok = error is None and 200 <= status < 400
+        return result
+
+    async def probe_all(self, urls):
+        """并发检测所有地址，结果顺序与输入一致；同一地址只检测一次"""
+        self._limit = asyncio.Semaphore(self.concurrency)
+        self._hosts = {}
+        unique = list(dict.fromkeys(urls))
+        results = dict(zip(unique, await asyncio.gather(*(self.probe(url) for url in unique))))
+        return [results[url] for url in urls]
+
+
+def probe_urls(urls, **kwargs):
+    """同步接口：检测地址列表，返回 ProbeResult 列表"""
+    return asyncio.run(Prober(**kwargs).probe_all(list(urls)))
+
+
+def apply_policy(channels, results, policy=POLICY_KEEP, rules=None):
+    """根据检测结果处理失效频道
+
+    drop 删除失效频道；demote 把失效频道移到所在分类的末尾；keep 保持不变。
+    """
+    if policy == POLICY_KEEP:
+        return list(channels)
+    alive = [channel for channel, result in zip(channels, results) if result.ok]
+    if policy == POLICY_DROP:
+        return alive
+    dead = [channel for channel, result in zip(channels, results) if not result.ok]
+    # 分组时分类内保持原有顺序，因此可用频道总在失效频道之前
+    return sort_channels(alive + dead, rules)
+
+
+def write_report(path, channels, results):
+    """写入JSON格式的检测报告"""
+    items = [dict(name=channel.name, **asdict(result)) for channel, result in zip(channels, results)]
+    report = {
+        "channels": len(items),
+        "alive": sum(1 for result in results if result.ok),
+        "items": items,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    return report
+
+
+def main(argv=None):
+    """检测模式主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.probe",
+        description="并发检测频道地址是否可用，可删除失效频道或把它们移到分类末尾",
+    )
+    parser.add_argument("input", help="JSP抓包或已生成的频道列表")
+    parser.add_argument("-o", "--output", required=True, help="输出文件路径")
+    parser.add_argument("--policy", choices=POLICIES, default=POLICY_KEEP,
+                        help="失效频道的处理方式：keep 保留、drop 删除、demote 移到分类末尾（默认：keep）")
+    parser.add_argument("--report", help="JSON检测报告输出路径（包含每个频道的状态码和延迟）")
+    parser.add_argument("-c", "--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"最大并发连接数（默认：{DEFAULT_CONCURRENCY}）")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST,
+                        help=f"每个主机的最大连接数（默认：{DEFAULT_PER_HOST}）")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT,
+                        help=f"单个地址的超时秒数（默认：{DEFAULT_TIMEOUT}）")
+    parser.add_argument("--rate", type=float, help="每秒最多发起的请求数（默认不限制）")
+    parser.add_argument("--rtsp-method", choices=RTSP_METHODS, default=RTSP_DESCRIBE,
+                        help="RTSP 检测使用的请求（默认：DESCRIBE）")
+    parser.add_argument("--http-mode", choices=HTTP_MODES, default=HTTP_PLAYLIST,
+                        help="HTTP 检测方式：head 只请求头部，playlist 获取播放列表（默认：playlist）")
+    add_option_arguments(parser)
+    add_format_argument(parser)
+    add_cache_arguments(parser)
+    parser.add_argument("-q", "--quiet", action="store_true", help="不输出统计信息")
+    args = parser.parse_args(argv)
+
+    options = options_from_args(args)
+    try:
+        rules = options.rules()
+        channels = sort_channels(load_source(args.input, options, cache_from_args(args)), rules,
+                                 options.natural_sort, options.names())
+    except (ExtractError, RulesError, NamesError, OSError, UnicodeDecodeError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+
+    start = time.perf_counter()
+    results = probe_urls([channel.url for channel in channels], concurrency=args.concurrency,
+                         per_host=args.per_host, timeout=args.timeout,
+                         rtsp_method=args.rtsp_method, http_mode=args.http_mode, rate=args.rate)
+    elapsed = time.perf_counter() - start
+
+    output = apply_policy(channels, results, args.policy, rules)
+    try:
+        if args.report:
+            write_report(args.report, channels, results)
+        write_results(args.output, output, rules, args.fmt)
+    except OSError as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+
+    if not args.quiet:
+        alive = sum(1 for result in results if result.ok)
+        print(f"检测 {len(results)} 个地址，可用 {alive} 个，失效 {len(results) - alive} 个，"
+              f"耗时 {elapsed:.3f}s")
+        print(f"输出 {len(output)} 条记录，完整数据已保存至：{args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,298 @@
+"""可配置的分类规则和跳过规则
+
+规则从JSON（或Python 3.11+ 上的TOML）文件加载，加载时把所有关键词编译成一个
+Aho-Corasick 自动机，所有正则编译成一个组合正则（带捕获组或全局标志的正则单独编译）。每个频道名称只扫描一次，
+得到命中的关键词集合（位掩码）后再按优先级判断分类，耗时与规则数量基本无关。
+
+规则文件格式见 default_rules.json：
+  categories: 分类列表，每项包含 id、title、priority（越小越优先，也是输出顺序），
+      以及 rules 或 default（未命中任何规则时使用的分类）
+      rules 中每条规则可包含 all（全部命中）、any（命中任意一个）、
+      none（都不能命中）、regex（正则匹配），一条规则的条件同时满足即命中，
+      多条规则之间是“或”的关系
+  skip: 跳过规则列表，每项包含 id、title、keywords 和/或 regex，
+      option 为 ExtractOptions 中控制该规则是否启用的属性名
+"""
+
+import json
+import os
+import re
+from collections import deque
+from functools import lru_cache
+
+try:
+    import tomllib
+except ImportError:  # Python 3.11 以下没有 tomllib，只支持JSON规则文件
+    tomllib = None
+
+# 随程序发布的默认规则（内蒙古联通）
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "default_rules.json")
+
+# 不带内联全局标志的正则的标志
+_PLAIN_FLAGS = re.compile("").flags
+
+
+class RulesError(Exception):
+    """规则文件格式错误"""
+
+
+def _combinable(pattern):
+    """正则是否可以放进组合正则：不能有捕获组，也不能有 (?i) 之类的全局标志"""
+    compiled = re.compile(pattern)
+    return compiled.groups == 0 and compiled.flags == _PLAIN_FLAGS
+
+
+class KeywordMatcher:
+    """Aho-Corasick 多关键词匹配，返回命中关键词的位掩码
+
+    keywords 为 (关键词, 位序号) 序列。
+    """
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [0]
+
+        # 构建字典树
+        for keyword, bit in keywords:
+            state = 0
+            for ch in keyword:
+                next_state = self.goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][ch] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(0)
+                state = next_state
+            self.output[state] |= 1 << bit
+
+        # 按层次计算失败指针，并合并后缀状态的输出
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and ch not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(ch, 0)
+                self.fail[next_state] = target if target != next_state else 0
+                self.output[next_state] |= self.output[self.fail[next_state]]
+
+    def scan(self, text):
+        """扫描一遍文本，返回命中关键词的位掩码"""
+        goto = self.goto
+        fail = self.fail
+        output = self.output
+        state = 0
+        found = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            found |= output[state]
+        return found
+
+
+class _Condition:
+    """一条已编译的规则：all/any/none/regex 均为位掩码"""
+    __slots__ = ("all", "any", "none")
+
+    def __init__(self, all_mask, any_mask, none_mask):
+        self.all = all_mask
+        self.any = any_mask
+        self.none = none_mask
+
+    def matches(self, found):
+        return ((found & self.all) == self.all
+                and (not self.any or found & self.any)
+                and not found & self.none)
+
+
+class RuleSet:
+    """编译后的规则集"""
+
+    def __init__(self, data):
+        self._terms = {}       # 关键词或正则 -> 位序号
+        self._keywords = []
+        self._regexes = []
+
+        categories = data.get("categories")
+        if not categories:
+            raise RulesError("规则文件中缺少 categories")
+
+        # 按优先级排序，优先级相同时保持文件中的顺序
+        categories = sorted(categories, key=lambda c: c.get("priority", 0))
+        self.order = []
+        self.titles = {}
+        self._categories = []
+        self.default_category = None
+        for category in categories:
+            category_id = category.get("id")
+            if not category_id or category_id in self.titles:
+                raise RulesError(f"分类缺少 id 或 id 重复：{category}")
+            self.order.append(category_id)
+            self.titles[category_id] = category.get("title", category_id)
+            if category.get("default"):
+                self.default_category = category_id
+            else:
+                conditions = [self._compile_condition(rule, True) for rule in category.get("rules", [])]
+                self._categories.append((category_id, conditions))
+        if self.default_category is None:
+            raise RulesError("规则文件中缺少默认分类（default: true）")
+
+        self.skip_filters = []
+        for skip in data.get("skip", []):
+            if not skip.get("id"):
+                raise RulesError(f"跳过规则缺少 id：{skip}")
+            condition = self._compile_condition({"any": skip.get("keywords", []),
+                                                 "regex": skip.get("regex")}, False)
+            self.skip_filters.append((skip["id"], skip.get("option"), condition.any))
+        self.skip_titles = {skip["id"]: skip.get("title", skip["id"]) for skip in data.get("skip", [])}
+
+        self._index_conditions()
+        self._matcher = KeywordMatcher((k, self._terms[("keyword", k)]) for k in self._keywords)
+        self._regex = None
+        combined = [pattern for pattern in self._regexes if _combinable(pattern)]
+        # 带捕获组（反向引用、命名组）或全局标志的正则放进组合正则后会改变含义，单独匹配
+        self._separate = [(re.compile(pattern), self._terms[("regex", pattern)])
+                          for pattern in self._regexes if not _combinable(pattern)]
+        if combined:
+            # 每个正则放在一个可选的前瞻中，一次 match 即可得到所有正则的结果
+            self._regex = re.compile("".join(
+                f"(?:(?=[\\s\\S]*?(?P<r{i}>{pattern})))?" for i, pattern in enumerate(combined)))
+            self._regex_bits = [self._terms[("regex", p)] for p in combined]
+
+    def _index_conditions(self):
+        """按触发位建立索引，分类时只检查可能命中的规则"""
+        self._by_bit = {}          # 位序号 -> [(分类序号, 规则)]
+        self._unconditional = []   # 不需要命中任何关键词的规则
+        for index, (_, conditions) in enumerate(self._categories):
+            for condition in conditions:
+                if condition.all:
+                    # all 中的每一位都必须命中，挂在最低位上即可
+                    triggers = condition.all & -condition.all
+                elif condition.any:
+                    triggers = condition.any
+                else:
+                    self._unconditional.append((index, condition))
+                    continue
+                while triggers:
+                    low = triggers & -triggers
+                    triggers ^= low
+                    self._by_bit.setdefault(low.bit_length() - 1, []).append((index, condition))
+
+    def _bit(self, kind, term):
+        key = (kind, term)
+        if key not in self._terms:
+            if kind == "regex":
+                try:
+                    re.compile(term)
+                except re.error as e:
+                    raise RulesError(f"无效的正则 {term!r}：{e}") from e
+                self._regexes.append(term)
+            else:
+                self._keywords.append(term)
+            self._terms[key] = len(self._terms)
+        return 1 << self._terms[key]
+
+    def _mask(self, keywords):
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        mask = 0
+        for keyword in keywords or ():
+            mask |= self._bit("keyword", keyword)
+        return mask
+
+    def _compile_condition(self, rule, regex_required):
+        """编译一条规则；regex_required 为 False 时正则与 any 中的关键词是“或”的关系"""
+        all_mask = self._mask(rule.get("all"))
+        any_mask = self._mask(rule.get("any"))
+        none_mask = self._mask(rule.get("none"))
+        regex = rule.get("regex")
+        if regex:
+            if regex_required:
+                all_mask |= self._bit("regex", regex)
+            else:
+                any_mask |= self._bit("regex", regex)
+        return _Condition(all_mask, any_mask, none_mask)
+
+    def scan(self, name):
+        """扫描一次频道名称，返回命中的位掩码"""
+        found = self._matcher.scan(name)
+        if self._regex is not None:
+            match = self._regex.match(name)
+            for i, bit in enumerate(self._regex_bits):
+                if match.group(f"r{i}") is not None:
+                    found |= 1 << bit
+        for pattern, bit in self._separate:
+            if pattern.search(name):
+                found |= 1 << bit
+        return found
+
+    def classify_found(self, found):
+        """根据扫描结果返回分类"""
+        best = None
+        for index, condition in self._unconditional:
+            if condition.matches(found):
+                best = index
+                break
+
+        # 只检查命中的关键词所触发的规则
+        by_bit = self._by_bit
+        remaining = found
+        while remaining:
+            low = remaining & -remaining
+            remaining ^= low
+            for index, condition in by_bit.get(low.bit_length() - 1, ()):
+                if (best is None or index < best) and condition.matches(found):
+                    best = index
+
+        if best is None:
+            return self.default_category
+        return self._categories[best][0]
+
+    def classify(self, name):
+        """返回频道名称的分类"""
+        return self.classify_found(self.scan(name))
+
+    def skip_reason(self, found, options=None):
+        """返回第一个命中且已启用的跳过规则 id，没有则返回 None"""
+        for skip_id, option, mask in self.skip_filters:
+            if found & mask and (option is None or options is None or getattr(options, option, True)):
+                return skip_id
+        return None
+
+    def header(self, category_id):
+        """分类标题行"""
+        return f"{self.titles[category_id]},#genre#"
+
+    def group(self, channels):
+        """按记录中保存的分类分组（按优先级排列），分类内保持原有顺序"""
+        categories = {category: [] for category in self.order}
+        default = categories[self.default_category]
+        for channel in channels:
+            categories.get(channel.category, default).append(channel)
+        return categories
+
+
+def _read_rules_file(path):
+    if path.lower().endswith(".toml"):
+        if tomllib is None:
+            raise RulesError("当前Python版本不支持TOML规则文件，请使用JSON格式")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+@lru_cache(maxsize=None)
+def load_rules(path=None):
+    """加载并编译规则文件，同一路径只编译一次；path 为 None 时使用默认规则"""
+    path = path or DEFAULT_RULES_PATH
+    try:
+        data = _read_rules_file(path)
+    except ValueError as e:
+        raise RulesError(f"无法解析规则文件 {path}：{e}") from e
+    return RuleSet(data)
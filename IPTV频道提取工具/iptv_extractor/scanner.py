@@ -0,0 +1,154 @@
+"""Authentication.CUSetConfig(...) 调用扫描器
+
+先用 find 定位每个调用的边界，再对参数做一次正向扫描拆成 键->值 字典，
+整体时间复杂度 O(n)，且不会跨调用配对字段。同一套扫描逻辑既可用于 str，
+也可直接用于 bytes/mmap，后者只解码需要的字段值。
+"""
+
+import mmap
+import re
+
+# 频道配置调用的起始标记
+CUSETCONFIG_MARKER = "Authentication.CUSetConfig("
+
+# 流式读取时每次读取的字符数
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+# 单个调用的最大长度，超过后不再等待右括号，防止缓冲区无限增长
+MAX_CALL_SIZE = 1 << 20
+
+# 参数中的 键="值"；(?<!\w) 保证只在单词开头尝试匹配，避免长单词上的回溯
+_PAIR = re.compile(r'(?<!\w)(\w+)="([^"]*)"')
+_PAIR_BYTES = re.compile(rb'(?<!\w)(\w+)="([^"]*)"')
+
+# (起始标记, 键值对正则, 双引号, 右括号)
+_TEXT_SYNTAX = (CUSETCONFIG_MARKER, _PAIR, '"', ")")
+_BYTES_SYNTAX = (CUSETCONFIG_MARKER.encode("ascii"), _PAIR_BYTES, b'"', b")")
+
+
+def _find_call_end(content, body, limit, quote, close):
+    """返回调用结束的右括号位置，找不到时返回-1"""
+    find = content.find
+
+    # 值中不含双引号，引号成对出现时遇到的右括号才是调用结束
+    end = find(close, body, limit)
+    scanned = body
+    quotes = 0
+    while end != -1:
+        # mmap 没有 count 方法，切片只复制单个调用范围内的数据
+        quotes += content[scanned:end].count(quote)
+        if quotes % 2 == 0:
+            return end
+        scanned = end
+        end = find(close, end + 1, limit)
+    return -1
+
+
+def _iter_calls(content, start, final, syntax=_TEXT_SYNTAX):
+    """产出 (键值对列表, 已处理到的位置)
+
+    final 为 False 时内容后面可能还有数据，遇到不完整的调用即停止。
+    """
+    marker, pair, quote, close = syntax
+    marker_len = len(marker)
+    find = content.find
+    findall = pair.findall
+
+    begin = find(marker, start)
+    while begin != -1:
+        body = begin + marker_len
+        next_begin = find(marker, body)
+        limit = next_begin if next_begin != -1 else len(content)
+
+        end = _find_call_end(content, body, limit, quote, close)
+        if end == -1:
+            if not final and next_begin == -1 and len(content) - begin < MAX_CALL_SIZE:
+                # 调用可能被分块截断，等待后续数据
+                return
+            # 缺少右括号（文件被截断或格式异常），解析到下一个调用为止
+            end = limit
+
+        yield findall(content, body, end), end
+        begin = next_begin
+
+
+def iter_cusetconfig(content, start=0):
+    """逐个产出内容中每个CUSetConfig调用的字段字典
+
+    缺少某个字段的调用不会再“借用”下一个调用的字段。
+    """
+    for pairs, _ in _iter_calls(content, start, True):
+        yield dict(pairs)
+
+
+def iter_cusetconfig_stream(f, chunk_size=DEFAULT_CHUNK_SIZE):
+    """从文本文件对象中分块读取并逐个产出CUSetConfig字段字典
+
+    跨块的不完整调用会保留到下一块继续解析，内存占用与文件大小无关。
+    """
+    marker_keep = len(CUSETCONFIG_MARKER) - 1
+    buffer = ""
+
+    while True:
+        chunk = f.read(chunk_size)
+        final = not chunk
+        buffer += chunk
+
+        consumed = 0
+        for pairs, consumed in _iter_calls(buffer, 0, final):
+            yield dict(pairs)
+        if final:
+            return
+
+        # 保留未完成的调用；没有调用时只保留可能是半个起始标记的尾部
+        pending = buffer.find(CUSETCONFIG_MARKER, consumed)
+        if pending == -1:
+            pending = max(consumed, len(buffer) - marker_keep)
+        buffer = buffer[pending:]
+
+
+def iter_cusetconfig_mmap(path, fields=None, encoding="utf-8", progress=None):
+    """内存映射文件后在字节层面扫描，逐个产出CUSetConfig字段字典
+
+    不解码整个文件，只解码命中的字段值；fields 为需要的字段名集合，
+    为 None 时解码全部字段。progress 为 progress(已处理字节数, 总字节数)，
+    每处理完一个调用后调用一次。
+    """
+    wanted = None if fields is None else {name.encode("ascii") for name in fields}
+
+    with open(path, "rb") as f:
+        # 空文件无法映射
+        if not f.seek(0, 2):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            total = len(mm)
+            for pairs, end in _iter_calls(mm, 0, True, _BYTES_SYNTAX):
+                yield {
+                    key.decode("ascii"): value.decode(encoding)
+                    for key, value in pairs
+                    if wanted is None or key in wanted
+                }
+                if progress is not None:
+                    progress(end, total)
+
+
+def iter_cusetconfig_file(path, fields=None, encoding="utf-8", progress=None):
+    """按最省内存的方式扫描文件：优先内存映射，无法映射时退回分块读取
+
+    progress 只在内存映射时调用（分块读取时无法得知总长度）。
+    """
+    try:
+        with open(path, "rb") as f:
+            mappable = f.seekable()
+    except OSError:
+        mappable = False
+
+    if mappable:
+        yield from iter_cusetconfig_mmap(path, fields, encoding, progress)
+        return
+
+    with open(path, "r", encoding=encoding) as f:
+        for call in iter_cusetconfig_stream(f):
+            if fields is not None:
+                call = {key: value for key, value in call.items() if key in fields}
+            yield call
@@ -0,0 +1,288 @@
+"""本地HTTP频道列表服务
+
+用法：python -m iptv_extractor.server 输入 [--host 0.0.0.0] [--port 8080]
+
+输入可以是JSP抓包，也可以是已生成的频道列表（name,url 格式），文件变化后自动重新提取。
+提供以下地址（category 为规则中的分类 id 或标题）：
+  /playlist.txt  /playlist.m3u  /playlist.json   全部频道
+  /<category>.txt  /<category>.m3u  /<category>.json   单个分类
+  /index.json    可用地址列表
+每种内容在提取后只生成一次（包括gzip压缩版本和ETag），请求直接从内存返回，
+机顶盒带 If-None-Match 轮询时只返回 304。
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from email.utils import formatdate
+from urllib.parse import unquote, urlsplit
+
+from .cache import file_digest
+from .cli import add_cache_arguments, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError, sort_channels
+from .epg import EpgError, load_epg
+from .merge import load_source
+from .names import NamesError
+from .rules import RulesError
+from .writers import FORMAT_JSON, FORMAT_M3U, FORMAT_TXT, FORMATS, WRITERS
+
+DEFAULT_HOST = "0.0.0.0"
+DEFAULT_PORT = 8080
+DEFAULT_INTERVAL = 5.0
+
+# 保持连接的空闲超时和请求头大小限制
+KEEP_ALIVE_TIMEOUT = 15
+MAX_HEADER_LINES = 100
+
+CONTENT_TYPES = {
+    FORMAT_TXT: "text/plain; charset=utf-8",
+    FORMAT_M3U: "audio/x-mpegurl; charset=utf-8",
+    FORMAT_JSON: "application/json; charset=utf-8",
+}
+
+# 比这更小的内容不压缩
+GZIP_MIN_SIZE = 256
+
+REASONS = {200: "OK", 304: "Not Modified", 400: "Bad Request", 404: "Not Found",
+           405: "Method Not Allowed", 503: "Service Unavailable"}
+
+
+class Representation:
+    """一种预先生成的响应内容：原文、gzip 压缩版本和各自的ETag"""
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag", "content_type")
+
+    def __init__(self, body, content_type):
+        self.body = body
+        self.content_type = content_type
+        digest = hashlib.blake2b(body, digest_size=12).hexdigest()
+        self.etag = f'"{digest}"'
+        if len(body) >= GZIP_MIN_SIZE:
+            self.gzip_body = gzip.compress(body, compresslevel=9, mtime=0)
+            self.gzip_etag = f'"{digest}-gz"'
+        else:
+            self.gzip_body = None
+            self.gzip_etag = None
+
+
+def render(channels, rules, fmt, epg=None):
+    """用输出格式的写入函数生成内容"""
+    f = io.StringIO()
+    WRITERS[fmt](f, channels, rules, epg)
+    return f.getvalue().encode("utf-8")
+
+
+def build_site(channels, rules, epg=None):
+    """生成所有地址对应的内容，返回 路径 -> Representation；epg 见 write_output"""
+    site = {}
+    index = {"channels": len(channels), "playlists": {}, "categories": {}}
+    for fmt in FORMATS:
+        path = f"/playlist.{fmt}"
+        site[path] = Representation(render(channels, rules, fmt, epg), CONTENT_TYPES[fmt])
+        index["playlists"][fmt] = path
+
+    for category, members in rules.group(channels).items():
+        if not members:
+            continue
+        title = rules.titles[category]
+        index["categories"][category] = {"title": title, "channels": len(members)}
+        for fmt in FORMATS:
+            representation = Representation(render(members, rules, fmt, epg), CONTENT_TYPES[fmt])
+            # 分类既可以用 id 也可以用标题访问
+            site[f"/{category}.{fmt}"] = representation
+            site[f"/{title}.{fmt}"] = representation
+            index["categories"][category][fmt] = f"/{category}.{fmt}"
+
+    site["/index.json"] = Representation(
+        json.dumps(index, ensure_ascii=False, indent=2).encode("utf-8"), CONTENT_TYPES[FORMAT_JSON])
+    site["/"] = site["/playlist.txt"]
+    return site
+
+
+class PlaylistServer:
+    """从内存返回预先生成内容的HTTP服务，输入文件变化后在后台重新生成"""
+
+    def __init__(self, input_path, options, cache=None, log=print, epg_path=None):
+        self.input_path = input_path
+        self.epg_path = epg_path
+        self.epg = None
+        self.options = options
+        self.cache = cache
+        self.log = log
+        self.site = {}
+        self.signature = None
+        self.digest = None
+        self._date = (0, "")
+
+    def load(self):
+        """提取输入文件并生成所有内容（在线程池中运行）"""
+        rules = self.options.rules()
+        # 节目单只在第一次加载时读取
+        if self.epg_path and self.epg is None:
+            self.epg = load_epg(self.epg_path, self.options.names())
+        channels = sort_channels(load_source(self.input_path, self.options, self.cache), rules,
+                                 self.options.natural_sort, self.options.names())
+        return build_site(channels, rules, self.epg), len(channels)
+
+    async def refresh(self):
+        """输入文件有变化时重新生成内容，返回是否更新"""
+        try:
+            stat = os.stat(self.input_path)
+        except OSError as e:
+            self.log(f"无法读取输入文件：{e}")
+            return False
+        signature = (stat.st_size, stat.st_mtime_ns)
+        if signature == self.signature:
+            return False
+
+        loop = asyncio.get_running_loop()
+        try:
+            digest = await loop.run_in_executor(None, file_digest, self.input_path)
+            if digest == self.digest:
+                self.signature = signature
+                return False
+            site, count = await loop.run_in_executor(None, self.load)
+        except (ExtractError, RulesError, NamesError, EpgError, OSError, UnicodeDecodeError) as e:
+            # 文件可能正在写入，下个周期再试
+            self.log(f"处理失败：{e}")
+            return False
+        # 整体替换，正在进行的请求仍使用旧内容
+        self.site = site
+        self.signature = signature
+        self.digest = digest
+        self.log(f"{time.strftime('[%H:%M:%S]')} 已加载 {count} 个频道，共 {len(site)} 个地址")
+        return True
+
+    async def watch(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            await self.refresh()
+
+    def _http_date(self):
+        now = int(time.time())
+        if self._date[0] != now:
+            self._date = (now, formatdate(now, usegmt=True))
+        return self._date[1]
+
+    def respond(self, method, target, headers):
+        """生成响应，返回 (状态码, 响应头列表, 正文)"""
+        if method not in ("GET", "HEAD"):
+            return 405, [("Allow", "GET, HEAD")], b""
+        representation = self.site.get(unquote(urlsplit(target).path))
+        if representation is None:
+            return (503 if not self.site else 404), [], b""
+
+        use_gzip = representation.gzip_body is not None and "gzip" in headers.get("accept-encoding", "")
+        etag = representation.gzip_etag if use_gzip else representation.etag
+        response_headers = [("ETag", etag), ("Vary", "Accept-Encoding"), ("Cache-Control", "no-cache")]
+
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*" or etag in if_none_match):
+            return 304, response_headers, b""
+
+        response_headers.append(("Content-Type", representation.content_type))
+        if use_gzip:
+            response_headers.append(("Content-Encoding", "gzip"))
+            return 200, response_headers, representation.gzip_body
+        return 200, response_headers, representation.body
+
+    async def handle(self, reader, writer):
+        """处理一个连接上的请求（支持 keep-alive）"""
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEP_ALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line:
+                    break
+                parts = request_line.decode("latin-1").split()
+                headers = {}
+                for _ in range(MAX_HEADER_LINES):
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                else:
+                    parts = []
+
+                if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+                    status, response_headers, body = 400, [], b""
+                    keep_alive = False
+                else:
+                    method, target, version = parts
+                    status, response_headers, body = self.respond(method, target, headers)
+                    connection = headers.get("connection", "").lower()
+                    keep_alive = connection == "keep-alive" if version == "HTTP/1.0" else connection != "close"
+
+                head = [f"HTTP/1.1 {status} {REASONS[status]}", f"Date: {self._http_date()}",
+                        f"Content-Length: {len(body)}", "Connection: " + ("keep-alive" if keep_alive else "close")]
+                head.extend(f"{name}: {value}" for name, value in response_headers)
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode("utf-8"))
+                if body and parts[0] != "HEAD":
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, interval=DEFAULT_INTERVAL, started=None):
+        """加载内容并开始监听；started 为回调，参数为实际监听的端口"""
+        await self.refresh()
+        server = await asyncio.start_server(self.handle, host, port, backlog=1024)
+        watcher = asyncio.create_task(self.watch(interval))
+        actual_port = server.sockets[0].getsockname()[1]
+        if started is not None:
+            started(actual_port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            watcher.cancel()
+
+
+def main(argv=None):
+    """HTTP服务主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.server",
+        description="通过HTTP提供TXT、M3U、JSON格式的频道列表，输入文件变化后自动更新",
+    )
+    parser.add_argument("input", help="JSP抓包或已生成的频道列表")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"监听地址（默认：{DEFAULT_HOST}）")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"监听端口（默认：{DEFAULT_PORT}）")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"检查输入文件变化的间隔秒数（默认：{DEFAULT_INTERVAL}）")
+    parser.add_argument("--epg", dest="epg_path",
+                        help="XMLTV 节目单（.xml 或 .xml.gz），M3U/JSON 中加上匹配的 tvg-id 和 tvg-logo")
+    add_option_arguments(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    server = PlaylistServer(args.input, options_from_args(args), cache_from_args(args),
+                            log=lambda message: print(message, flush=True), epg_path=args.epg_path)
+
+    def started(port):
+        print(f"正在监听 http://{args.host}:{port}/ ，频道列表：/playlist.txt /playlist.m3u /playlist.json，"
+              f"按 Ctrl+C 退出", flush=True)
+
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.interval, started))
+    except KeyboardInterrupt:
+        pass
+    except OSError as e:
+        print(f"无法启动服务：{e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
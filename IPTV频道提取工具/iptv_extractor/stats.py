@@ -0,0 +1,153 @@
+"""提取流程的耗时统计和性能分析
+
+RunStats 记录各阶段（cache、scan、classify、sort、write）的耗时和各类记录的数量，
+可选用 cProfile 记录函数耗时、用 tracemalloc 记录内存峰值，结果可写成JSON报告。
+"""
+
+import cProfile
+import json
+import pstats
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# 报告中保留的函数和内存分配位置数量
+PROFILE_TOP = 20
+MEMORY_TOP = 10
+
+# 各阶段的中文名称，用于显示
+STAGE_TITLES = {
+    "cache": "缓存查找",
+    "scan": "读取和扫描",
+    "classify": "过滤和分类",
+    "sort": "排序",
+    "write": "写入文件",
+    "epg": "读取节目单",
+    "epg_output": "写入精简节目单",
+}
+
+
+class RunStats:
+    """一次运行的各阶段耗时、计数和可选的性能分析结果"""
+
+    def __init__(self, profile=False, trace_memory=False):
+        self.profile = profile
+        self.trace_memory = trace_memory
+        self.timings = {}    # 阶段 -> 秒
+        self.counters = {}   # 名称 -> 数量
+        self.profile_top = []
+        self.memory = None
+
+    def add(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def stage(self, name):
+        """统计 with 块内的耗时"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def timed_iter(self, name, iterable):
+        """逐个产出 iterable 的元素，只统计取下一个元素所花的时间"""
+        iterator = iter(iterable)
+        clock = time.perf_counter
+        total = 0.0
+        try:
+            while True:
+                start = clock()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    break
+                finally:
+                    total += clock() - start
+                yield item
+        finally:
+            self.add(name, total)
+
+    def record_result(self, extracted):
+        """记录提取结果中的各类数量"""
+        self.counters["matched"] = len(extracted.results)
+        self.counters["skipped_invalid"] = len(extracted.skipped_channels)
+        for skip_id, names in extracted.skipped_by_filter.items():
+            self.counters[f"skipped_{skip_id}"] = len(names)
+
+    @contextmanager
+    def capture(self, profile_path=None):
+        """按设置启用 cProfile 和 tracemalloc；profile_path 给出时另存 .prof 文件"""
+        profiler = cProfile.Profile() if self.profile else None
+        started_tracing = self.trace_memory and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield self
+        finally:
+            if profiler is not None:
+                profiler.disable()
+                self._collect_profile(profiler, profile_path)
+            if self.trace_memory:
+                self._collect_memory()
+                if started_tracing:
+                    tracemalloc.stop()
+
+    def _collect_profile(self, profiler, profile_path):
+        if profile_path:
+            profiler.dump_stats(profile_path)
+        stats = pstats.Stats(profiler)
+        entries = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        self.profile_top = [
+            {
+                "function": f"{filename}:{line}({name})",
+                "calls": calls,
+                "tottime": round(tottime, 6),
+                "cumtime": round(cumtime, 6),
+            }
+            for (filename, line, name), (_, calls, tottime, cumtime, _) in entries[:PROFILE_TOP]
+        ]
+
+    def _collect_memory(self):
+        current, peak = tracemalloc.get_traced_memory()
+        snapshot = tracemalloc.take_snapshot()
+        self.memory = {
+            "current_bytes": current,
+            "peak_bytes": peak,
+            "top": [{"location": str(stat.traceback), "bytes": stat.size}
+                    for stat in snapshot.statistics("lineno")[:MEMORY_TOP]],
+        }
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def to_dict(self):
+        data = {
+            "timings": {name: round(seconds, 6) for name, seconds in self.timings.items()},
+            "total": round(self.total, 6),
+            "counters": dict(self.counters),
+        }
+        if self.profile_top:
+            data["profile"] = self.profile_top
+        if self.memory is not None:
+            data["memory"] = self.memory
+        return data
+
+    def write_json(self, path):
+        """写入JSON格式的报告"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+
+    def summary_lines(self):
+        """供命令行和GUI显示的摘要"""
+        lines = [f"{STAGE_TITLES.get(name, name)}：{seconds:.3f}s" for name, seconds in self.timings.items()]
+        lines.append(f"合计：{self.total:.3f}s")
+        if self.memory is not None:
+            lines.append(f"内存峰值：{self.memory['peak_bytes'] / 1024 / 1024:.1f} MB")
+        return lines
@@ -0,0 +1,199 @@
+"""监视目录：有新的抓包文件写入时自动重新提取
+
+用法：python -m iptv_extractor.watch 抓包目录 [-o 全部频道.csv | --output-dir 输出目录] [--interval 2]
+
+定期扫描目录中的JSP文件（不依赖第三方库，网络共享目录上也可用），
+文件大小和修改时间在 --settle 秒内不再变化才认为写入完成；
+内容哈希与上次处理时相同则跳过。输出先写入临时文件再替换，
+播放器不会读到写了一半的文件。空闲时每个周期只做一次目录扫描。
+"""
+
+import argparse
+import fnmatch
+import os
+import sys
+import time
+
+from .batch import output_name
+from .cache import file_digest
+from .capture import CAPTURE_EXTENSIONS
+from .cli import add_cache_arguments, add_format_argument, add_option_arguments, cache_from_args, options_from_args
+from .core import ExtractError, extract_file, write_results
+from .names import NamesError
+from .rules import RulesError
+from .writers import FORMAT_EXTENSIONS, FORMAT_TXT
+
+# 默认监视的文件
+DEFAULT_PATTERNS = ("*.jsp",) + tuple("*" + extension for extension in CAPTURE_EXTENSIONS)
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_SETTLE = 2.0
+
+
+class _FileState:
+    """一个被监视文件的状态"""
+    __slots__ = ("signature", "changed_at", "pending", "digest")
+
+    def __init__(self, signature, changed_at):
+        self.signature = signature   # (大小, 修改时间)
+        self.changed_at = changed_at
+        self.pending = True          # 有尚未处理的变化
+        self.digest = None           # 上次处理时的内容哈希
+
+
+class Watcher:
+    """轮询目录，对写入完成且内容有变化的文件重新提取"""
+
+    def __init__(self, directory, options, output=None, output_dir=None, fmt=None, cache=None,
+                 patterns=DEFAULT_PATTERNS, recursive=False, settle=DEFAULT_SETTLE, log=print):
+        self.directory = directory
+        self.options = options
+        self.output = output
+        self.output_dir = output_dir or directory
+        self.fmt = fmt
+        self.cache = cache
+        self.patterns = patterns
+        self.recursive = recursive
+        self.settle = settle
+        self.log = log
+        self.states = {}
+
+    def _scan(self, directory):
+        """产出 (路径, (大小, 修改时间))"""
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                if entry.is_dir():
+                    if self.recursive and not entry.name.startswith("."):
+                        yield from self._scan(entry.path)
+                elif any(fnmatch.fnmatch(entry.name, pattern) for pattern in self.patterns):
+                    stat = entry.stat()
+                    yield entry.path, (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue  # 扫描过程中被删除
+
+    def output_path(self, path):
+        """输入文件对应的输出路径"""
+        if self.output:
+            return self.output
+        extension = FORMAT_EXTENSIONS[self.fmt or FORMAT_TXT]
+        return os.path.join(self.output_dir, output_name(os.path.relpath(path, self.directory), extension))
+
+    def poll(self, now=None):
+        """扫描一次目录，处理写入完成的文件，返回本次处理的文件列表"""
+        now = time.monotonic() if now is None else now
+        seen = set()
+        ready = []
+        for path, signature in self._scan(self.directory):
+            seen.add(path)
+            state = self.states.get(path)
+            if state is None:
+                self.states[path] = _FileState(signature, now)
+            elif state.signature != signature:
+                # 仍在写入或被再次修改，重新计时
+                state.signature = signature
+                state.changed_at = now
+                state.pending = True
+            elif state.pending and now - state.changed_at >= self.settle:
+                ready.append((path, state))
+
+        for path in list(self.states):
+            if path not in seen:
+                del self.states[path]
+
+        processed = []
+        for path, state in ready:
+            state.pending = False
+            if self.process(path, state):
+                processed.append(path)
+        return processed
+
+    def process(self, path, state):
+        """提取一个文件，内容未变化时跳过；返回是否写入了输出"""
+        try:
+            digest = file_digest(path)
+            if digest == state.digest:
+                self.log(f"{_now()} 内容未变化，跳过：{path}")
+                return False
+            extracted = extract_file(path, self.options, self.cache)
+            output = self.output_path(path)
+            write_results(output, extracted.results, self.options.rules(), self.fmt, atomic=True)
+        except (ExtractError, RulesError, NamesError, OSError, UnicodeDecodeError) as e:
+            # 文件可能仍不完整，等待下一次变化
+            self.log(f"{_now()} 处理失败：{path}：{e}")
+            return False
+        state.digest = digest
+        self.log(f"{_now()} 已更新 {output}：{len(extracted.results)} 条记录（来自 {path}）")
+        return True
+
+    def run(self, interval=DEFAULT_INTERVAL):
+        """持续监视，直到被中断"""
+        while True:
+            self.poll()
+            time.sleep(interval)
+
+
+def _now():
+    return time.strftime("[%H:%M:%S]")
+
+
+def main(argv=None):
+    """监视模式主函数，返回进程退出码"""
+    parser = argparse.ArgumentParser(
+        prog="python -m iptv_extractor.watch",
+        description="监视目录，有新的抓包文件写入完成时自动重新提取",
+    )
+    parser.add_argument("directory", help="要监视的目录")
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument("-o", "--output", help="输出文件（所有抓包都写入这个文件）")
+    output.add_argument("--output-dir", help="输出目录，每个抓包生成一个输出文件（默认：监视的目录）")
+    parser.add_argument("--pattern", action="append",
+                        help=f"监视的文件名通配符（可多次指定，默认：{'、'.join(DEFAULT_PATTERNS)}）")
+    parser.add_argument("-r", "--recursive", action="store_true", help="同时监视子目录")
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL,
+                        help=f"扫描目录的间隔秒数（默认：{DEFAULT_INTERVAL}）")
+    parser.add_argument("--settle", type=float, default=DEFAULT_SETTLE,
+                        help=f"文件多少秒不再变化后才处理（默认：{DEFAULT_SETTLE}）")
+    parser.add_argument("--once", action="store_true", help="处理目录中现有的文件后退出")
+    add_option_arguments(parser)
+    add_format_argument(parser)
+    add_cache_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        print(f"目录不存在：{args.directory}", file=sys.stderr)
+        return 1
+    if args.output_dir:
+        os.makedirs(args.output_dir, exist_ok=True)
+
+    options = options_from_args(args)
+    try:
+        options.rules()
+        options.names()
+    except (RulesError, NamesError, OSError) as e:
+        print(f"处理失败：{e}", file=sys.stderr)
+        return 1
+
+    watcher = Watcher(args.directory, options, args.output, args.output_dir, args.fmt, cache_from_args(args),
+                      tuple(args.pattern or DEFAULT_PATTERNS), args.recursive, args.settle,
+                      log=lambda message: print(message, flush=True))
+    if args.once:
+        # 现有文件不需要等待写入完成，扫描两次即可处理
+        watcher.settle = 0
+        watcher.poll()
+        watcher.poll()
+        return 0
+
+    print(f"{_now()} 正在监视 {args.directory}，按 Ctrl+C 退出", flush=True)
+    try:
+        watcher.run(args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""输出格式：TXT/DIYP（name,url 与 #genre# 标题行）、M3U（#EXTINF）和 JSON
+
+每种格式都直接把记录逐条写入带缓冲的文件，不在内存中拼接整个输出。
+"""
+
+import json
+import os
+
+from .rules import load_rules
+
+FORMAT_TXT = "txt"
+FORMAT_M3U = "m3u"
+FORMAT_JSON = "json"
+FORMATS = (FORMAT_TXT, FORMAT_M3U, FORMAT_JSON)
+
+# 扩展名 -> 输出格式，未列出的扩展名按 TXT 输出
+EXTENSION_FORMATS = {
+    ".csv": FORMAT_TXT,
+    ".txt": FORMAT_TXT,
+    ".m3u": FORMAT_M3U,
+    ".m3u8": FORMAT_M3U,
+    ".json": FORMAT_JSON,
+}
+
+# 各格式的默认扩展名（批量模式生成输出文件名时使用）
+FORMAT_EXTENSIONS = {
+    FORMAT_TXT: ".csv",
+    FORMAT_M3U: ".m3u",
+    FORMAT_JSON: ".json",
+}
+
+# TXT 使用utf-8-sig解决Excel乱码问题；播放器通常不接受带BOM的M3U
+FORMAT_ENCODINGS = {
+    FORMAT_TXT: "utf-8-sig",
+    FORMAT_M3U: "utf-8",
+    FORMAT_JSON: "utf-8",
+}
+
+# 写文件的缓冲区大小
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def detect_format(path, fmt=None):
+    """根据显式指定的格式或扩展名确定输出格式"""
+    if fmt:
+        return fmt
+    return EXTENSION_FORMATS.get(os.path.splitext(path)[1].lower(), FORMAT_TXT)
+
+
+def _txt_name(name):
+    """TXT 每行以逗号分隔名称和地址，名称中的逗号换成全角逗号"""
+    return name.replace(",", "，") if "," in name else name
+
+
+def iter_txt_lines(channels, rules):
+    """按分类逐行产出 TXT 内容：分类标题行后跟 name,url"""
+    for category, members in rules.group(channels).items():
+        if members:  # 只有当该分类有频道时才添加标题
+            yield rules.header(category)
+            for channel in members:
+                yield f"{_txt_name(channel.name)},{channel.url}"
+
+
+def write_txt(f, channels, rules, epg=None):
+    """写入 TXT/DIYP 格式，行之间用换行分隔，末尾不加换行（不包含节目单信息）"""
+    separator = ""
+    for line in iter_txt_lines(channels, rules):
+        f.write(separator)
+        f.write(line)
+        separator = "\n"
+
+
+def _attribute(value):
+    """M3U 属性值中不能出现双引号"""
+    return value.replace('"', "'")
+
+
+def _tvg_attributes(channel, epg):
+    """tvg-id、tvg-name 和 tvg-logo 属性；节目单中没有该频道时只有 tvg-name"""
+    match = epg.find(channel.name) if epg is not None else None
+    if match is None:
+        return f'tvg-name="{_attribute(channel.name)}"'
+    logo = f' tvg-logo="{_attribute(match.logo)}"' if match.logo else ""
+    return f'tvg-id="{_attribute(match.id)}" tvg-name="{_attribute(match.name)}"{logo}'
+
+
+def write_m3u(f, channels, rules, epg=None):
+    """写入带 #EXTINF 和 group-title 的 M3U 播放列表，epg（EpgIndex）给出时加上 tvg-id 和 tvg-logo"""
+    f.write("#EXTM3U\n")
+    for category, members in rules.group(channels).items():
+        group = _attribute(rules.titles[category])
+        for channel in members:
+            chno = f' tvg-chno="{_attribute(channel.user_channel_id)}"' if channel.user_channel_id else ""
+            f.write(f'#EXTINF:-1 {_tvg_attributes(channel, epg)}{chno} '
+                    f'group-title="{group}",{channel.name}\n{channel.url}\n')
+
+
+def write_json(f, channels, rules, epg=None):
+    """以JSON数组写入频道记录，逐条序列化；epg 给出时加上 tvg_id、tvg_name 和 tvg_logo"""
+    f.write("[")
+    separator = "\n"
+    for category, members in rules.group(channels).items():
+        group = rules.titles[category]
+        for channel in members:
+            item = {
+                "name": channel.name,
+                "url": channel.url,
+                "kind": channel.kind,
+                "category": category,
+                "group": group,
+                "channel_id": channel.channel_id,
+                "user_channel_id": channel.user_channel_id,
+                "channel_url": channel.channel_url,
+                "timeshift_url": channel.timeshift_url,
+            }
+            if epg is not None:
+                match = epg.find(channel.name)
+                item["tvg_id"] = match.id if match else ""
+                item["tvg_name"] = match.name if match else ""
+                item["tvg_logo"] = match.logo if match else ""
+            f.write(separator)
+            f.write(json.dumps(item, ensure_ascii=False))
+            separator = ",\n"
+    f.write("\n]\n")
+
+
+WRITERS = {
+    FORMAT_TXT: write_txt,
+    FORMAT_M3U: write_m3u,
+    FORMAT_JSON: write_json,
+}
+
+
+def write_output(path, channels, rules=None, fmt=None, atomic=False, epg=None):
+    """按格式把频道记录流式写入文件
+
+    atomic 为 True 时先写入同目录下的临时文件再替换目标文件，
+    读取方（播放器、HTTP服务）不会读到写了一半的文件。
+    epg 为节目单索引（EpgIndex），给出时 M3U 和 JSON 带上 tvg-id 和 tvg-logo。
+    """
+    rules = rules or load_rules()
+    fmt = detect_format(path, fmt)
+    if not atomic:
+        with open(path, "w", encoding=FORMAT_ENCODINGS[fmt], buffering=WRITE_BUFFER_SIZE) as f:
+            WRITERS[fmt](f, channels, rules, epg)
+        return
+
+    directory, name = os.path.split(os.path.abspath(path))
+    tmp_path = os.path.join(directory, f".{name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding=FORMAT_ENCODINGS[fmt], buffering=WRITE_BUFFER_SIZE) as f:
+            WRITERS[fmt](f, channels, rules, epg)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
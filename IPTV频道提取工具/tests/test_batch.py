@@ -0,0 +1,70 @@
+"""批量模式测试"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from iptv_extractor.batch import SUMMARY_NAME, main, output_names
+from make_capture import write_capture
+from make_corpus import write_corpus
+
+
+class OutputNamesTest(unittest.TestCase):
+
+    def test_same_stem_different_extension(self):
+        inputs = [os.path.join("in", "box.jsp"), os.path.join("in", "box.pcap")]
+        self.assertEqual(output_names(inputs), ["box.jsp.csv", "box.pcap.csv"])
+
+    def test_same_name_in_different_directories(self):
+        inputs = [os.path.join("in", "a", "getchannellistHWCU.jsp"), os.path.join("in", "b", "getchannellistHWCU.jsp")]
+        self.assertEqual(output_names(inputs, ".m3u"),
+                         ["a_getchannellistHWCU.jsp.m3u", "b_getchannellistHWCU.jsp.m3u"])
+
+    def test_duplicate_output_rejected(self):
+        inputs = [os.path.join("in", "a_b.jsp"), os.path.join("in", "a", "b.jsp")]
+        with self.assertRaises(ValueError):
+            output_names(inputs)
+
+
+class BatchMainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_jsp_and_capture_with_same_stem(self):
+        source = os.path.join(self.tmp, "in")
+        os.mkdir(source)
+        write_corpus(os.path.join(source, "box.jsp"), 200)
+        other = os.path.join(self.tmp, "other.jsp")
+        write_corpus(other, 40, seed=1)
+        write_capture(os.path.join(source, "box.pcap"), other)
+
+        output = os.path.join(self.tmp, "out")
+        self.assertEqual(main([source, "-o", output, "-j", "1", "--no-cache", "-q"]), 0)
+        with open(os.path.join(output, SUMMARY_NAME), encoding="utf-8") as f:
+            items = json.load(f)["items"]
+        self.assertEqual(len({item["output"] for item in items}), 2)
+        for item in items:
+            with open(item["output"], encoding="utf-8") as f:
+                records = sum(1 for line in f if line.strip() and "#genre#" not in line)
+            self.assertEqual(records, item["records"])
+
+    def test_unwritable_output_dir(self):
+        source = os.path.join(self.tmp, "box.jsp")
+        write_corpus(source, 10)
+        blocker = os.path.join(self.tmp, "file")
+        open(blocker, "w").close()
+        # 输出目录的上级是普通文件，无法创建
+        self.assertEqual(main([source, "-o", os.path.join(blocker, "out"), "-j", "1", "-q"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
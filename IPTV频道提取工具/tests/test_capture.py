@@ -0,0 +1,152 @@
+"""抓包提取测试：用 benchmarks/make_capture.py 生成的小抓包检查 TCP 重组和 HTTP 解码"""
+
+import gzip
+import os
+import random
+import shutil
+import struct
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from iptv_extractor.capture import HttpResponseDecoder, TcpStream, is_capture
+from iptv_extractor.core import ExtractError, extract_file
+from make_capture import BOX, SERVER, http_flow, write_capture, write_pcap, write_pcapng
+from make_corpus import write_corpus
+
+TARGET = "/EPG/jsp/getchannellistHWCU.jsp?x=1"
+
+
+class TcpStreamTest(unittest.TestCase):
+
+    def test_out_of_order_and_retransmitted(self):
+        stream = TcpStream(1000)
+        self.assertEqual(stream.add(1005, 0x18, b"fghij"), b"")
+        self.assertEqual(stream.add(1000, 0x18, b"abcde"), b"abcdefghij")
+        # 完全重传和部分重叠的段只交付新的部分
+        self.assertEqual(stream.add(1000, 0x18, b"abcde"), b"")
+        self.assertEqual(stream.add(1008, 0x18, b"ijklm"), b"klm")
+        self.assertFalse(stream.closed)
+        stream.add(1013, 0x11, b"")
+        self.assertTrue(stream.closed)
+
+    def test_sequence_wraparound(self):
+        stream = TcpStream(0xFFFFFFFE)
+        self.assertEqual(stream.add(0xFFFFFFFE, 0x18, b"abcd"), b"abcd")
+        self.assertEqual(stream.add(2, 0x18, b"ef"), b"ef")
+
+
+class HttpResponseDecoderTest(unittest.TestCase):
+
+    def feed_bytewise(self, response):
+        decoder = HttpResponseDecoder()
+        body = b"".join(decoder.feed(response[i:i + 1]) for i in range(len(response)))
+        return decoder, body
+
+    def test_chunked_gzip_split_everywhere(self):
+        payload = gzip.compress("频道列表".encode("utf-8") * 50)
+        chunks = b"".join(b"%x\r\n%s\r\n" % (len(payload[i:i + 7]), payload[i:i + 7])
+                          for i in range(0, len(payload), 7))
+        response = (b"HTTP/1.1 200 OK\r\nTransfer-Encoding: chunked\r\nContent-Encoding: gzip\r\n\r\n"
+                    + chunks + b"0\r\n\r\n")
+        decoder, body = self.feed_bytewise(response)
+        self.assertEqual(body.decode("utf-8"), "频道列表" * 50)
+        self.assertTrue(decoder.done)
+        self.assertIsNone(decoder.error)
+
+    def test_content_length(self):
+        decoder, body = self.feed_bytewise(b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nhello")
+        self.assertEqual(body, b"hello")
+        self.assertTrue(decoder.done)
+
+
+class CaptureExtractTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.jsp = os.path.join(self.tmp, "getchannellistHWCU.jsp")
+        write_corpus(self.jsp, 300)
+        self.expected = extract_file(self.jsp).results
+
+    def capture(self, name, **kwargs):
+        path = os.path.join(self.tmp, name)
+        write_capture(path, self.jsp, **kwargs)
+        self.assertTrue(is_capture(path))
+        return path
+
+    def test_encodings_and_reordering(self):
+        for fmt in ("pcap", "pcapng"):
+            for chunked in (False, True):
+                for compress in (False, True):
+                    for reorder in (False, True):
+                        options = dict(fmt=fmt, chunked=chunked, compress=compress, reorder=reorder)
+                        with self.subTest(**options):
+                            path = self.capture(f"capture.{fmt}", noise=20000, **options)
+                            self.assertEqual(extract_file(path).results, self.expected)
+
+    def test_non_200_response_skipped(self):
+        # 先有一个带频道内容的 404 响应，只能使用随后的 200 响应
+        with open(self.jsp, "rb") as f:
+            body = f.read()
+        other = os.path.join(self.tmp, "other.jsp")
+        write_corpus(other, 20, seed=1)
+        with open(other, "rb") as f:
+            wrong = f.read()
+        rng = random.Random(0)
+        frames = (http_flow((BOX[0], BOX[1] - 1), SERVER, TARGET, wrong, False, False, rng, False,
+                            status="404 Not Found")
+                  + http_flow(BOX, SERVER, TARGET, body, True, False, rng, True))
+        path = os.path.join(self.tmp, "status.pcap")
+        with open(path, "wb") as f:
+            write_pcap(f, frames)
+        self.assertEqual(extract_file(path).results, self.expected)
+
+    def test_no_response(self):
+        path = os.path.join(self.tmp, "empty.pcap")
+        with open(path, "wb") as f:
+            write_pcap(f, [])
+        with self.assertRaisesRegex(ExtractError, "没有找到"):
+            extract_file(path)
+
+    def test_truncated_file(self):
+        path = self.capture("capture.pcap", chunked=True)
+        with open(path, "rb") as f:
+            data = f.read()
+        with open(path, "wb") as f:
+            f.write(data[:len(data) * 2 // 3])
+        with self.assertRaisesRegex(ExtractError, "不完整.*截断"):
+            extract_file(path)
+
+    def test_pcapng_bad_block_length(self):
+        path = self.capture("capture.pcapng", fmt="pcapng")
+        with open(path, "rb") as f:
+            data = bytearray(f.read())
+        # 第三个块（第一个数据包）的长度改为无效值；读取时不能按这个长度读入剩余的文件
+        position = 0
+        for _ in range(2):
+            position += struct.unpack_from("<I", data, position + 4)[0]
+        for length in (4, 13, 0xFFFFFFF0):
+            with self.subTest(length=length):
+                struct.pack_into("<I", data, position + 4, length)
+                with open(path, "wb") as f:
+                    f.write(data)
+                with self.assertRaisesRegex(ExtractError, "损坏"):
+                    extract_file(path)
+
+    def test_pcapng_short_block(self):
+        # 块长度有效但放不下 Enhanced Packet Block 的固定字段
+        path = os.path.join(self.tmp, "short.pcapng")
+        with open(path, "wb") as f:
+            write_pcapng(f, [])
+            f.write(struct.pack("<III", 6, 16, 0) + struct.pack("<I", 16))
+        with self.assertRaisesRegex(ExtractError, "损坏"):
+            extract_file(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
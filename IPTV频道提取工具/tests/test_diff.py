@@ -0,0 +1,74 @@
+"""两次抓包比较测试"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iptv_extractor.diff import diff_channels, main
+
+HOST = "rtsp://10.11.43.21/PLTV/88888912/224"
+
+
+class DiffTest(unittest.TestCase):
+
+    def test_unchanged_ignores_name_spelling(self):
+        old = [("CCTV-1高清", f"{HOST}/1.smil")]
+        new = [("ＣＣＴＶ-1 高清", f"{HOST}/1.smil")]
+        result = diff_channels(old, new)
+        self.assertEqual(result.unchanged, 1)
+        self.assertFalse(result.changed)
+
+    def test_url_changed_by_alias(self):
+        old = [("CCTV-1高清", f"{HOST}/1.smil")]
+        new = [("CCTV1 HD", f"{HOST}/1b.smil")]
+        result = diff_channels(old, new)
+        self.assertEqual(result.url_changed, [("CCTV1 HD", f"{HOST}/1.smil", f"{HOST}/1b.smil")])
+        self.assertEqual(result.summary()["added"], 0)
+
+    def test_url_kinds_compared_separately(self):
+        # smil 和 m3u8 各算一条，m3u8 地址消失时是删除而不是换地址
+        old = [("CCTV-2高清", f"{HOST}/2.smil"), ("CCTV-2高清", f"{HOST}/2.m3u8")]
+        new = [("CCTV-2高清", f"{HOST}/2b.smil")]
+        result = diff_channels(old, new)
+        self.assertEqual(len(result.url_changed), 1)
+        self.assertEqual(result.removed, [("CCTV-2高清", f"{HOST}/2.m3u8")])
+
+    def test_renamed(self):
+        old = [("CCTV-13", f"{HOST}/13.smil")]
+        new = [("CCTV-13新闻", f"{HOST}/13.smil")]
+        result = diff_channels(old, new)
+        self.assertEqual(result.renamed, [("CCTV-13", "CCTV-13新闻", f"{HOST}/13.smil", f"{HOST}/13.smil")])
+
+    def test_added_and_removed(self):
+        old = [("CCTV-NEWS", f"{HOST}/news.smil")]
+        new = [("CGTN英语", f"{HOST}/cgtn.smil")]
+        result = diff_channels(old, new)
+        # CCTV-NEWS 和 CGTN英语 是不同的频道，不能当作换地址
+        self.assertEqual(result.url_changed, [])
+        self.assertEqual(result.added, new)
+        self.assertEqual(result.removed, old)
+
+    def test_duplicate_records_matched_once(self):
+        old = [("CCTV-5", f"{HOST}/5.smil")]
+        new = [("CCTV-5", f"{HOST}/5.smil"), ("CCTV-5", f"{HOST}/5.smil")]
+        result = diff_channels(old, new)
+        self.assertEqual(result.unchanged, 1)
+        self.assertEqual(len(result.added), 1)
+
+
+class DiffMainTest(unittest.TestCase):
+
+    def test_unwritable_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            source = os.path.join(tmp, "list.csv")
+            with open(source, "w", encoding="utf-8") as f:
+                f.write(f"CCTV-1高清,{HOST}/1.smil\n")
+            output = os.path.join(tmp, "missing", "diff.json")
+            self.assertEqual(main([source, source, "-o", output, "--no-cache"]), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
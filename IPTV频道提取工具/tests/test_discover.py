@@ -0,0 +1,86 @@
+"""隐藏频道发现测试：在 benchmarks/bench_probe.py 的模拟服务器上检查候选ID、检查点和断点续测"""
+
+import contextlib
+import io
+import os
+import random
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from bench_probe import start_server
+from iptv_extractor.discover import IdSpace, load_checkpoint, main, split_url
+from iptv_extractor.merge import read_playlist
+
+FIRST_ID = 3221226000
+
+
+class IdSpaceTest(unittest.TestCase):
+
+    def test_split_url(self):
+        self.assertEqual(split_url("rtsp://h:554/PLTV/88888912/224/3221226643/411164633.smil?a=1"),
+                         ("rtsp://h:554/PLTV/88888912/224/", 3221226643, "411164633.smil?a=1"))
+        self.assertIsNone(split_url("rtsp://h/live/cctv1.smil"))
+
+    def test_candidates(self):
+        space = IdSpace()
+        for url in ("rtsp://h/p/1000010/a.smil", "rtsp://h/p/1000014/b.smil", "rtsp://other/p/1000012/c.smil"):
+            self.assertTrue(space.add(url))
+        self.assertFalse(space.add("rtsp://h/live/cctv1.smil"))
+        candidates = list(space.candidates(margin=1))
+        # 其他前缀下已知的ID不再检测；文件名取ID最接近的已知频道
+        self.assertEqual([url for _, _, url in candidates if url.startswith("rtsp://h/")],
+                         ["rtsp://h/p/1000009/a.smil", "rtsp://h/p/1000011/a.smil", "rtsp://h/p/1000013/b.smil",
+                          "rtsp://h/p/1000015/b.smil"])
+        done = {"rtsp://h/p/": {1000009, 1000013}}
+        self.assertEqual([channel_id for prefix, channel_id, _ in space.candidates(1, done) if prefix == "rtsp://h/p/"],
+                         [1000011, 1000015])
+
+
+class DiscoverMainTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_resume_from_checkpoint(self):
+        rng = random.Random(1)
+        ids = sorted(rng.sample(range(FIRST_ID, FIRST_ID + 60), 25))
+        # 隐藏频道在已知ID之间
+        hidden = set(rng.sample(ids[1:-1], 5))
+        known = [i for i in ids if i not in hidden]
+        alive = set(ids)
+        port = start_server(alive=lambda target: any(f"/{i}/" in target for i in alive))
+
+        playlist = os.path.join(self.tmp, "全部频道.csv")
+        with open(playlist, "w", encoding="utf-8") as f:
+            for i in sorted(known):
+                f.write(f"频道{i},rtsp://127.0.0.1:{port}/PLTV/88888912/224/{i}/{rng.randrange(10 ** 9)}.smil\n")
+        output = os.path.join(self.tmp, "隐藏频道.txt")
+        checkpoint = output + ".checkpoint.json"
+        base = [playlist, "-o", output, "--margin", "3", "--rate", "0", "--timeout", "1", "--no-cache", "-q"]
+
+        def run(*args):
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.assertEqual(main(base + list(args)), 0)
+            return sum(len(ids) for ids in load_checkpoint(checkpoint).values())
+
+        # 第一次只检测一部分，模拟中断
+        self.assertEqual(run("--limit", "10"), 10)
+        total = run()
+        self.assertEqual(total, max(known) - min(known) + 1 + 2 * 3 - len(known))
+        found = [split_url(channel.url)[1] for channel in read_playlist(output)]
+        self.assertEqual(sorted(found), sorted(hidden))
+
+        # 全部检测过后再次运行不再追加
+        self.assertEqual(run(), total)
+        self.assertEqual(len(read_playlist(output)), len(hidden))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,165 @@
+"""合并去重策略测试"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from iptv_extractor.core import ExtractError, ExtractOptions, extract_file, make_channel, write_results
+from iptv_extractor.merge import (POLICIES, POLICY_KEEP_ALL, POLICY_NEWEST, POLICY_PREFER_M3U8, load_source,
+                                  merge_channels)
+from make_corpus import write_corpus
+
+HOST = "rtsp://10.11.43.21/PLTV/88888912/224"
+
+
+def channel(name, path):
+    return make_channel(name, f"{HOST}/{path}")
+
+
+def records(merged):
+    return [(record.name, record.url.rsplit("/", 1)[1]) for record in merged]
+
+
+class MergeTest(unittest.TestCase):
+
+    def test_same_path_collapses(self):
+        old = [channel("CCTV-1高清", "1.smil")]
+        new = [channel("CCTV-1高清", "1.smil"), channel("CCTV-1高清", "1.smil")]
+        for policy in POLICIES:
+            with self.subTest(policy=policy):
+                merged, stats = merge_channels([old, new], policy)
+                self.assertEqual(records(merged), [("CCTV-1高清", "1.smil")])
+                self.assertEqual(stats.duplicate_urls, 2)
+                self.assertEqual(stats.output, 1)
+
+    def test_same_source_distinct_paths_kept(self):
+        # 同一来源中同名的 smil 和 m3u8 是两路不同的流，写法不同也都要保留
+        source = [channel("CCTV-2高清", "2.smil"), channel("ＣＣＴＶ-2高清", "2.m3u8")]
+        for policy in POLICIES:
+            with self.subTest(policy=policy):
+                merged, stats = merge_channels([source], policy)
+                self.assertEqual(len(merged), 2)
+                self.assertEqual(stats.channels, 1)
+                self.assertEqual(stats.distinct_streams, 1)
+                self.assertEqual(stats.name_conflicts, 0)
+
+    def test_cross_source_policies(self):
+        old = [channel("CCTV-3高清", "3.m3u8")]
+        new = [channel("CCTV3 HD", "3b.smil")]
+        expected = {
+            POLICY_PREFER_M3U8: [("CCTV-3高清", "3.m3u8")],
+            POLICY_NEWEST: [("CCTV3 HD", "3b.smil")],
+            POLICY_KEEP_ALL: [("CCTV-3高清", "3.m3u8"), ("CCTV3 HD", "3b.smil")],
+        }
+        for policy, result in expected.items():
+            with self.subTest(policy=policy):
+                merged, stats = merge_channels([old, new], policy)
+                self.assertEqual(records(merged), result)
+                self.assertEqual(stats.name_conflicts, 1)
+                self.assertEqual(stats.dropped, 2 - len(result))
+
+    def test_chosen_source_keeps_all_streams(self):
+        # 选中较新来源时保留它的全部流，包括与旧来源地址相同的那一路
+        old = [channel("CCTV-2高清", "2.smil")]
+        new = [channel("CCTV-2高清", "2.smil"), channel("ＣＣＴＶ-2高清", "2.m3u8")]
+        for policy in (POLICY_PREFER_M3U8, POLICY_NEWEST):
+            with self.subTest(policy=policy):
+                merged, stats = merge_channels([old, new], policy)
+                self.assertEqual(sorted(path for _, path in records(merged)), ["2.m3u8", "2.smil"])
+                self.assertEqual(stats.dropped, 0)
+
+    def test_renamed_stream_newest(self):
+        old = [channel("CCTV-13", "13.smil")]
+        new = [channel("CCTV-13新闻", "13.smil")]
+        merged, _ = merge_channels([old, new], POLICY_NEWEST)
+        self.assertEqual(records(merged), [("CCTV-13新闻", "13.smil")])
+        merged, _ = merge_channels([old, new], POLICY_PREFER_M3U8)
+        self.assertEqual(records(merged), [("CCTV-13", "13.smil")])
+
+    def test_quality_variants_are_distinct(self):
+        old = [channel("CCTV-1", "1sd.smil")]
+        new = [channel("CCTV-1高清", "1hd.smil")]
+        for policy in POLICIES:
+            with self.subTest(policy=policy):
+                merged, _ = merge_channels([old, new], policy)
+                self.assertEqual(len(merged), 2)
+
+    def test_cgtn_and_cctv_news_both_kept(self):
+        # 回归：别名表曾把 CCTV-NEWS 和 CGTN英语 当作同一频道，合并时丢掉其中一路
+        old = [channel("CCTV-NEWS", "news.smil"), channel("CGTN英语", "cgtn.smil")]
+        new = [channel("CGTN英语", "cgtn.smil"), channel("CCTV-NEWS", "news.smil")]
+        for policy in POLICIES:
+            with self.subTest(policy=policy):
+                merged, stats = merge_channels([old, new], policy)
+                self.assertEqual(sorted(records(merged)), [("CCTV-NEWS", "news.smil"), ("CGTN英语", "cgtn.smil")])
+                self.assertEqual(stats.channels, 2)
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            merge_channels([[]], "oldest")
+
+
+class LoadSourceTest(unittest.TestCase):
+    """本工具的各种输出格式都能作为输入读回"""
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.jsp = os.path.join(self.tmp, "getchannellistHWCU.jsp")
+        write_corpus(self.jsp, 300)
+        self.expected = extract_file(self.jsp, ExtractOptions()).results
+
+    def load(self, name):
+        path = os.path.join(self.tmp, name)
+        write_results(path, self.expected)
+        return load_source(path)
+
+    def test_txt(self):
+        loaded = self.load("list.csv")
+        self.assertEqual(sorted((c.name, c.url, c.category) for c in loaded),
+                         sorted((c.name, c.url, c.category) for c in self.expected))
+
+    def test_m3u(self):
+        for name in ("list.m3u", "list.m3u8"):
+            with self.subTest(name=name):
+                loaded = self.load(name)
+                self.assertEqual(sorted((c.name, c.url, c.user_channel_id) for c in loaded),
+                                 sorted((c.name, c.url, c.user_channel_id) for c in self.expected))
+
+    def test_json(self):
+        loaded = self.load("list.json")
+        self.assertEqual(sorted(c.astuple() for c in loaded), sorted(c.astuple() for c in self.expected))
+
+    def test_jsp_saved_as_txt(self):
+        path = os.path.join(self.tmp, "page.txt")
+        shutil.copy(self.jsp, path)
+        self.assertEqual(load_source(path), self.expected)
+
+    def test_m3u_title_with_comma(self):
+        path = os.path.join(self.tmp, "list.m3u")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('#EXTM3U\n#EXTINF:-1 tvg-name="a,b" group-title="央视",CCTV-1,综合\nrtsp://h/1.smil\n')
+        self.assertEqual([(c.name, c.url) for c in load_source(path)], [("CCTV-1,综合", "rtsp://h/1.smil")])
+
+    def test_invalid_json(self):
+        path = os.path.join(self.tmp, "list.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"name": "CCTV-1"}')
+        with self.assertRaises(ExtractError):
+            load_source(path)
+
+    def test_unsupported_format(self):
+        path = os.path.join(self.tmp, "epg.xml")
+        open(path, "w").close()
+        with self.assertRaises(ExtractError):
+            load_source(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
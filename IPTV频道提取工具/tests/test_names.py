@@ -0,0 +1,72 @@
+"""频道名称规范化和别名索引测试"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iptv_extractor.names import PLAIN_QUALITY, NameIndex, NamesError, load_names, normalize
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_width_case_and_punctuation(self):
+        self.assertEqual(normalize("ＣＣＴＶ－１ hd"), "CCTV1HD")
+        self.assertEqual(normalize("CCTV-5+（体育赛事）"), "CCTV5+体育赛事")
+
+
+class LookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.names = load_names()
+
+    def test_aliases_and_quality(self):
+        self.assertEqual(self.names.lookup("CCTV-1"), ("CCTV1", PLAIN_QUALITY))
+        self.assertEqual(self.names.lookup("ＣＣＴＶ１ HD"), ("CCTV1", 2))
+        self.assertEqual(self.names.lookup("CCTV-1高清"), self.names.lookup("CCTV1 HD"))
+        self.assertEqual(self.names.lookup("CCTV-4标清")[1], 0)
+        # 字母开头的后缀不能截断英文名称
+        self.assertEqual(self.names.canonical("CHD"), "CHD")
+
+    def test_4k_in_base_name(self):
+        # 规范ID中的 4K/8K 本身就是清晰度，后面有没有“超高清”结果都一样
+        self.assertEqual(self.names.lookup("CCTV4K超高清"), ("CCTV4K", 3))
+        self.assertEqual(self.names.lookup("CCTV4K"), self.names.lookup("CCTV4K超高清"))
+        self.assertEqual(self.names.lookup("CCTV-4K"), self.names.lookup("央视4K"))
+        self.assertEqual(self.names.lookup("CCTV8K"), self.names.lookup("CCTV8K超高清"))
+        self.assertGreater(self.names.lookup("CCTV8K")[1], self.names.lookup("CCTV4K")[1])
+        self.assertEqual(self.names.lookup("CCTV4"), ("CCTV4", PLAIN_QUALITY))
+
+    def test_cgtn(self):
+        self.assertNotEqual(self.names.canonical("CCTV-NEWS"), self.names.canonical("CGTN英语"))
+        self.assertEqual(self.names.canonical("CGTN英文"), self.names.canonical("CGTN英语"))
+
+
+class LoadNamesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_invalid_files(self):
+        path = os.path.join(self.tmp, "aliases.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write('{"channels": [')
+        with self.assertRaises(NamesError):
+            load_names(path)
+        invalid = [
+            {},
+            {"channels": [{"aliases": ["CCTV1"]}]},
+            {"channels": [{"id": "A", "aliases": ["X"]}, {"id": "B", "aliases": ["x"]}]},
+        ]
+        for data in invalid:
+            with self.subTest(data=data):
+                with self.assertRaises(NamesError):
+                    NameIndex(data)
+
+
+if __name__ == "__main__":
+    unittest.main()
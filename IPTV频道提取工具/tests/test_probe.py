@@ -0,0 +1,117 @@
+"""地址检测测试：在 benchmarks/bench_probe.py 的模拟服务器上检查 RTSP 和 HTTP 检测"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from bench_probe import make_urls, start_server
+from iptv_extractor.merge import read_playlist
+from iptv_extractor.probe import (HTTP_HEAD, HTTP_PLAYLIST, POLICY_DEMOTE, POLICY_DROP, RTSP_DESCRIBE, RTSP_OPTIONS,
+                                  main, probe_urls)
+
+TIMEOUT = 0.5
+
+
+class ProbeTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.port = start_server()
+
+    def url(self, scheme, state, name):
+        return f"{scheme}://127.0.0.1:{self.port}/{state}/PLTV/88888912/224/3221225001/{name}"
+
+    def test_rtsp(self):
+        urls = [self.url("rtsp", "live", "1.smil"), self.url("rtsp", "dead", "2.smil")]
+        for method in (RTSP_OPTIONS, RTSP_DESCRIBE):
+            with self.subTest(method=method):
+                live, dead = probe_urls(urls, timeout=TIMEOUT, rtsp_method=method)
+                self.assertTrue(live.ok)
+                self.assertEqual(live.status, 200)
+                self.assertIsNotNone(live.latency)
+                self.assertFalse(dead.ok)
+                self.assertEqual(dead.status, 404)
+
+    def test_http(self):
+        playlist = self.url("http", "live", "index.m3u8")
+        other = self.url("http", "live", "index.html")
+        dead = self.url("http", "dead", "index.m3u8")
+        results = probe_urls([playlist, other, dead], timeout=TIMEOUT, http_mode=HTTP_HEAD)
+        self.assertEqual([result.ok for result in results], [True, True, False])
+        # 获取播放列表时还要检查正文
+        results = probe_urls([playlist, other, dead], timeout=TIMEOUT, http_mode=HTTP_PLAYLIST)
+        self.assertEqual([result.ok for result in results], [True, False, False])
+        self.assertEqual(results[1].status, 200)
+        self.assertEqual(results[1].error, "不是有效的播放列表")
+
+    def test_timeout_and_errors(self):
+        urls = [self.url("rtsp", "hang", "1.smil"), "rtsp://127.0.0.1:1/live/1.smil", "udp://239.0.0.1:5000"]
+        hang, refused, unsupported = probe_urls(urls, timeout=TIMEOUT)
+        self.assertEqual(hang.error, "超时")
+        self.assertIsNone(hang.status)
+        self.assertFalse(refused.ok)
+        self.assertIsNotNone(refused.error)
+        self.assertEqual(unsupported.error, "不支持的地址")
+
+    def test_concurrent_matches_sequential(self):
+        urls, alive = make_urls(60, self.port, dead_ratio=0.2, hang_ratio=0.05)
+        urls.append(urls[0])  # 重复的地址只检测一次，结果仍按输入顺序返回
+        for concurrency, per_host in ((1, 1), (16, 4)):
+            with self.subTest(concurrency=concurrency, per_host=per_host):
+                results = probe_urls(urls, concurrency=concurrency, per_host=per_host, timeout=TIMEOUT)
+                self.assertEqual([result.url for result in results], urls)
+                self.assertEqual([result.ok for result in results], [url in alive for url in urls])
+
+
+class ProbeMainTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.port = start_server()
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.input = os.path.join(self.tmp, "频道.csv")
+        with open(self.input, "w", encoding="utf-8") as f:
+            for i, state in enumerate(["dead", "live", "live", "dead"], 1):
+                f.write(f"CCTV-{i},rtsp://127.0.0.1:{self.port}/{state}/PLTV/88888912/224/{i}/{i}.smil\n")
+
+    def run_main(self, *args):
+        output = os.path.join(self.tmp, "out.csv")
+        with contextlib.redirect_stdout(io.StringIO()):
+            code = main([self.input, "-o", output, "--timeout", str(TIMEOUT), "--no-cache", *args])
+        self.assertEqual(code, 0)
+        return [channel.name for channel in read_playlist(output)]
+
+    def test_policies(self):
+        self.assertEqual(self.run_main(), ["CCTV-1", "CCTV-2", "CCTV-3", "CCTV-4"])
+        self.assertEqual(self.run_main("--policy", POLICY_DROP), ["CCTV-2", "CCTV-3"])
+        self.assertEqual(self.run_main("--policy", POLICY_DEMOTE), ["CCTV-2", "CCTV-3", "CCTV-1", "CCTV-4"])
+
+    def test_report(self):
+        report = os.path.join(self.tmp, "report.json")
+        self.run_main("--report", report)
+        with open(report, encoding="utf-8") as f:
+            data = json.load(f)
+        self.assertEqual((data["channels"], data["alive"]), (4, 2))
+        self.assertEqual([item["status"] for item in data["items"]], [404, 200, 200, 404])
+
+    def test_unwritable_output(self):
+        with contextlib.redirect_stderr(io.StringIO()) as stderr:
+            code = main([self.input, "-o", os.path.join(self.tmp, "missing", "out.csv"), "--no-cache", "-q"])
+        self.assertEqual(code, 1)
+        self.assertIn("处理失败", stderr.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+"""分类和跳过规则测试"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from iptv_extractor.core import ExtractOptions
+from iptv_extractor.rules import KeywordMatcher, RuleSet, RulesError, load_rules, tomllib
+
+
+def rule_set(categories, skip=()):
+    return RuleSet({"categories": list(categories) + [{"id": "other", "priority": 100, "default": True}],
+                    "skip": list(skip)})
+
+
+class KeywordMatcherTest(unittest.TestCase):
+
+    def matched(self, keywords, text):
+        mask = KeywordMatcher((keyword, bit) for bit, keyword in enumerate(keywords)).scan(text)
+        return {keyword for bit, keyword in enumerate(keywords) if mask >> bit & 1}
+
+    def test_overlapping_keywords(self):
+        keywords = ["CCTV", "CCTV-5", "TV", "V-5+", "5+", "卫视", "视"]
+        self.assertEqual(self.matched(keywords, "CCTV-5+体育"), {"CCTV", "CCTV-5", "TV", "V-5+", "5+"})
+        self.assertEqual(self.matched(keywords, "北京卫视"), {"卫视", "视"})
+        self.assertEqual(self.matched(keywords, "CCTCCTV"), {"CCTV", "TV"})
+        self.assertEqual(self.matched(keywords, ""), set())
+
+    def test_keyword_inside_failed_prefix(self):
+        # 沿失败指针回退时不能漏掉较短的关键词
+        self.assertEqual(self.matched(["abcd", "bce"], "abce"), {"bce"})
+        self.assertEqual(self.matched(["he", "she", "his", "hers"], "ushers"), {"he", "she", "hers"})
+
+
+class RuleSetTest(unittest.TestCase):
+
+    def test_default_rules(self):
+        rules = load_rules()
+        expected = {
+            "CCTV-1高清": "cctv_hd_4k",
+            "CCTV4K超高清": "cctv_hd_4k",
+            "北京卫视高清": "weishi_hd",
+            "内蒙古卫视高清": "bendi",
+            "呼和浩特新闻综合": "bendi",
+            "纪实人文高清": "other_hd",
+            "北京卫视": "weishi",
+            "CCTV-1": "others",
+        }
+        for name, category in expected.items():
+            with self.subTest(name=name):
+                self.assertEqual(rules.classify(name), category)
+
+    def test_all_any_none(self):
+        rules = rule_set([{"id": "hd", "rules": [{"all": ["卫视", "高清"], "any": ["北京", "湖南"], "none": ["测试"]}]}])
+        self.assertEqual(rules.classify("湖南卫视高清"), "hd")
+        self.assertEqual(rules.classify("浙江卫视高清"), "other")
+        self.assertEqual(rules.classify("北京卫视高清测试"), "other")
+        self.assertEqual(rules.classify("北京卫视"), "other")
+
+    def test_keyword_and_regex_precedence(self):
+        # 分类按 priority 判断，与规则是关键词还是正则无关
+        keyword_first = rule_set([{"id": "keyword", "priority": 1, "rules": [{"any": ["CCTV"]}]},
+                                  {"id": "regex", "priority": 2, "rules": [{"regex": r"CCTV-\d+"}]}])
+        regex_first = rule_set([{"id": "keyword", "priority": 2, "rules": [{"any": ["CCTV"]}]},
+                                {"id": "regex", "priority": 1, "rules": [{"regex": r"CCTV-\d+"}]}])
+        self.assertEqual(keyword_first.classify("CCTV-5"), "keyword")
+        self.assertEqual(regex_first.classify("CCTV-5"), "regex")
+        self.assertEqual(regex_first.classify("CCTV5"), "keyword")
+        # 同一规则中的关键词和正则必须同时满足
+        both = rule_set([{"id": "both", "rules": [{"all": ["高清"], "regex": r"^CCTV"}]}])
+        self.assertEqual(both.classify("CCTV-1高清"), "both")
+        self.assertEqual(both.classify("CCTV-1"), "other")
+        self.assertEqual(both.classify("北京卫视高清"), "other")
+
+    def test_skip_rules(self):
+        rules = rule_set([], [
+            {"id": "shopping", "option": "skip_shopping", "keywords": ["购物"]},
+            {"id": "test", "regex": r"^测试\d+$"},
+        ])
+        self.assertEqual(rules.skip_reason(rules.scan("家有购物")), "shopping")
+        self.assertEqual(rules.skip_reason(rules.scan("测试12")), "test")
+        self.assertIsNone(rules.skip_reason(rules.scan("测试频道")))
+        # option 对应的选项关闭时不跳过
+        keep = ExtractOptions(skip_shopping=False)
+        self.assertIsNone(rules.skip_reason(rules.scan("家有购物"), keep))
+        self.assertEqual(rules.skip_reason(rules.scan("测试12"), keep), "test")
+
+    def test_invalid_definitions(self):
+        invalid = [
+            {},
+            {"categories": [{"id": "a", "rules": []}]},
+            {"categories": [{"id": "a", "default": True}, {"id": "a", "rules": []}]},
+            {"categories": [{"id": "a", "default": True}], "skip": [{"keywords": ["购物"]}]},
+            {"categories": [{"id": "a", "rules": [{"regex": "("}]}, {"id": "b", "default": True}]},
+        ]
+        for data in invalid:
+            with self.subTest(data=data):
+                with self.assertRaises(RulesError):
+                    RuleSet(data)
+
+
+class LoadRulesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+
+    def test_invalid_json(self):
+        with self.assertRaises(RulesError):
+            load_rules(self.write("rules.json", '{"categories": ['))
+
+    @unittest.skipIf(tomllib is None, "需要 Python 3.11+")
+    def test_toml(self):
+        path = self.write("rules.toml", '[[categories]]\nid = "hd"\nrules = [{any = ["高清"]}]\n'
+                                        '[[categories]]\nid = "other"\npriority = 100\ndefault = true\n')
+        rules = load_rules(path)
+        self.assertEqual(rules.classify("CCTV-1高清"), "hd")
+        self.assertEqual(rules.classify("CCTV-1"), "other")
+
+    @unittest.skipIf(tomllib is None, "需要 Python 3.11+")
+    def test_invalid_toml(self):
+        with self.assertRaises(RulesError):
+            load_rules(self.write("rules.toml", "[[categories]\nid = "))
+
+
+class RegexRuleTest(unittest.TestCase):
+    """带捕获组或全局标志的正则与单独匹配时的含义一致"""
+
+    def test_backreference(self):
+        rules = rule_set([{"id": "repeat", "rules": [{"regex": r"(\w)\1"}]},
+                          {"id": "sports", "priority": 10, "rules": [{"regex": r"体育\d+"}]}])
+        self.assertEqual(rules.classify("卡卡少儿"), "repeat")
+        self.assertEqual(rules.classify("体育55"), "repeat")
+        self.assertEqual(rules.classify("体育5"), "sports")
+        self.assertEqual(rules.classify("北京卫视"), "other")
+
+    def test_duplicate_group_names(self):
+        rules = rule_set([{"id": "a", "rules": [{"regex": r"(?P<n>\d)高清"}]},
+                          {"id": "b", "priority": 10, "rules": [{"regex": r"(?P<n>\d)标清"}]}])
+        self.assertEqual(rules.classify("CCTV1高清"), "a")
+        self.assertEqual(rules.classify("CCTV1标清"), "b")
+
+    def test_global_flags_do_not_leak(self):
+        rules = rule_set([{"id": "cgtn", "rules": [{"regex": "(?i)cgtn"}]},
+                          {"id": "news", "priority": 10, "rules": [{"regex": "NEWS"}]}])
+        self.assertEqual(rules.classify("cgtn英语"), "cgtn")
+        # (?i) 只作用于它所在的正则
+        self.assertEqual(rules.classify("news"), "other")
+        self.assertEqual(rules.classify("CCTV-NEWS"), "news")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+"""CUSetConfig 扫描器测试"""
+
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from iptv_extractor.scanner import (iter_cusetconfig, iter_cusetconfig_file, iter_cusetconfig_mmap,
+                                    iter_cusetconfig_stream)
+from make_corpus import write_corpus
+
+# 边界情况：值中的右括号、缺少字段的调用、被截断的调用、非ASCII名称
+EDGE_CASES = (
+    "<script>\n"
+    "Authentication.CUSetConfig('Channel','ChannelName=\"CGTN英语\",ChannelURL=\"rtsp://h/a(1).smil\"');\n"
+    "Authentication.CUSetConfig('Channel','ChannelName=\"缺少地址\"');\n"
+    "Authentication.CUSetConfig('Channel','ChannelName=\"CCTV-5+\",ChannelURL=\"rtsp://h/b.m3u8\"');\n"
+    "Authentication.CUSetConfig('Channel','ChannelName=\"截断\",ChannelURL=\"rtsp://h/c.smil"
+)
+
+
+class ScannerTest(unittest.TestCase):
+
+    def test_edge_cases(self):
+        calls = list(iter_cusetconfig(EDGE_CASES))
+        self.assertEqual(calls[0]["ChannelURL"], "rtsp://h/a(1).smil")
+        # 缺少字段的调用不会借用下一个调用的字段
+        self.assertNotIn("ChannelURL", calls[1])
+        self.assertEqual(calls[2]["ChannelName"], "CCTV-5+")
+
+    def test_long_input_is_linear(self):
+        # 没有右括号的长参数不能引起回溯
+        content = "Authentication.CUSetConfig('Channel','" + "ChannelName=\"x\"," * 50000
+        calls = list(iter_cusetconfig(content * 2))
+        self.assertEqual([call["ChannelName"] for call in calls], ["x", "x"])
+
+    def assert_stream_equivalent(self, content):
+        expected = list(iter_cusetconfig(content))
+        # 块大小小于起始标记和单个调用时，跨块的调用也不能丢失或错位
+        for chunk_size in (1, 7, 64, 4096):
+            with self.subTest(chunk_size=chunk_size):
+                stream = iter_cusetconfig_stream(io.StringIO(content), chunk_size)
+                self.assertEqual(list(stream), expected)
+        return expected
+
+    def test_stream_edge_cases(self):
+        self.assert_stream_equivalent(EDGE_CASES)
+        self.assertEqual(list(iter_cusetconfig_stream(io.StringIO(""))), [])
+
+    def test_stream_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "corpus.jsp")
+            write_corpus(path, 500)
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+        self.assertEqual(len(self.assert_stream_equivalent(content)), 500)
+
+
+class MmapScannerTest(unittest.TestCase):
+    """内存映射扫描与 str 扫描的结果必须一致"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(content)
+        return path
+
+    def assert_equivalent(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            expected = list(iter_cusetconfig(f.read()))
+        self.assertEqual(list(iter_cusetconfig_mmap(path)), expected)
+        self.assertEqual(list(iter_cusetconfig_file(path)), expected)
+
+    def test_corpus(self):
+        path = os.path.join(self.tmp.name, "corpus.jsp")
+        write_corpus(path, 500)
+        self.assert_equivalent(path)
+
+    def test_edge_cases(self):
+        self.assert_equivalent(self.write("edge.jsp", EDGE_CASES))
+
+    def test_fields(self):
+        path = os.path.join(self.tmp.name, "corpus.jsp")
+        write_corpus(path, 50)
+        fields = {"ChannelName", "ChannelURL"}
+        expected = [{key: value for key, value in call.items() if key in fields}
+                    for call in iter_cusetconfig_mmap(path)]
+        self.assertEqual(list(iter_cusetconfig_mmap(path, fields)), expected)
+        self.assertEqual(list(iter_cusetconfig_file(path, fields)), expected)
+
+    def test_progress(self):
+        path = self.write("edge.jsp", EDGE_CASES)
+        seen = []
+        list(iter_cusetconfig_mmap(path, progress=lambda done, total: seen.append((done, total))))
+        self.assertTrue(seen)
+        self.assertEqual({total for _, total in seen}, {os.path.getsize(path)})
+        self.assertEqual(seen, sorted(seen))
+
+    def test_empty_file(self):
+        self.assertEqual(list(iter_cusetconfig_mmap(self.write("empty.jsp", ""))), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+"""HTTP频道列表服务测试：ETag、gzip、304 和输入文件变化后的重新加载"""
+
+import asyncio
+import gzip
+import http.client
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from urllib.parse import quote
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from iptv_extractor.core import ExtractOptions
+from iptv_extractor.rules import load_rules
+from iptv_extractor.server import PlaylistServer
+from make_corpus import write_corpus
+
+INTERVAL = 0.05
+
+
+class PlaylistServerTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.input = os.path.join(cls.tmp, "getchannellistHWCU.jsp")
+        write_corpus(cls.input, 300)
+        cls.server = PlaylistServer(cls.input, ExtractOptions(), log=lambda message: None)
+        ports = []
+        started = threading.Event()
+
+        def on_started(port):
+            ports.append(port)
+            started.set()
+
+        threading.Thread(target=lambda: asyncio.run(cls.server.serve("127.0.0.1", 0, INTERVAL, on_started)),
+                         daemon=True).start()
+        started.wait()
+        cls.port = ports[0]
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def setUp(self):
+        self.connection = http.client.HTTPConnection("127.0.0.1", self.port, timeout=5)
+        self.addCleanup(self.connection.close)
+
+    def request(self, path, method="GET", **headers):
+        self.connection.request(method, path, headers=headers)
+        response = self.connection.getresponse()
+        return response.status, response, response.read()
+
+    def test_etag_and_not_modified(self):
+        status, response, body = self.request("/playlist.txt")
+        self.assertEqual(status, 200)
+        self.assertIn("#genre#", body.decode("utf-8"))
+        etag = response.getheader("ETag")
+        self.assertTrue(etag)
+        # 同一连接上继续请求：ETag 相同时只返回 304
+        status, response, body = self.request("/playlist.txt", **{"If-None-Match": etag})
+        self.assertEqual((status, body), (304, b""))
+        self.assertEqual(response.getheader("ETag"), etag)
+        status, _, _ = self.request("/playlist.txt", **{"If-None-Match": '"other"'})
+        self.assertEqual(status, 200)
+
+    def test_gzip(self):
+        _, plain, body = self.request("/playlist.m3u")
+        status, response, compressed = self.request("/playlist.m3u", **{"Accept-Encoding": "gzip"})
+        self.assertEqual(status, 200)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(gzip.decompress(compressed), body)
+        self.assertIsNone(plain.getheader("Content-Encoding"))
+        # 压缩版本有自己的 ETag，不能和原文的 304 混用
+        gzip_etag = response.getheader("ETag")
+        self.assertNotEqual(gzip_etag, plain.getheader("ETag"))
+        status, _, _ = self.request("/playlist.m3u", **{"Accept-Encoding": "gzip", "If-None-Match": gzip_etag})
+        self.assertEqual(status, 304)
+        status, _, _ = self.request("/playlist.m3u", **{"If-None-Match": gzip_etag})
+        self.assertEqual(status, 200)
+
+    def test_paths(self):
+        _, _, index = self.request("/index.json")
+        index = json.loads(index)
+        self.assertEqual(index["channels"], sum(item["channels"] for item in index["categories"].values()))
+        titles = load_rules().titles
+        for category, item in index["categories"].items():
+            _, _, by_id = self.request(item["json"])
+            _, _, by_title = self.request("/" + quote(titles[category]) + ".json")
+            self.assertEqual(by_id, by_title)
+            self.assertEqual(len(json.loads(by_id)), item["channels"])
+        self.assertEqual(self.request("/")[2], self.request("/playlist.txt")[2])
+        self.assertEqual(self.request("/missing.txt")[0], 404)
+        self.assertEqual(self.request("/playlist.txt", method="POST")[0], 405)
+
+    def test_head(self):
+        _, _, body = self.request("/playlist.json")
+        status, response, head = self.request("/playlist.json", method="HEAD")
+        self.assertEqual((status, head), (200, b""))
+        self.assertEqual(int(response.getheader("Content-Length")), len(body))
+
+    def test_reload(self):
+        _, response, before = self.request("/playlist.txt")
+        etag = response.getheader("ETag")
+        changed = os.path.join(self.tmp, "changed.jsp")
+        write_corpus(changed, 50, seed=1)
+        os.replace(changed, self.input)
+        self.addCleanup(write_corpus, self.input, 300)
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            status, response, after = self.request("/playlist.txt", **{"If-None-Match": etag})
+            if status == 200:
+                break
+            time.sleep(INTERVAL)
+        self.assertEqual(status, 200)
+        self.assertNotEqual(response.getheader("ETag"), etag)
+        self.assertNotEqual(after, before)
+
+
+if __name__ == "__main__":
+    unittest.main()
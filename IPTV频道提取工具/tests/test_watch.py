@@ -0,0 +1,61 @@
+"""监视模式测试"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+TOOL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, TOOL_DIR)
+sys.path.insert(0, os.path.join(TOOL_DIR, "benchmarks"))
+
+from iptv_extractor.core import ExtractOptions
+from iptv_extractor.watch import Watcher
+from make_capture import write_capture
+from make_corpus import write_corpus
+
+
+class WatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.logs = []
+
+    def watcher(self, directory, **kwargs):
+        return Watcher(directory, ExtractOptions(), settle=0, log=self.logs.append, **kwargs)
+
+    def test_output_path_keeps_extension(self):
+        watcher = self.watcher(self.tmp, output_dir="out")
+        self.assertEqual(watcher.output_path(os.path.join(self.tmp, "box.jsp")), os.path.join("out", "box.jsp.csv"))
+        self.assertEqual(watcher.output_path(os.path.join(self.tmp, "sub", "box.pcap")),
+                         os.path.join("out", "sub_box.pcap.csv"))
+        self.assertEqual(self.watcher(self.tmp, output="all.m3u").output_path("box.jsp"), "all.m3u")
+
+    def test_jsp_and_capture_with_same_stem(self):
+        write_corpus(os.path.join(self.tmp, "box.jsp"), 200)
+        other = os.path.join(self.tmp, "other.txt")
+        write_corpus(other, 40, seed=1)
+        write_capture(os.path.join(self.tmp, "box.cap"), other)
+
+        output = os.path.join(self.tmp, "out")
+        os.mkdir(output)
+        watcher = self.watcher(self.tmp, output_dir=output)
+        watcher.poll(0)
+        self.assertEqual(len(watcher.poll(1)), 2, self.logs)
+        self.assertEqual(sorted(os.listdir(output)), ["box.cap.csv", "box.jsp.csv"])
+        with open(os.path.join(output, "box.jsp.csv"), encoding="utf-8") as f:
+            jsp = f.read()
+        with open(os.path.join(output, "box.cap.csv"), encoding="utf-8") as f:
+            capture = f.read()
+        self.assertNotEqual(jsp, capture)
+
+        # 内容未变化时不重新写入
+        os.utime(os.path.join(self.tmp, "box.jsp"), ns=(0, 0))
+        watcher.poll(2)
+        self.assertEqual(watcher.poll(3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()